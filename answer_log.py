@@ -0,0 +1,431 @@
+"""Event-sourced answer log, and a headless replay engine for reproducing sessions.
+
+With RISK_SURVEY_ANSWER_LOG set to a file, the survey scripts append one compact event per
+step of every participant's session to a SQLite log (WAL mode, one row per event):
+
+  ("start", {"script", "seed", "mode"}) the script, its prospect-order seed and elicitation mode
+  ("choice", problem, phase, row, v)    a row answered: v = 1 sure, 0 gamble
+  ("forced", problem, phase, row, v)    a row the monotonicity rule filled in or overrode
+  ("switch", problem, phase, k)         switch-point mode: k sure rows on top
+  ("answer", problem, step, v)          bisection mode: one sure-or-gamble answer
+  ("submit", problem, phase)            Continue pressed
+  ("reject", problem, phase, reason)    a click or submit refused: "monotonic", "incomplete", "inconsistent"
+  ("phase", problem, phase, mask)       a phase accepted, with its pack_choices mask
+  ("result", problem, ce)               a problem's certainty equivalent
+
+`snapshot()` folds a session's events into a small state (problem, phase, masks, CEs,
+rejections) and stores it, so `state()` only folds the events after the latest snapshot.
+`compact()` rewrites a session's finished phases down to what replays them: the last
+choice per row (or the last switch), the accepted submit, the phase and result events;
+superseded clicks and rejected attempts are dropped, so compact only once a session no
+longer needs exact reproduction.
+
+`replay()` drives the script with AppTest from a session's events, at full speed or at the
+recorded pace (optionally scaled), and checks that every phase and CE comes out the same.
+
+    RISK_SURVEY_ANSWER_LOG=answers.db streamlit run risky_survey_streamlit_v3.py
+    python answer_log.py list --log answers.db
+    python answer_log.py replay --log answers.db --session <id> [--speed 1] [--profile replay.prof]
+    python answer_log.py compact --log answers.db --session <id>
+    python answer_log.py --self-check
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SCRIPT = "risky_survey_streamlit_v3.py"
+SNAPSHOT_EVERY = 64  # events between automatic snapshots
+
+Event = Tuple  # (kind, *payload)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    session TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    t_ms INTEGER NOT NULL,
+    event TEXT NOT NULL,
+    PRIMARY KEY (session, seq)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS snapshots (
+    session TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    state TEXT NOT NULL,
+    PRIMARY KEY (session, seq)
+) WITHOUT ROWID;
+"""
+
+
+# ---------- Folding ----------
+def empty_state() -> Dict:
+    return {"start": None, "problem": 0, "phase": 1, "masks": [], "ces": [], "rejects": 0, "events": 0}
+
+
+def fold(events: Sequence[Event], state: Optional[Dict] = None) -> Dict:
+    """Apply events in order to `state` (a copy of it); the session as the log knows it."""
+    state = json.loads(json.dumps(state)) if state is not None else empty_state()
+    for event in events:
+        kind = event[0]
+        state["events"] += 1
+        if kind == "start":
+            state.update(empty_state(), start=event[1], events=state["events"])
+        elif kind == "reject":
+            state["rejects"] += 1
+        elif kind == "phase":
+            _, problem, phase, mask = event
+            state["masks"].append(mask)
+            state["problem"], state["phase"] = (problem, 2) if phase == 1 else (problem + 1, 1)
+        elif kind == "result":
+            _, problem, ce = event
+            state["ces"].append(ce)
+            state["problem"], state["phase"] = problem + 1, 1
+    return state
+
+
+def compacted(events: Sequence[Tuple[int, Event]]) -> List[Tuple[int, Event]]:
+    """(t_ms, event) pairs with every finished ladder phase reduced to what replays it."""
+    out: List[Tuple[int, Event]] = []
+    pending: List[Tuple[int, Event]] = []  # events of the phase still open
+    for t, event in events:
+        kind = event[0]
+        if kind in ("choice", "forced", "switch", "submit", "reject"):
+            pending.append((t, event))
+            continue
+        if kind == "phase":
+            last: Dict = {}
+            submit = None
+            for pt, pe in pending:
+                if pe[0] == "choice":
+                    last[("row", pe[3])] = (pt, pe)
+                elif pe[0] == "switch":
+                    last[("switch",)] = (pt, pe)
+                elif pe[0] == "submit":
+                    submit = (pt, pe)
+            out += sorted(last.values(), key=lambda te: te[0])
+            if submit is not None:
+                out.append(submit)
+            pending = []
+        out.append((t, event))
+    return out + pending
+
+
+# ---------- Log ----------
+class AnswerLog:
+    """Append-only SQLite event log, one sequence per session."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._next_seq: Dict[str, int] = {}
+
+    def _seq(self, session: str) -> int:
+        seq = self._next_seq.get(session)
+        if seq is None:
+            # First append for this session in this process (it may have started on another worker)
+            row = self._conn.execute("SELECT MAX(seq) FROM events WHERE session = ?", (session,)).fetchone()
+            seq = 0 if row[0] is None else row[0] + 1
+        self._next_seq[session] = seq + 1
+        return seq
+
+    def append(self, session: str, event: Event) -> int:
+        with self._lock:
+            seq = self._seq(session)
+            self._conn.execute(
+                "INSERT INTO events (session, seq, t_ms, event) VALUES (?, ?, ?, ?)",
+                (session, seq, int(time.time() * 1000), json.dumps(event, separators=(",", ":"))),
+            )
+        if seq and seq % SNAPSHOT_EVERY == 0:
+            self.snapshot(session)
+        return seq
+
+    def events(self, session: str, after: int = -1) -> List[Tuple[int, int, Event]]:
+        """(seq, t_ms, event) for `session` with seq > `after`, in order."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, t_ms, event FROM events WHERE session = ? AND seq > ? ORDER BY seq", (session, after)
+            ).fetchall()
+        return [(seq, t, tuple(json.loads(e))) for seq, t, e in rows]
+
+    def sessions(self) -> List[Tuple[str, int, int, int]]:
+        """(session, events, first t_ms, last t_ms), most recent first."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT session, COUNT(*), MIN(t_ms), MAX(t_ms) FROM events GROUP BY session ORDER BY MAX(t_ms) DESC"
+            ).fetchall()
+
+    def _latest_snapshot(self, session: str) -> Tuple[int, Optional[Dict]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT seq, state FROM snapshots WHERE session = ? ORDER BY seq DESC LIMIT 1", (session,)
+            ).fetchone()
+        return (-1, None) if row is None else (row[0], json.loads(row[1]))
+
+    def state(self, session: str) -> Dict:
+        """The session folded from its latest snapshot plus the events after it."""
+        seq, state = self._latest_snapshot(session)
+        return fold([e for _, _, e in self.events(session, after=seq)], state)
+
+    def snapshot(self, session: str) -> Optional[int]:
+        """Store the folded state at the session's last event; returns that seq."""
+        seq, state = self._latest_snapshot(session)
+        newer = self.events(session, after=seq)
+        if not newer:
+            return None
+        state = fold([e for _, _, e in newer], state)
+        last = newer[-1][0]
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO snapshots (session, seq, state) VALUES (?, ?, ?)",
+                               (session, last, json.dumps(state, separators=(",", ":"))))
+        return last
+
+    def compact(self, session: str) -> Tuple[int, int]:
+        """Rewrite the session's finished phases (see `compacted`); returns (events before, after)."""
+        rows = self.events(session)
+        kept = compacted([(t, e) for _, t, e in rows])
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.execute("DELETE FROM events WHERE session = ?", (session,))
+            self._conn.execute("DELETE FROM snapshots WHERE session = ?", (session,))
+            self._conn.executemany(
+                "INSERT INTO events (session, seq, t_ms, event) VALUES (?, ?, ?, ?)",
+                [(session, seq, t, json.dumps(e, separators=(",", ":"))) for seq, (t, e) in enumerate(kept)],
+            )
+            self._conn.execute("COMMIT")
+            self._next_seq[session] = len(kept)
+        self.snapshot(session)
+        return len(rows), len(kept)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def open_answer_log(path: Optional[str]) -> Optional[AnswerLog]:
+    """The log at `path`, or None (logging off) when no path is configured."""
+    return AnswerLog(path) if path else None
+
+
+# ---------- Replay ----------
+def _button(at, label: str):
+    return next((b for b in at.button if b.label == label or b.label.startswith(label)), None)
+
+
+def _app_ce(at, problem: int) -> Optional[float]:
+    state = at.session_state
+    if "ces" in state:
+        ces = state["ces"]
+        return ces[problem] if problem < len(ces) else None
+    results = state["results"]
+    return results[problem]["certainty_equivalent"] if problem < len(results) else None
+
+
+def replay(events: Sequence[Tuple[int, Event]], script: str = DEFAULT_SCRIPT, speed: Optional[float] = None,
+           timeout: float = 30) -> Dict:
+    """Drive `script` headlessly through (t_ms, event) pairs; speed None = as fast as possible,
+    1.0 = the recorded pace, 2.0 = twice as fast. Returns timings and any mismatches.
+
+    The replayed session is not logged itself: RISK_SURVEY_ANSWER_LOG is unset meanwhile.
+    """
+    logging_to = os.environ.pop("RISK_SURVEY_ANSWER_LOG", None)
+    try:
+        return _drive(events, script, speed, timeout)
+    finally:
+        if logging_to is not None:
+            os.environ["RISK_SURVEY_ANSWER_LOG"] = logging_to
+
+
+def _drive(events: Sequence[Tuple[int, Event]], script: str, speed: Optional[float], timeout: float) -> Dict:
+    from streamlit.testing.v1 import AppTest
+
+    path = script if os.path.isabs(script) else os.path.join(HERE, script)
+    at = AppTest.from_file(path, default_timeout=timeout)
+    start = next(e for _, e in events if e[0] == "start")[1]
+    at.session_state["start_seed"] = start["seed"]
+    if start.get("mode"):
+        at.query_params["mode"] = start["mode"]
+
+    reruns: List[Tuple[str, float]] = []
+    mismatches: List[str] = []
+
+    def run(action, kind: str):
+        t0 = time.perf_counter()
+        result = action()
+        reruns.append((kind, time.perf_counter() - t0))
+        if result.exception:
+            raise RuntimeError(f"script raised replaying {kind}: {result.exception[0].message}")
+        return result
+
+    at = run(at.run, "load")
+    in_form = False
+    t_first, wall0 = events[0][0], time.perf_counter()
+    for t, event in events:
+        if speed:
+            delay = (t - t_first) / 1000 / speed - (time.perf_counter() - wall0)
+            if delay > 0:
+                time.sleep(delay)
+        kind = event[0]
+        if kind == "start":
+            at.text_input[0].input("Replay")
+            at = run(_button(at, "Start Survey").click().run, "start")
+            in_form = len(at.get("form")) > 0
+        elif kind == "choice":
+            _, problem, phase, row, v = event
+            radio = at.radio[row]
+            radio.set_value(radio.options[1] if v else radio.options[0])
+            if not in_form:
+                at = run(at.run, "choice")
+        elif kind == "switch":
+            at.button_group[0].set_value(event[3])
+        elif kind == "answer":
+            at = run(_button(at, "Prefer Sure" if event[3] else "Prefer Gamble").click().run, "answer")
+        elif kind == "submit":
+            at = run(_button(at, "Continue").click().run, "submit")
+            in_form = len(at.get("form")) > 0
+        elif kind == "phase":
+            _, problem, phase, _mask = event
+            expected = (problem, 2) if phase == 1 else (problem + 1, 1)
+            actual = (at.session_state["index"], at.session_state["phase"])
+            if actual != expected:
+                mismatches.append(f"after phase {phase} of problem {problem + 1}: at {actual}, expected {expected}")
+        elif kind == "result":
+            _, problem, ce = event
+            if _app_ce(at, problem) != ce:
+                mismatches.append(f"problem {problem + 1}: CE {_app_ce(at, problem)}, recorded {ce}")
+        # "forced" and "reject" are the app's own reactions; replay reproduces them
+
+    by_kind: Dict[str, List[float]] = {}
+    for kind, seconds in reruns:
+        by_kind.setdefault(kind, []).append(seconds)
+    return {
+        "script": os.path.basename(path),
+        "events": len(events),
+        "reruns": len(reruns),
+        "wall_seconds": round(time.perf_counter() - wall0, 3),
+        "recorded_seconds": round((events[-1][0] - t_first) / 1000, 3),
+        "rerun_ms_by_kind": {k: round(sum(v) / len(v) * 1000, 3) for k, v in by_kind.items()},
+        "slowest_rerun_ms": round(max(s for _, s in reruns) * 1000, 3),
+        "finished": bool(at.success),
+        "mismatches": mismatches,
+    }
+
+
+# ---------- Self-check ----------
+def _self_check() -> List[str]:
+    """Record AppTest sessions of both scripts, replay them, then compact and replay again."""
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "answers.db")
+        previous = os.environ.get("RISK_SURVEY_ANSWER_LOG")
+        os.environ["RISK_SURVEY_ANSWER_LOG"] = path  # the scripts log to it while they're recorded
+        try:
+            return _record_and_replay(path)
+        finally:
+            if previous is None:
+                os.environ.pop("RISK_SURVEY_ANSWER_LOG", None)
+            else:
+                os.environ["RISK_SURVEY_ANSWER_LOG"] = previous
+
+
+def _record_and_replay(path: str) -> List[str]:
+    import load_test
+
+    lines = []
+    for script, mode in (("risky_survey_streamlit_v3.py", None), ("risky_survey_streamlit_v3.py", "switch"),
+                         ("risky_survey_streamlit_v3.py", "bisection"), ("risk_survey_consolidated.py", None)):
+        for _ in load_test.respondent(os.path.join(HERE, script), 11, load_test.Recorder(), 30, mode):
+            pass
+    log = AnswerLog(path)
+    sessions = log.sessions()
+    assert len(sessions) == 4, sessions
+    for session, count, _, _ in reversed(sessions):
+        rows = log.events(session)
+        script = rows[0][2][1]["script"]
+        state = log.state(session)
+        assert len(state["ces"]) == 10 and state == fold([e for _, _, e in rows]), session
+        report = replay([(t, e) for _, t, e in rows], script)
+        assert report["finished"] and not report["mismatches"], report
+        mode = rows[0][2][1].get("mode") or "consolidated"
+        line = f"{mode}: {count} events replayed in {report['reruns']} reruns ({report['wall_seconds']}s), same CEs"
+        if mode != "bisection":
+            # The same session with an empty Continue first: a rejected attempt that compaction drops
+            noisy = f"{session}-noisy"
+            for i, (_, t, e) in enumerate(rows):
+                log.append(noisy, e)
+                if i == 0:
+                    log.append(noisy, ("submit", 0, 1))
+                    log.append(noisy, ("reject", 0, 1, "incomplete"))
+            assert log.state(noisy)["rejects"] == state["rejects"] + 1
+            assert not replay([(t, e) for _, t, e in log.events(noisy)], script)["mismatches"]
+            before, after = log.compact(noisy)
+            assert after == count and log.state(noisy)["ces"] == state["ces"], (before, after, count)
+            again = replay([(t, e) for _, t, e in log.events(noisy)], script)
+            assert again["finished"] and not again["mismatches"], again
+            line += f"; with a rejected attempt compacted {before} -> {after} events, still replays"
+        lines.append(line)
+    assert len(log.sessions()) == 7  # the replays themselves were not logged
+    log.close()
+    return lines
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Inspect, compact and replay the survey answer log.")
+    parser.add_argument("command", nargs="?", choices=["list", "replay", "compact"])
+    parser.add_argument("--log", default=os.environ.get("RISK_SURVEY_ANSWER_LOG", "answers.db"))
+    parser.add_argument("--session")
+    parser.add_argument("--script", help="script to replay against (default: the one recorded)")
+    parser.add_argument("--speed", type=float, help="replay at the recorded pace times SPEED (default: full speed)")
+    parser.add_argument("--profile", metavar="FILE", help="write a cProfile of the replay to FILE")
+    parser.add_argument("--self-check", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.self_check or args.command is None:
+        for line in _self_check():
+            print(line)
+        return 0
+    log = AnswerLog(args.log)
+    try:
+        if args.command == "list":
+            for session, count, first, last in log.sessions():
+                state = log.state(session)
+                print(f"{session}  {count:5d} events  {(last - first) / 1000:8.1f}s  "
+                      f"problems done {len(state['ces'])}  rejects {state['rejects']}")
+            return 0
+        if not args.session:
+            parser.error("--session is required")
+        if args.command == "compact":
+            before, after = log.compact(args.session)
+            print(f"{args.session}: {before} -> {after} events")
+            return 0
+        rows = log.events(args.session)
+        if not rows:
+            parser.error(f"no events for session {args.session}")
+        script = args.script or rows[0][2][1].get("script") or DEFAULT_SCRIPT
+        events = [(t, e) for _, t, e in rows]
+        if args.profile:
+            import cProfile
+
+            profiler = cProfile.Profile()
+            report = profiler.runcall(replay, events, script, args.speed)
+            profiler.dump_stats(args.profile)
+        else:
+            report = replay(events, script, args.speed)
+        print(json.dumps(report, indent=2))
+        return 1 if report["mismatches"] or not report["finished"] else 0
+    finally:
+        log.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
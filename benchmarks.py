@@ -0,0 +1,157 @@
+"""Micro-benchmarks for the core survey helpers across every script variant.
+
+For each script in survey_variants.SURVEY_SCRIPTS that defines them, times
+generate_sure_amounts (phase 1 and phase 2), check_consistency, check_monotonic_violation,
+compute_certainty_equivalent, describe_prospect, export_csv_blob and export_json_blob on the
+same inputs (taken from the script's own prospect catalog). Results are written as JSON so
+variants, and runs of the same tree over time, can be compared:
+
+    python benchmarks.py --json bench.json
+    python benchmarks.py --json bench_new.json --compare bench.json
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import timeit
+from typing import Callable, Dict, List, Optional
+
+from survey_variants import SURVEY_SCRIPTS, load_survey_functions
+
+
+ROWS = 7
+
+
+def _cases(ns: Dict) -> Dict[str, Callable[[], object]]:
+    """Zero-argument callables for every benchmarked helper the variant defines."""
+    catalog = ns.get("PROSPECTS") or (ns.get("GAINS", []) + ns.get("LOSSES", []))
+    if not catalog:
+        return {}
+    prospect = catalog[len(catalog) // 2]
+    phase1_choices = ["sure"] * 3 + ["prospect"] * (ROWS - 3)
+    partial = ["sure", None, "sure", None, "prospect", None, None]
+
+    cases: Dict[str, Callable[[], object]] = {}
+    gen = ns.get("generate_sure_amounts")
+    amounts = [float(ROWS - i) * 10 for i in range(ROWS)]
+    if gen is not None:
+        amounts = gen(prospect, phase=1)
+        cases["generate_sure_amounts[phase1]"] = lambda: gen(prospect, phase=1)
+        cases["generate_sure_amounts[phase2]"] = lambda: gen(prospect, phase=2, phase1_choices=phase1_choices)
+    if "check_consistency" in ns:
+        fn = ns["check_consistency"]
+        cases["check_consistency"] = lambda: fn(phase1_choices, amounts)
+    if "check_monotonic_violation" in ns:
+        fn_v = ns["check_monotonic_violation"]
+        cases["check_monotonic_violation"] = lambda: fn_v(partial, amounts, "sure", 5)
+    if "compute_certainty_equivalent" in ns:
+        fn_ce = ns["compute_certainty_equivalent"]
+        cases["compute_certainty_equivalent"] = lambda: fn_ce(phase1_choices, amounts)
+    if "describe_prospect" in ns:
+        fn_d = ns["describe_prospect"]
+        cases["describe_prospect"] = lambda: fn_d(prospect)
+
+    results = [
+        {
+            "prospect": p.get("description", ""),
+            "expected_value": 12.5,
+            "certainty_equivalent": 10.25,
+            "domain": "Gain Domain",
+            "risk_attitude": "Risk Averse",
+        }
+        for p in (catalog * 10)[:10]
+    ]
+    if "export_csv_blob" in ns:
+        fn_csv = ns["export_csv_blob"]
+        cases["export_csv_blob"] = lambda: fn_csv(results, "Benchmark Respondent", 30)
+    if "export_json_blob" in ns:
+        fn_json = ns["export_json_blob"]
+        summary = {"participant": {"name": "Benchmark Respondent", "age": 30}, "results": results}
+        cases["export_json_blob"] = lambda: fn_json(summary)
+    return cases
+
+
+def _time(fn: Callable[[], object], repeat: int) -> Dict[str, float]:
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()  # loops for >= 0.2s; a quarter of that per round is plenty
+    number = max(1, number // 4)
+    samples = [t / number * 1e6 for t in timer.repeat(repeat=repeat, number=number)]
+    return {
+        "mean_us": round(statistics.fmean(samples), 3),
+        "min_us": round(min(samples), 3),
+        "stdev_us": round(statistics.stdev(samples), 3) if len(samples) > 1 else 0.0,
+        "loops": number,
+        "rounds": repeat,
+    }
+
+
+def run_benchmarks(scripts: Optional[List[str]] = None, repeat: int = 5) -> Dict:
+    report: Dict = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "variants": {},
+    }
+    for script in scripts or SURVEY_SCRIPTS:
+        try:
+            ns = load_survey_functions(script)
+        except (SyntaxError, ImportError) as e:
+            report["variants"][script] = {"error": f"{type(e).__name__}: {e}"}
+            continue
+        report["variants"][script] = {
+            name: _time(fn, repeat) for name, fn in _cases(ns).items()
+        }
+    return report
+
+
+def compare(new: Dict, old: Dict, threshold: float = 0.25) -> List[str]:
+    """Lines describing helpers whose min time moved by more than `threshold`."""
+    lines = []
+    for script, funcs in new["variants"].items():
+        before = old.get("variants", {}).get(script, {})
+        for name, stats in funcs.items():
+            if not isinstance(stats, dict) or name not in before or "min_us" not in before[name]:
+                continue
+            ratio = stats["min_us"] / before[name]["min_us"] if before[name]["min_us"] else 1.0
+            if abs(ratio - 1.0) > threshold:
+                kind = "REGRESSION" if ratio > 1 else "improvement"
+                lines.append(f"{kind}: {script} {name} {before[name]['min_us']:.2f}us -> {stats['min_us']:.2f}us ({ratio:.2f}x)")
+    return lines
+
+
+def _print_table(report: Dict) -> None:
+    names = sorted({n for funcs in report["variants"].values() for n in funcs if n != "error"})
+    for name in names:
+        print(f"\n{name}")
+        for script, funcs in report["variants"].items():
+            if name in funcs:
+                print(f"  {script:<62} {funcs[name]['min_us']:>10.2f} us")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the survey helpers across script variants.")
+    parser.add_argument("--scripts", nargs="*", help="subset of scripts to benchmark")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="write results to this JSON file")
+    parser.add_argument("--compare", help="previous results JSON to diff against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="relative change to report (default 25%%)")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.scripts, args.repeat)
+    _print_table(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            old = json.load(f)
+        lines = compare(report, old, args.threshold)
+        print("\n" + ("\n".join(lines) if lines else "no changes beyond threshold"))
+        return 1 if any(line.startswith("REGRESSION") for line in lines) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
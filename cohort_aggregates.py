@@ -0,0 +1,223 @@
+"""Incrementally maintained cohort statistics per prospect and per domain.
+
+Every new result updates a fixed-size record for its prospect and its domain: a count, a
+Welford running mean/variance of CE - EV (the risk premium, negative when risk averse), and
+the Risk Averse / Seeking / Neutral tallies. Reads (`summary`, `by_prospect`, `by_domain`)
+cost O(number of prospects) no matter how many responses have been added, and two stores
+can be merged (Chan et al.'s parallel update) to combine shards or processes.
+
+Results are accepted in the app's layout (`certainty_equivalent`, `risk_attitude`, ...), the
+HTML export's camelCase layout, or as sheet rows from `rows_from_survey_data`.
+"""
+
+import math
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence
+
+
+ATTITUDES = ("Risk Averse", "Risk Seeking", "Risk Neutral")
+
+# Column positions in sheet rows (see sheets_writer.rows_from_survey_data)
+ROW_DOMAIN, ROW_PROSPECT, ROW_EV, ROW_CE, ROW_ATTITUDE = 4, 5, 6, 7, 8
+
+
+# ---------- Running statistics ----------
+class RunningStats:
+    """Welford's online mean and variance."""
+
+    __slots__ = ("count", "mean", "m2")
+
+    def __init__(self, count: int = 0, mean: float = 0.0, m2: float = 0.0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+
+    def add(self, x: float) -> None:
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+
+    def merge(self, other: "RunningStats") -> None:
+        if other.count == 0:
+            return
+        n = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / n
+        self.m2 += other.m2 + delta * delta * self.count * other.count / n
+        self.count = n
+
+    @property
+    def variance(self) -> float:
+        """Sample variance (n - 1); NaN below two observations."""
+        return self.m2 / (self.count - 1) if self.count > 1 else math.nan
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance) if self.count > 1 else math.nan
+
+    def to_dict(self) -> Dict:
+        return {"count": self.count, "mean": self.mean, "m2": self.m2}
+
+
+class Aggregate:
+    """Premium statistics and attitude tallies for one prospect or domain."""
+
+    __slots__ = ("premium", "attitudes")
+
+    def __init__(self):
+        self.premium = RunningStats()
+        self.attitudes = dict.fromkeys(ATTITUDES, 0)
+
+    def add(self, premium: float, attitude: str) -> None:
+        self.premium.add(premium)
+        self.attitudes[attitude] = self.attitudes.get(attitude, 0) + 1
+
+    def merge(self, other: "Aggregate") -> None:
+        self.premium.merge(other.premium)
+        for attitude, n in other.attitudes.items():
+            self.attitudes[attitude] = self.attitudes.get(attitude, 0) + n
+
+    def copy(self) -> "Aggregate":
+        clone = Aggregate()
+        clone.merge(self)
+        return clone
+
+    def row(self) -> Dict:
+        return {
+            "count": self.premium.count,
+            "mean_premium": self.premium.mean if self.premium.count else math.nan,
+            "std_premium": self.premium.std,
+            **{f"{a.split()[1].lower()}_count": self.attitudes.get(a, 0) for a in ATTITUDES},
+        }
+
+
+# ---------- Store ----------
+class CohortAggregates:
+    """Thread-safe per-prospect and per-domain aggregates, updated one result at a time."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._prospects: Dict[str, Aggregate] = {}
+        self._prospect_domain: Dict[str, str] = {}
+        self._domains: Dict[str, Aggregate] = {}
+        self._total = Aggregate()
+
+    def add(self, prospect: str, domain: str, expected_value: float, certainty_equivalent: float,
+            risk_attitude: str) -> None:
+        premium = float(certainty_equivalent) - float(expected_value)
+        with self._lock:
+            if prospect not in self._prospects:
+                self._prospects[prospect] = Aggregate()
+                self._prospect_domain[prospect] = domain
+            if domain not in self._domains:
+                self._domains[domain] = Aggregate()
+            self._prospects[prospect].add(premium, risk_attitude)
+            self._domains[domain].add(premium, risk_attitude)
+            self._total.add(premium, risk_attitude)
+
+    def add_result(self, result: Dict) -> None:
+        """One result dict, in the app's snake_case or the HTML export's camelCase layout."""
+        if "certainty_equivalent" in result:
+            self.add(result["prospect"], result["domain"], result["expected_value"],
+                     result["certainty_equivalent"], result["risk_attitude"])
+        else:
+            self.add(result["prospect"], result["domain"], result["expectedValue"],
+                     result["certaintyEquivalent"], result["riskAttitude"])
+
+    def add_results(self, results: Iterable[Dict]) -> None:
+        for result in results:
+            self.add_result(result)
+
+    def add_rows(self, rows: Iterable[Sequence]) -> None:
+        """Sheet rows as produced by rows_from_survey_data (or read back from the sheet)."""
+        for row in rows:
+            self.add(row[ROW_PROSPECT], row[ROW_DOMAIN], row[ROW_EV], row[ROW_CE], row[ROW_ATTITUDE])
+
+    def merge(self, other: "CohortAggregates") -> None:
+        # Snapshot `other` under its own lock: its aggregates keep changing once it's released
+        with other._lock:
+            prospects = {name: agg.copy() for name, agg in other._prospects.items()}
+            prospect_domain = dict(other._prospect_domain)
+            domains = {name: agg.copy() for name, agg in other._domains.items()}
+            total = other._total.copy()
+        with self._lock:
+            for name, agg in prospects.items():
+                self._prospects.setdefault(name, Aggregate()).merge(agg)
+                self._prospect_domain.setdefault(name, prospect_domain[name])
+            for name, agg in domains.items():
+                self._domains.setdefault(name, Aggregate()).merge(agg)
+            self._total.merge(total)
+
+    # ---------- Reads ----------
+    def attitude_counts(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._total.attitudes)
+
+    def summary(self) -> Dict:
+        """Totals in the export's summary layout (totalProblems, gainProblems, ...)."""
+        with self._lock:
+            domain_count = {d: a.premium.count for d, a in self._domains.items()}
+            attitudes = self._total.attitudes
+            return {
+                "totalProblems": self._total.premium.count,
+                "gainProblems": domain_count.get("Gain Domain", 0),
+                "lossProblems": domain_count.get("Loss Domain", 0),
+                "riskAverseCount": attitudes.get("Risk Averse", 0),
+                "riskSeekingCount": attitudes.get("Risk Seeking", 0),
+                "riskNeutralCount": attitudes.get("Risk Neutral", 0),
+            }
+
+    def by_prospect(self) -> List[Dict]:
+        with self._lock:
+            return [
+                {"prospect": name, "domain": self._prospect_domain[name], **agg.row()}
+                for name, agg in self._prospects.items()
+            ]
+
+    def by_domain(self) -> List[Dict]:
+        with self._lock:
+            return [{"domain": name, **agg.row()} for name, agg in self._domains.items()]
+
+
+def from_results(results: Iterable[Dict], store: Optional[CohortAggregates] = None) -> CohortAggregates:
+    store = store or CohortAggregates()
+    store.add_results(results)
+    return store
+
+
+# ---------- Self-check ----------
+def _self_check(n: int = 2000, seed: int = 0) -> List[str]:
+    """Incremental and merged aggregates against a full recomputation over simulated results."""
+    import random
+    import statistics
+
+    rng = random.Random(seed)
+    prospects = [(f"p{i}", "Gain Domain" if i % 2 else "Loss Domain", rng.uniform(-100, 100)) for i in range(20)]
+    results = []
+    for _ in range(n):
+        name, domain, ev = rng.choice(prospects)
+        ce = round(ev + rng.gauss(-5, 15), 2)
+        attitude = "Risk Averse" if ce < ev else "Risk Seeking" if ce > ev else "Risk Neutral"
+        results.append({"prospect": name, "domain": domain, "expected_value": ev,
+                        "certainty_equivalent": ce, "risk_attitude": attitude})
+
+    whole = from_results(results)
+    left, right = from_results(results[: n // 3]), from_results(results[n // 3:])
+    left.merge(right)
+
+    for store in (whole, left):
+        for row in store.by_prospect():
+            premiums = [r["certainty_equivalent"] - r["expected_value"] for r in results if r["prospect"] == row["prospect"]]
+            assert row["count"] == len(premiums)
+            assert math.isclose(row["mean_premium"], statistics.fmean(premiums), rel_tol=1e-9, abs_tol=1e-9)
+            assert math.isclose(row["std_premium"], statistics.stdev(premiums), rel_tol=1e-9)
+        summary = store.summary()
+        assert summary["totalProblems"] == n
+        assert summary["riskAverseCount"] == sum(r["risk_attitude"] == "Risk Averse" for r in results)
+    return [f"{n} results: incremental and merged aggregates match a full recomputation"]
+
+
+if __name__ == "__main__":
+    for line in _self_check():
+        print(line)
@@ -0,0 +1,188 @@
+"""Columnar Parquet export of survey responses, for cohort analysis.
+
+The JSON and CSV exports repeat the full prospect description, the domain and the risk
+attitude as text on every row. Here those three (and Name) are Arrow dictionary columns, so
+each distinct string is stored once per row group and rows carry small integer codes; EV
+and CE are exact integer cents (every amount the app produces is rounded to 2 decimals).
+Parquet then applies its own dictionary/RLE encoding and zstd on top.
+
+Input is streamed in frames of `batch_rows` rows in the export_csv_blob layout (journal
+rows, an exported CSV, or cpt_simulator chunks), one Parquet row group per frame, so memory
+stays bounded however large the cohort. `read_parquet_export` loads a file back as a
+DataFrame with categorical string columns and float dollar amounts.
+
+    python columnar_export.py --journal survey_journal.db --out cohort.parquet
+    python columnar_export.py --csv simulated_cohort.csv --out cohort.parquet
+"""
+
+import argparse
+import itertools
+import sys
+import time
+from typing import Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from csv_export import CSV_COLUMNS, Record, records_from_rows
+from response_journal import DEFAULT_JOURNAL_PATH, ResponseJournal
+
+
+DEFAULT_BATCH_ROWS = 200_000
+COMPRESSION = "zstd"
+
+SCHEMA = pa.schema(
+    [
+        pa.field("Name", pa.dictionary(pa.int32(), pa.string())),
+        pa.field("Age", pa.int16()),
+        pa.field("Problem", pa.int16()),
+        pa.field("Domain", pa.dictionary(pa.int8(), pa.string())),
+        pa.field("Prospect", pa.dictionary(pa.int16(), pa.string())),
+        pa.field("Expected_Value_Cents", pa.int32()),
+        pa.field("Certainty_Equivalent_Cents", pa.int32()),
+        pa.field("Risk_Attitude", pa.dictionary(pa.int8(), pa.string())),
+    ],
+    metadata={"risk_survey.cents_columns": "Expected_Value_Cents,Certainty_Equivalent_Cents"},
+)
+CENTS_COLUMNS = {"Expected_Value": "Expected_Value_Cents", "Certainty_Equivalent": "Certainty_Equivalent_Cents"}
+
+
+# ---------- Encoding ----------
+def _dictionary(values: pd.Series, index_type: pa.DataType) -> pa.Array:
+    strings = values.astype("string") if not isinstance(values.dtype, pd.CategoricalDtype) else values
+    return pa.array(strings.astype("category"), from_pandas=True).cast(pa.dictionary(index_type, pa.string()))
+
+
+def _integers(values: pd.Series, type_: pa.DataType) -> pa.Array:
+    numbers = pd.to_numeric(values, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+    return pa.array(numbers, from_pandas=True).cast(type_)
+
+
+def _cents(values: pd.Series) -> pa.Array:
+    dollars = pd.to_numeric(values, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+    return pa.array(np.round(dollars * 100), from_pandas=True).cast(pa.int32())
+
+
+def batch_from_frame(df: pd.DataFrame) -> pa.RecordBatch:
+    """One frame in the export_csv_blob layout as a RecordBatch in SCHEMA."""
+    return pa.RecordBatch.from_arrays(
+        [
+            _dictionary(df["Name"], pa.int32()),
+            _integers(df["Age"], pa.int16()),
+            _integers(df["Problem"], pa.int16()),
+            _dictionary(df["Domain"], pa.int8()),
+            _dictionary(df["Prospect"], pa.int16()),
+            _cents(df["Expected_Value"]),
+            _cents(df["Certainty_Equivalent"]),
+            _dictionary(df["Risk_Attitude"], pa.int8()),
+        ],
+        schema=SCHEMA,
+    )
+
+
+def frames_from_records(records: Iterable[Record], batch_rows: int = DEFAULT_BATCH_ROWS) -> Iterator[pd.DataFrame]:
+    """Group records (as yielded by csv_export.records_from_*) into frames of `batch_rows`."""
+    it = iter(records)
+    while True:
+        batch = list(itertools.islice(it, batch_rows))
+        if not batch:
+            return
+        yield pd.DataFrame.from_records(batch, columns=CSV_COLUMNS)
+
+
+def frames_from_csv(path: str, batch_rows: int = DEFAULT_BATCH_ROWS) -> Iterator[pd.DataFrame]:
+    yield from pd.read_csv(path, chunksize=batch_rows, keep_default_na=False, na_values=[""])
+
+
+# ---------- Files ----------
+def write_parquet(frames: Iterable[pd.DataFrame], path: str, compression: str = COMPRESSION) -> int:
+    """Write frames to `path`, one row group each; returns the number of rows written."""
+    written = 0
+    with pq.ParquetWriter(path, SCHEMA, compression=compression, use_dictionary=True) as writer:
+        for df in frames:
+            writer.write_batch(batch_from_frame(df))
+            written += len(df)
+    return written
+
+
+def read_parquet_export(path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Load an export in the CSV column layout: categorical strings and float dollar amounts."""
+    if columns is not None:
+        columns = [CENTS_COLUMNS.get(c, c) for c in columns]
+    df = pq.read_table(path, columns=columns).to_pandas()
+    for dollars, cents in CENTS_COLUMNS.items():
+        if cents in df.columns:
+            df[dollars] = df[cents] / 100
+    return df[[c for c in CSV_COLUMNS if c in df.columns]]
+
+
+# ---------- Self-check ----------
+def _self_check(respondents: int = 20_000) -> List[str]:
+    """Round trip and size/load time against CSV on a simulated cohort."""
+    import os
+    import tempfile
+
+    from cpt_simulator import simulate
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path, parquet_path = os.path.join(tmp, "cohort.csv"), os.path.join(tmp, "cohort.parquet")
+        frames = [rows for rows, _ in simulate(respondents, seed=1, chunk_size=5_000)]
+        for i, rows in enumerate(frames):
+            rows.to_csv(csv_path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+        n = write_parquet(frames_from_csv(csv_path, batch_rows=50_000), parquet_path)
+
+        t0 = time.perf_counter()
+        from_csv = pd.read_csv(csv_path)
+        t_csv = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        from_parquet = read_parquet_export(parquet_path)
+        t_parquet = time.perf_counter() - t0
+
+        assert len(from_parquet) == len(from_csv) == n
+        for col in CSV_COLUMNS:
+            a, b = from_csv[col], from_parquet[col]
+            if col in CENTS_COLUMNS:
+                assert np.allclose(a.to_numpy(), b.to_numpy(), atol=1e-9), col
+            else:
+                assert (a.astype(str).to_numpy() == b.astype(str).to_numpy()).all(), col
+        csv_size, parquet_size = os.path.getsize(csv_path), os.path.getsize(parquet_path)
+
+    return [
+        f"{n} rows round-trip exactly",
+        f"size: CSV {csv_size / 1e6:.1f} MB, Parquet {parquet_size / 1e6:.2f} MB ({csv_size / parquet_size:.0f}x smaller)",
+        f"load: read_csv {t_csv * 1e3:.0f} ms, read_parquet_export {t_parquet * 1e3:.0f} ms",
+    ]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Export survey responses to a dictionary-encoded Parquet file.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--journal", default=DEFAULT_JOURNAL_PATH, help="SQLite journal file")
+    source.add_argument("--csv", help="an export CSV (Name, Age, Problem, Domain, ...) instead of the journal")
+    parser.add_argument("--out", default="survey_responses.parquet")
+    parser.add_argument("--batch-rows", type=int, default=DEFAULT_BATCH_ROWS, help="rows per row group")
+    parser.add_argument("--self-check", action="store_true", help="round trip and compare against CSV")
+    args = parser.parse_args(argv)
+
+    if args.self_check:
+        for line in _self_check():
+            print(line)
+        return 0
+
+    t0 = time.perf_counter()
+    if args.csv:
+        n = write_parquet(frames_from_csv(args.csv, args.batch_rows), args.out)
+    else:
+        journal = ResponseJournal(args.journal)
+        try:
+            n = write_parquet(frames_from_records(records_from_rows(journal.iter_rows()), args.batch_rows), args.out)
+        finally:
+            journal.close()
+    print(f"wrote {n} rows in {time.perf_counter() - t0:.1f}s -> {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,294 @@
+"""Per-respondent CPT parameter estimation from elicited certainty equivalents.
+
+`risk_attitude_from_ce` only labels each problem by comparing CE with EV. This module fits the
+cumulative prospect theory model used by cpt_simulator (alpha, beta, lambda, gamma) to each
+participant's ten CEs by nonlinear least squares, with residuals scaled by each prospect's
+outcome range so $400 problems don't dominate $50 ones.
+
+The objective is minimized with a vectorized grid/pattern search: a coarse grid, then a few
+zooms around each participant's best point, all as NumPy broadcasts over participants.
+Same-sign prospects separate cleanly (gains depend on alpha and gamma, losses on beta and
+gamma), so the search runs over two 2-D grids that share gamma instead of one 3-D grid.
+Lambda only enters through mixed prospects; it is fitted afterwards on those items and is
+NaN for participants who saw none. That is every participant of the current scripts: their
+catalogs only have pure-gain and pure-loss prospects, and for a pure-loss prospect the CE
+solves -lambda (-CE)^beta = -lambda [w(p) (-x1)^beta + (1 - w(p)) (-x2)^beta], where lambda
+cancels. Loss aversion is not identified by this design; estimating it needs mixed
+(win/lose) prospects in the catalog.
+
+Rows are grouped into respondents in file order: a new respondent starts at every Problem 1,
+or wherever Name or Age changes, so namesakes and repeat attempts are fitted separately.
+
+Cohort mode splits an export CSV across a process pool:
+
+    python cpt_fitting.py cohort.csv --out fits.csv --workers 8
+"""
+
+import argparse
+import logging
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from cpt_simulator import cpt_certainty_equivalent
+
+
+logger = logging.getLogger("cpt_fitting")
+
+
+BOUNDS = {
+    "alpha": (0.2, 1.5),
+    "beta": (0.2, 1.5),
+    "gamma": (0.28, 1.5),  # w(p) stops being monotone below ~0.279
+    "lambda": (0.2, 6.0),
+}
+COARSE_STEPS = 27
+ZOOM_STEPS = 9
+ZOOMS = 4
+
+FIT_COLUMNS = ["Respondent", "Name", "Age", "alpha", "beta", "lambda", "gamma", "nrmse", "n_items"]
+PARAM_COLUMNS = FIT_COLUMNS[3:]
+
+
+# ---------- Prospect parsing ----------
+_AMOUNT = r"\$?([\d,]+(?:\.\d+)?)"
+# "10% chance to win $100", "90% chance to win nothing", "90% chance to nothing" (risky_survey_44)
+_PART = re.compile(r"(\d+(?:\.\d+)?)%(?: chance)? to (?:(win|lose) " + _AMOUNT + r"|(?:(?:win|lose) )?nothing)")
+# "10% to win $100, else 0": the shorthand form, with the other outcome always zero
+_ELSE = re.compile(r"\s*(\d+(?:\.\d+)?)%(?: chance)? to (win|lose) " + _AMOUNT
+                   + r",? else (?:\$?0(?:\.0+)?|nothing)\s*")
+
+
+def parse_prospect(description: str) -> Optional[Tuple[float, float, float]]:
+    """(x_ext, x_oth, p_ext) from an exported prospect description, or None if unrecognized.
+
+    Recognizes two outcomes spelled out, e.g. "10% chance to win $100, 90% chance to win $50"
+    and "5% chance to lose $200, 95% chance to lose nothing", and the shorthand
+    "10% to win $100, else 0". Rows with any other description are left out of the fit
+    (fit_cohort logs how many).
+    """
+    m = _ELSE.fullmatch(description)
+    if m:
+        pct, verb, amount = m.groups()
+        x = float(amount.replace(",", ""))
+        return (-x if verb == "lose" else x), 0.0, float(pct) / 100.0
+    parts = _PART.findall(description)
+    if len(parts) != 2:
+        return None
+    outcomes = []
+    for pct, verb, amount in parts:
+        x = float(amount.replace(",", "")) if amount else 0.0
+        outcomes.append((-x if verb == "lose" else x, float(pct) / 100.0))
+    (x1, p1), (x2, p2) = outcomes
+    if abs(x2) > abs(x1):
+        (x1, p1), (x2, p2) = (x2, p2), (x1, p1)
+    return x1, x2, p1
+
+
+# ---------- Objective & search ----------
+def _sse_grid(obs, scale, x_e, x_o, p_e, mask, curv, gamma):
+    """Scaled SSE for every (curvature, gamma) pair.
+
+    obs/scale/x_e/x_o/p_e/mask: (P, K); curv: (P, A); gamma: (P, G) -> (P, A, G).
+    The same curvature is used for gains and losses, so callers pass only one domain's items.
+    """
+    shape = (obs.shape[0], obs.shape[1], curv.shape[1], gamma.shape[1])
+    c = np.broadcast_to(curv[:, None, :, None], shape)
+    g = np.broadcast_to(gamma[:, None, None, :], shape)
+    pred = cpt_certainty_equivalent(
+        x_e[:, :, None, None], x_o[:, :, None, None], p_e[:, :, None, None],
+        c, c, 1.0, g,
+    )
+    resid = (obs[:, :, None, None] - pred) / scale[:, :, None, None]
+    return np.where(mask[:, :, None, None], resid * resid, 0.0).sum(axis=1)
+
+
+def _axis(center: np.ndarray, span: np.ndarray, steps: int, bounds: Tuple[float, float]) -> np.ndarray:
+    """(P, steps) grid of `steps` points across center +/- span, clipped to bounds."""
+    t = np.linspace(-1.0, 1.0, steps)
+    return np.clip(center[:, None] + span[:, None] * t[None, :], *bounds)
+
+
+def fit_participants(obs: np.ndarray, x_e: np.ndarray, x_o: np.ndarray, p_e: np.ndarray,
+                     mask: np.ndarray) -> Dict[str, np.ndarray]:
+    """Fit CPT parameters for P participants with up to K items each (all arrays (P, K))."""
+    n = obs.shape[0]
+    scale = np.maximum(np.abs(x_e - x_o), 1.0)  # outcome range, as in the simulator's noise model
+    x_e, x_o = np.where(mask, x_e, 1.0), np.where(mask, x_o, 0.0)
+    p_e = np.where(mask, p_e, 0.5)
+    obs = np.where(mask, obs, 0.0)
+    mixed = mask & (x_e * x_o < 0)
+    gain = mask & ~mixed & (x_e > 0)
+    loss = mask & ~mixed & (x_e < 0)
+
+    # Coarse grid, then zoom around each participant's optimum
+    center = {k: np.full(n, (lo + hi) / 2) for k, (lo, hi) in BOUNDS.items()}
+    span = {k: np.full(n, (hi - lo) / 2) for k, (lo, hi) in BOUNDS.items()}
+    steps = COARSE_STEPS
+    for _ in range(ZOOMS + 1):
+        a_ax = _axis(center["alpha"], span["alpha"], steps, BOUNDS["alpha"])
+        b_ax = _axis(center["beta"], span["beta"], steps, BOUNDS["beta"])
+        g_ax = _axis(center["gamma"], span["gamma"], steps, BOUNDS["gamma"])
+        sse_gain = _sse_grid(obs, scale, x_e, x_o, p_e, gain, a_ax, g_ax)   # (P, A, G)
+        sse_loss = _sse_grid(obs, scale, x_e, x_o, p_e, loss, b_ax, g_ax)   # (P, B, G)
+        best_a = sse_gain.argmin(axis=1)                                    # (P, G)
+        best_b = sse_loss.argmin(axis=1)
+        total = sse_gain.min(axis=1) + sse_loss.min(axis=1)
+        gi = total.argmin(axis=1)
+        r = np.arange(n)
+        center["gamma"] = g_ax[r, gi]
+        center["alpha"] = a_ax[r, best_a[r, gi]]
+        center["beta"] = b_ax[r, best_b[r, gi]]
+        for k in ("alpha", "beta", "gamma"):
+            span[k] = span[k] * (2.0 / (steps - 1)) * 1.5
+        steps = ZOOM_STEPS
+    sse = total[np.arange(n), gi]
+
+    # Lambda from mixed prospects only, given the fitted curvature and weighting
+    lam = np.full(n, np.nan)
+    has_mixed = mixed.any(axis=1)
+    if has_mixed.any():
+        idx = np.flatnonzero(has_mixed)
+        lc = np.full(idx.size, sum(BOUNDS["lambda"]) / 2)
+        ls = np.full(idx.size, (BOUNDS["lambda"][1] - BOUNDS["lambda"][0]) / 2)
+        steps = COARSE_STEPS
+        for _ in range(ZOOMS + 1):
+            l_ax = _axis(lc, ls, steps, BOUNDS["lambda"])                     # (M, L)
+            pred = cpt_certainty_equivalent(
+                x_e[idx][:, :, None], x_o[idx][:, :, None], p_e[idx][:, :, None],
+                center["alpha"][idx][:, None, None], center["beta"][idx][:, None, None],
+                l_ax[:, None, :], center["gamma"][idx][:, None, None],
+            )
+            resid = (obs[idx][:, :, None] - pred) / scale[idx][:, :, None]
+            l_sse = np.where(mixed[idx][:, :, None], resid * resid, 0.0).sum(axis=1)
+            li = l_sse.argmin(axis=1)
+            lc = l_ax[np.arange(idx.size), li]
+            ls = ls * (2.0 / (steps - 1)) * 1.5
+            steps = ZOOM_STEPS
+        lam[idx] = lc
+        sse[idx] += l_sse[np.arange(idx.size), li]
+
+    n_items = mask.sum(axis=1)
+    return {
+        "alpha": np.where(gain.any(axis=1), center["alpha"], np.nan),
+        "beta": np.where(loss.any(axis=1), center["beta"], np.nan),
+        "lambda": lam,
+        "gamma": center["gamma"],
+        "nrmse": np.sqrt(sse / np.maximum(n_items, 1)),
+        "n_items": n_items,
+    }
+
+
+# ---------- Cohort ----------
+def respondent_ids(df: pd.DataFrame) -> np.ndarray:
+    """0-based respondent number per export row, in file order.
+
+    A respondent's rows are consecutive with Problem counting up from 1, so a new one starts
+    at every Problem 1 (or any Problem that doesn't increase) and wherever Name or Age changes.
+    """
+    if df.empty:
+        return np.zeros(0, dtype=np.int64)
+    new = np.zeros(len(df), dtype=bool)
+    new[0] = True
+    for col in ("Name", "Age"):
+        if col in df.columns:
+            values = df[col].astype(str).to_numpy()
+            new[1:] |= values[1:] != values[:-1]
+    if "Problem" in df.columns:
+        problem = df["Problem"].to_numpy()
+        new[1:] |= (problem[1:] == 1) | (problem[1:] <= problem[:-1])
+    return np.cumsum(new) - 1
+
+
+def _participant_arrays(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, np.ndarray], pd.Series]:
+    """Pivot export rows into (P, K) arrays, one row per respondent (see respondent_ids).
+
+    Also returns the rows whose Prospect parse_prospect doesn't recognize, counted per description.
+    """
+    df = df.assign(Respondent=respondent_ids(df) + 1)
+    who = df.groupby("Respondent", sort=True).first()
+    respondents = pd.DataFrame({
+        "Respondent": who.index.to_numpy(),
+        "Name": who["Name"].to_numpy(),
+        "Age": who["Age"].to_numpy() if "Age" in who.columns else np.nan,
+    })
+
+    parsed = {d: parse_prospect(d) for d in df["Prospect"].unique()}
+    known = df["Prospect"].map(lambda d: parsed[d] is not None)
+    dropped = df.loc[~known, "Prospect"].value_counts()
+    df = df[known]
+    feats = np.array([parsed[d] for d in df["Prospect"]], dtype=np.float64).reshape(-1, 3)
+
+    pos = df["Respondent"].to_numpy() - 1
+    slot = df.groupby(pos).cumcount().to_numpy()
+    k = int(slot.max()) + 1 if len(slot) else 0
+    shape = (len(respondents), k)
+    out = {key: np.zeros(shape) for key in ("obs", "x_e", "x_o", "p_e")}
+    out["mask"] = np.zeros(shape, dtype=bool)
+    out["obs"][pos, slot] = df["Certainty_Equivalent"].to_numpy(dtype=np.float64)
+    out["x_e"][pos, slot] = feats[:, 0]
+    out["x_o"][pos, slot] = feats[:, 1]
+    out["p_e"][pos, slot] = feats[:, 2]
+    out["mask"][pos, slot] = True
+    return respondents, out, dropped
+
+
+def _fit_chunk(arrays: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    return fit_participants(arrays["obs"], arrays["x_e"], arrays["x_o"], arrays["p_e"], arrays["mask"])
+
+
+def fit_cohort(df: pd.DataFrame, workers: Optional[int] = None, chunk_size: int = 500) -> pd.DataFrame:
+    """Fit every respondent in an export DataFrame (rows in file order), `chunk_size` per task.
+
+    Rows with an unrecognized Prospect are left out and logged as a warning; the result's
+    `dropped_rows` attribute holds their count.
+    """
+    respondents, arrays, dropped = _participant_arrays(df)
+    if len(dropped):
+        logger.warning("Dropped %d rows with unrecognized prospects: %s", dropped.sum(),
+                       "; ".join(f"{d!r} ({n})" for d, n in dropped.head(5).items())
+                       + ("; ..." if len(dropped) > 5 else ""))
+    chunks = [
+        {key: value[start:start + chunk_size] for key, value in arrays.items()}
+        for start in range(0, len(respondents), chunk_size)
+    ]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(chunks) <= 1:
+        results = [_fit_chunk(c) for c in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_fit_chunk, chunks))
+
+    fits = {key: np.concatenate([r[key] for r in results]) if results else np.array([])
+            for key in PARAM_COLUMNS}
+    result = pd.DataFrame({**respondents, **fits}, columns=FIT_COLUMNS)
+    result.attrs["dropped_rows"] = int(dropped.sum())
+    return result
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Fit CPT parameters per participant from a survey export.")
+    parser.add_argument("csv", help="export CSV (Name, Age, Problem, Domain, Prospect, ..., Certainty_Equivalent, ...)")
+    parser.add_argument("--out", default="cpt_fits.csv")
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (default: all CPUs)")
+    parser.add_argument("--chunk-size", type=int, default=500, help="participants per task")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    df = pd.read_csv(args.csv, usecols=["Name", "Age", "Problem", "Prospect", "Certainty_Equivalent"])
+    fits = fit_cohort(df, args.workers, args.chunk_size)
+    fits.to_csv(args.out, index=False)
+    print(f"fitted {len(fits)} respondents in {time.perf_counter() - t0:.1f}s -> {args.out}")
+    if len(fits) and fits["lambda"].isna().all():
+        print("lambda is not identified: no respondent answered a mixed (win/lose) prospect", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+"""Synthetic respondents driven by cumulative prospect theory (Tversky & Kahneman, 1992).
+
+Each agent draws CPT parameters:
+  alpha  - value curvature for gains,   v(x) = x^alpha            (x >= 0)
+  beta   - value curvature for losses,  v(x) = -lambda (-x)^beta  (x < 0)
+  lambda - loss aversion
+  gamma  - probability weighting, w(p) = p^g / (p^g + (1-p)^g)^(1/g)
+  sigma  - response noise, as a fraction of the prospect's outcome range
+
+and answers the two-phase ladders of risky_survey_streamlit_v3.py exactly as the app would
+present them: 5 random GAINS + 5 random LOSSES in random order, phase-1 ladder, then the
+phase-2 ladder chosen by its phase-1 switch point. In each phase the agent takes the sure
+amount on every row above its (noisy) CPT certainty equivalent, so answers are monotone.
+CEs are scored with survey_scoring's v3 convention, and rows come out in the
+`export_csv_blob` layout (Name, Age, Problem, Domain, Prospect, Expected_Value,
+Certainty_Equivalent, Risk_Attitude).
+
+Everything is vectorized over respondents; a million respondents (10M rows) are generated in
+chunks of `chunk_size` respondents to keep memory bounded.
+
+    python cpt_simulator.py --respondents 1000000 --out cohort.csv --params-out params.csv
+"""
+
+import argparse
+import sys
+import time
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from csv_export import CSV_COLUMNS
+from survey_ladders import ROWS, build_ladder_index
+from survey_scoring import ATTITUDES, certainty_equivalents, risk_attitude_codes
+from survey_variants import load_survey_functions
+
+
+GAINS_PER_SURVEY = 5
+LOSSES_PER_SURVEY = 5
+
+# Median estimates from Tversky & Kahneman (1992)
+TK92 = {"alpha": 0.88, "beta": 0.88, "lambda": 2.25, "gamma": 0.65}
+
+
+# ---------- CPT ----------
+def weight(p: np.ndarray, gamma: np.ndarray) -> np.ndarray:
+    """Tversky-Kahneman probability weighting function."""
+    pg = np.power(p, gamma)
+    return pg / np.power(pg + np.power(1.0 - p, gamma), 1.0 / gamma)
+
+
+def value(x: np.ndarray, alpha: np.ndarray, beta: np.ndarray, lam: np.ndarray) -> np.ndarray:
+    ax = np.abs(x)
+    return np.where(x >= 0, np.power(ax, alpha), -lam * np.power(ax, beta))
+
+
+def inverse_value(v: np.ndarray, alpha: np.ndarray, beta: np.ndarray, lam: np.ndarray) -> np.ndarray:
+    return np.where(
+        v >= 0,
+        np.power(np.abs(v), 1.0 / alpha),
+        -np.power(np.abs(v) / lam, 1.0 / beta),
+    )
+
+
+def cpt_certainty_equivalent(
+    x_ext: np.ndarray, x_oth: np.ndarray, p_ext: np.ndarray,
+    alpha: np.ndarray, beta: np.ndarray, lam: np.ndarray, gamma: np.ndarray,
+) -> np.ndarray:
+    """CE of two-outcome prospects (x_ext with prob p_ext, else x_oth), |x_ext| >= |x_oth|.
+
+    Same-sign prospects are rank-dependent: the extreme outcome gets w(p_ext) and the other
+    one the remaining 1 - w(p_ext). Mixed prospects weight each side separately.
+    """
+    w_ext = weight(p_ext, gamma)
+    mixed = (x_ext * x_oth) < 0
+    w_oth = np.where(mixed, weight(1.0 - p_ext, gamma), 1.0 - w_ext)
+    v = w_ext * value(x_ext, alpha, beta, lam) + w_oth * value(x_oth, alpha, beta, lam)
+    return inverse_value(v, alpha, beta, lam)
+
+
+def sample_parameters(n: int, rng: np.random.Generator) -> Dict[str, np.ndarray]:
+    """Lognormal spread around the TK92 medians, clipped to plausible ranges."""
+    return {
+        "alpha": np.clip(TK92["alpha"] * rng.lognormal(0.0, 0.15, n), 0.2, 1.5),
+        "beta": np.clip(TK92["beta"] * rng.lognormal(0.0, 0.15, n), 0.2, 1.5),
+        "lambda": np.clip(TK92["lambda"] * rng.lognormal(0.0, 0.3, n), 0.5, 6.0),
+        "gamma": np.clip(TK92["gamma"] * rng.lognormal(0.0, 0.15, n), 0.28, 1.5),
+        "sigma": np.clip(rng.lognormal(np.log(0.05), 0.5, n), 0.0, 0.5),
+    }
+
+
+# ---------- Catalog ----------
+def catalog_arrays(script: str = "risky_survey_streamlit_v3.py") -> Dict[str, np.ndarray]:
+    """Arrays for every GAINS/LOSSES prospect of `script`, plus all of its ladders."""
+    ns = load_survey_functions(script)
+    gains, losses = ns["GAINS"], ns["LOSSES"]
+    prospects = gains + losses
+    index = build_ladder_index(prospects, ns["generate_sure_amounts"])
+    ladders = index["ladders"]
+
+    outcomes = np.array([p["outcomes"] for p in prospects], dtype=np.float64)
+    probabilities = np.array([p["probabilities"] for p in prospects], dtype=np.float64)
+    ext = np.argmax(np.abs(outcomes), axis=1)
+    r = np.arange(len(prospects))
+    return {
+        "n_gains": len(gains),
+        "n_losses": len(losses),
+        "outcomes": outcomes,
+        "probabilities": probabilities,
+        "x_ext": outcomes[r, ext],
+        "x_oth": outcomes[r, 1 - ext],
+        "p_ext": probabilities[r, ext],
+        "range": outcomes.max(axis=1) - outcomes.min(axis=1),
+        "phase1": np.array([ladders[(pid, 1, None)] for pid in r]),
+        "phase2": np.array([[ladders[(pid, 2, k)] for k in range(ROWS + 1)] for pid in r]),
+        "description": np.array([p["description"] for p in prospects], dtype=object),
+        "domain_code": np.array([0] * len(gains) + [1] * len(losses), dtype=np.int8),
+        # The app stores round(ev, 2) but classifies risk attitude against the raw EV
+        "expected_value": np.array([ns["expected_value"](p) for p in prospects]),
+        "expected_value_rounded": np.array([round(ns["expected_value"](p), 2) for p in prospects]),
+    }
+
+
+def _draw_prospects(n: int, catalog: Dict, rng: np.random.Generator) -> np.ndarray:
+    """(n, 10) prospect ids: 5 gains + 5 losses per respondent, shuffled like the app does."""
+    gains = np.argsort(rng.random((n, catalog["n_gains"])), axis=1)[:, :GAINS_PER_SURVEY]
+    losses = catalog["n_gains"] + np.argsort(rng.random((n, catalog["n_losses"])), axis=1)[:, :LOSSES_PER_SURVEY]
+    picks = np.concatenate([gains, losses], axis=1)
+    order = np.argsort(rng.random(picks.shape), axis=1)
+    return np.take_along_axis(picks, order, axis=1)
+
+
+# ---------- Simulation ----------
+def simulate_chunk(catalog: Dict, n: int, rng: np.random.Generator, first_id: int = 0) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Simulate `n` respondents; returns (result rows, agent parameters)."""
+    params = sample_parameters(n, rng)
+    ages = rng.integers(18, 81, n)
+    pids = _draw_prospects(n, catalog, rng)
+    per = pids.shape[1]
+
+    flat = pids.ravel()
+    agent = np.repeat(np.arange(n), per)
+    true_ce = cpt_certainty_equivalent(
+        catalog["x_ext"][flat], catalog["x_oth"][flat], catalog["p_ext"][flat],
+        params["alpha"][agent], params["beta"][agent], params["lambda"][agent], params["gamma"][agent],
+    )
+    noise_scale = params["sigma"][agent] * catalog["range"][flat]
+
+    # Phase 1: sure on every row whose amount beats the agent's noisy CE
+    ce1 = true_ce + noise_scale * rng.standard_normal(flat.size)
+    k1 = (catalog["phase1"][flat] > ce1[:, None]).sum(axis=1)
+    # Phase 2: the ladder the app derives from that switch point
+    amounts2 = catalog["phase2"][flat, k1]
+    ce2 = true_ce + noise_scale * rng.standard_normal(flat.size)
+    k2 = (amounts2 > ce2[:, None]).sum(axis=1)
+    choices = (np.arange(ROWS)[None, :] < k2[:, None]).astype(np.int8)
+
+    ce = certainty_equivalents(choices, amounts2, convention="lowest_accepted")
+    ev = catalog["expected_value"][flat]
+
+    # Categorical columns keep the repeated strings out of the hot path; to_csv writes them as text
+    names = np.char.add("agent_", (first_id + np.arange(n)).astype(str))
+    rows = pd.DataFrame({
+        "Name": pd.Categorical.from_codes(agent, names),
+        "Age": ages[agent],
+        "Problem": np.tile(np.arange(1, per + 1), n),
+        "Domain": pd.Categorical.from_codes(catalog["domain_code"][flat], ["Gain Domain", "Loss Domain"]),
+        "Prospect": pd.Categorical.from_codes(flat, catalog["description"]),
+        "Expected_Value": catalog["expected_value_rounded"][flat],
+        "Certainty_Equivalent": ce,
+        "Risk_Attitude": pd.Categorical.from_codes(risk_attitude_codes(ce, ev), ATTITUDES),
+    }, columns=list(CSV_COLUMNS))
+    agents = pd.DataFrame({"Name": names, **params})
+    return rows, agents
+
+
+def simulate(respondents: int, seed: int = 0, chunk_size: int = 100_000,
+             script: str = "risky_survey_streamlit_v3.py") -> Iterator[Tuple[pd.DataFrame, pd.DataFrame]]:
+    catalog = catalog_arrays(script)
+    rng = np.random.default_rng(seed)
+    for start in range(0, respondents, chunk_size):
+        yield simulate_chunk(catalog, min(chunk_size, respondents - start), rng, first_id=start)
+
+
+def write_csv(path: str, respondents: int, seed: int = 0, chunk_size: int = 100_000,
+              params_path: Optional[str] = None) -> int:
+    """Stream a simulated cohort to CSV; returns the number of result rows written."""
+    written = 0
+    for i, (rows, agents) in enumerate(simulate(respondents, seed, chunk_size)):
+        rows.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+        if params_path:
+            agents.to_csv(params_path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+        written += len(rows)
+    return written
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Simulate CPT respondents for the risk survey.")
+    parser.add_argument("--respondents", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=100_000)
+    parser.add_argument("--out", default="simulated_cohort.csv")
+    parser.add_argument("--params-out", help="also write each agent's true CPT parameters")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    n_rows = write_csv(args.out, args.respondents, args.seed, args.chunk_size, args.params_out)
+    print(f"wrote {n_rows} rows for {args.respondents} respondents to {args.out} "
+          f"in {time.perf_counter() - t0:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
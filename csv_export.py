@@ -0,0 +1,150 @@
+"""Streaming CSV export in the `export_csv_blob` layout, for one participant or a whole cohort.
+
+`export_csv_blob` builds a DataFrame and one bytes blob, so memory grows with the export.
+Here records flow through a generator and are encoded `chunk_rows` at a time: a cohort
+export reads the ResponseJournal a page of entries at a time and never holds more than one
+page and one chunk, whatever the number of responses. The chunks can be written to a file
+(`write_csv`) or handed to an HTTP response as they are produced (survey_server's
+admin-only GET /api/responses.csv).
+
+Columns and formatting match `export_csv_blob` byte for byte:
+
+    Name,Age,Problem,Domain,Prospect,Expected_Value,Certainty_Equivalent,Risk_Attitude
+
+    python csv_export.py --journal survey_journal.db --out cohort.csv
+"""
+
+import argparse
+import csv
+import io
+import os
+import sys
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+from response_journal import DEFAULT_JOURNAL_PATH, ResponseJournal
+
+
+CSV_COLUMNS = ("Name", "Age", "Problem", "Domain", "Prospect",
+               "Expected_Value", "Certainty_Equivalent", "Risk_Attitude")
+DEFAULT_CHUNK_ROWS = 1000
+
+Record = Sequence  # one CSV line, in CSV_COLUMNS order
+
+
+# ---------- Records ----------
+def records_from_results(results: Iterable[Dict], name, age) -> Iterator[Record]:
+    """One participant's results (the app's snake_case layout), as export_csv_blob flattens them."""
+    for i, r in enumerate(results, start=1):
+        yield (name, age, i, r["domain"], r["prospect"],
+               r["expected_value"], r["certainty_equivalent"], r["risk_attitude"])
+
+
+def records_from_rows(rows: Iterable[Sequence]) -> Iterator[Record]:
+    """Sheet rows from rows_from_survey_data (timestamp first), minus the timestamp."""
+    for row in rows:
+        yield row[1:9]
+
+
+# ---------- Encoding ----------
+def iter_csv_chunks(records: Iterable[Record], chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                    header: bool = True) -> Iterator[bytes]:
+    """UTF-8 CSV in chunks of at most `chunk_rows` lines; the header travels with the first."""
+    buf = io.StringIO()
+    # pandas' to_csv defaults: minimal quoting, os.linesep, None written as an empty field
+    writer = csv.writer(buf, lineterminator=os.linesep)
+    pending = 0
+    if header:
+        writer.writerow(CSV_COLUMNS)
+    for record in records:
+        writer.writerow(record)
+        pending += 1
+        if pending >= chunk_rows:
+            yield buf.getvalue().encode("utf-8")
+            buf.seek(0)
+            buf.truncate()
+            pending = 0
+    if pending or buf.tell():
+        yield buf.getvalue().encode("utf-8")
+
+
+def write_csv(records: Iterable[Record], out: Union[str, BinaryIO],
+              chunk_rows: int = DEFAULT_CHUNK_ROWS) -> int:
+    """Stream `records` to a path or binary file object; returns the number of bytes written."""
+    if isinstance(out, str):
+        tmp = out + ".tmp"
+        with open(tmp, "wb") as f:
+            written = write_csv(records, f, chunk_rows)
+        os.replace(tmp, out)
+        return written
+    written = 0
+    for chunk in iter_csv_chunks(records, chunk_rows):
+        out.write(chunk)
+        written += len(chunk)
+    return written
+
+
+def journal_csv_chunks(journal: ResponseJournal, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Iterator[bytes]:
+    """Every response in the journal, synced or not, as CSV chunks in submission order."""
+    return iter_csv_chunks(records_from_rows(journal.iter_rows()), chunk_rows)
+
+
+# ---------- Self-check ----------
+def _self_check() -> List[str]:
+    """Byte parity with export_csv_blob, and chunking that doesn't change the output."""
+    import tempfile
+
+    from survey_variants import load_survey_functions
+
+    ns = load_survey_functions("risky_survey_streamlit_v3.py")
+    results = [
+        {"domain": "Gain Domain", "prospect": p["description"], "expected_value": round(ns["expected_value"](p), 2),
+         "certainty_equivalent": ns["generate_sure_amounts"](p, 1)[k], "risk_attitude": "Risk Averse"}
+        for k, p in enumerate(ns["GAINS"][:7])
+    ]
+    results.append({"domain": "Loss Domain", "prospect": 'quoted "prospect", with comma',
+                    "expected_value": -12.5, "certainty_equivalent": -10.25, "risk_attitude": "Risk Seeking"})
+    expected = ns["export_csv_blob"](results, "Ada, L.", 34)
+    for chunk_rows in (1, 3, DEFAULT_CHUNK_ROWS):
+        got = b"".join(iter_csv_chunks(records_from_results(results, "Ada, L.", 34), chunk_rows))
+        assert got == expected, (chunk_rows, got, expected)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        journal = ResponseJournal(os.path.join(tmp, "journal.db"))
+        rows = [["2024-01-01T00:00:00", "Ada, L.", 34, i, r["domain"], r["prospect"], r["expected_value"],
+                 r["certainty_equivalent"], r["risk_attitude"]] for i, r in enumerate(results, start=1)]
+        for _ in range(250):
+            journal.append(rows)
+        out = os.path.join(tmp, "cohort.csv")
+        write_csv(records_from_rows(journal.iter_rows(batch_entries=7)), out, chunk_rows=64)
+        with open(out, "rb") as f:
+            data = f.read()
+        journal.close()
+    assert data == expected + expected.split(b"\n", 1)[1] * 249
+    return [f"{len(results)} results: streamed CSV matches export_csv_blob byte for byte",
+            f"250 journal entries: {len(data)} bytes streamed in chunks of 64 rows"]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Stream every journaled survey response to a CSV file.")
+    parser.add_argument("--journal", default=DEFAULT_JOURNAL_PATH, help="SQLite journal file")
+    parser.add_argument("--out", default="-", help="output file (default: stdout)")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--self-check", action="store_true", help="verify parity with export_csv_blob")
+    args = parser.parse_args(argv)
+
+    if args.self_check:
+        for line in _self_check():
+            print(line)
+        return 0
+    journal = ResponseJournal(args.journal)
+    try:
+        records = records_from_rows(journal.iter_rows())
+        written = write_csv(records, sys.stdout.buffer if args.out == "-" else args.out, args.chunk_rows)
+    finally:
+        journal.close()
+    print(f"{written} bytes written", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""Process-wide cache for the embedded HTML survey (riskysurvey.html).
+
+riskySurvey.py used to read the file on every rerun and risk-survey4.py re-sent a 40 KB
+inline string through the websocket each time. `load_html_asset` reads, minifies and gzips
+the file once per process and only redoes it when the file's mtime or size changes.
+
+`publish_html_asset` writes the minified page (plus a .gz sidecar for proxies with
+`gzip_static`) into the app's static/ folder. With `server.enableStaticServing` the browser
+then loads it over HTTP from /app/static/ under a URL versioned by content hash, with the
+ETag / Last-Modified headers Streamlit sends, and each rerun only carries the iframe URL.
+`embed_html_asset` picks that path when static serving is on and falls back to inlining
+the cached minified page otherwise.
+"""
+
+import contextlib
+import gzip
+import hashlib
+import os
+import re
+import threading
+from typing import Dict, NamedTuple, Optional
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+STATIC_DIR = os.path.join(HERE, "static")
+
+
+class HtmlAsset(NamedTuple):
+    path: str
+    mtime_ns: int
+    size: int
+    html: str       # minified
+    gzipped: bytes
+    etag: str       # content hash of the minified page
+
+
+_cache: Dict[str, HtmlAsset] = {}
+_published: Dict[str, str] = {}  # static file -> etag written by this process
+_lock = threading.Lock()
+
+
+# ---------- Minify ----------
+_COMMENT = re.compile(r"<!--.*?-->", re.DOTALL)
+
+
+def minify_html(text: str) -> str:
+    """Conservative minifier: drops HTML comments, indentation, blank lines and whole-line
+    `//` comments inside <script>. Newlines are kept so JS semicolon insertion is unaffected."""
+    out = []
+    in_script = False
+    for line in _COMMENT.sub("", text).splitlines():
+        stripped = line.strip()
+        if "<script" in stripped:
+            in_script = True
+        if "</script>" in stripped:
+            in_script = False
+        if not stripped or (in_script and stripped.startswith("//")):
+            continue
+        out.append(stripped)
+    return "\n".join(out) + "\n"
+
+
+# ---------- Cache ----------
+def load_html_asset(path: str) -> HtmlAsset:
+    """Minified + gzipped contents of `path`, rebuilt only when the file changes."""
+    if not os.path.isabs(path):
+        path = os.path.join(HERE, path)
+    stat = os.stat(path)
+    asset = _cache.get(path)
+    if asset is not None and asset.mtime_ns == stat.st_mtime_ns and asset.size == stat.st_size:
+        return asset
+
+    with _lock:
+        asset = _cache.get(path)
+        if asset is not None and asset.mtime_ns == stat.st_mtime_ns and asset.size == stat.st_size:
+            return asset
+        with open(path, "r", encoding="utf-8") as f:
+            html = minify_html(f.read())
+        data = html.encode("utf-8")
+        asset = HtmlAsset(
+            path=path,
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+            html=html,
+            # mtime=0 keeps the .gz byte-identical across rebuilds of the same content
+            gzipped=gzip.compress(data, compresslevel=9, mtime=0),
+            etag=hashlib.sha256(data).hexdigest()[:16],
+        )
+        _cache[path] = asset
+        return asset
+
+
+# ---------- Static serving ----------
+def publish_html_asset(path: str, static_dir: str = STATIC_DIR) -> str:
+    """Write the minified page and its .gz into `static_dir` if they changed.
+
+    Returns the app-relative URL, versioned by the content hash so browsers never
+    reuse a stale copy after the source changes.
+    """
+    asset = load_html_asset(path)
+    name = os.path.splitext(os.path.basename(asset.path))[0] + ".min.html"
+    target = os.path.join(static_dir, name)
+    if _published.get(target) != asset.etag and _read_etag(target + ".etag") != asset.etag:
+        os.makedirs(static_dir, exist_ok=True)
+        for suffix, data in (("", asset.html.encode("utf-8")), (".gz", asset.gzipped),
+                             (".etag", asset.etag.encode("utf-8"))):
+            _write_atomic(target + suffix, data)
+    _published[target] = asset.etag
+    return f"app/static/{name}?v={asset.etag}"
+
+
+def _write_atomic(path: str, data: bytes) -> None:
+    # Per process and thread, so concurrent publishers never write to the same temporary file
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(tmp)
+        raise
+
+
+def _read_etag(path: str) -> Optional[str]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def embed_html_asset(path: str, height: int = 1000, scrolling: bool = True) -> None:
+    """Render the page: by URL when static serving is enabled, inline otherwise."""
+    import streamlit as st
+    import streamlit.components.v1 as components
+
+    if st.get_option("server.enableStaticServing"):
+        components.iframe(publish_html_asset(path), height=height, scrolling=scrolling)
+    else:
+        components.html(load_html_asset(path).html, height=height, scrolling=scrolling)
@@ -0,0 +1,416 @@
+"""Headless load test for the Streamlit survey scripts.
+
+Simulates N respondents against one script (default: risky_survey_streamlit_v3.py) with
+Streamlit's AppTest. Each respondent enters name/age, starts the survey, answers every ladder
+of every problem in both phases and ends on the results/export page.
+
+AppTest swaps process-wide runtime globals on every run, so sessions can't safely run on
+parallel threads. Instead all N sessions are kept alive in this process and stepped
+round-robin, one rerun at a time, which is how a single Streamlit process serializes script
+work under the GIL anyway. The report gives rerun latency percentiles, reruns/s and
+completed sessions/s, bytes and deltas sent per rerun, and memory per live session.
+full_reruns_per_session counts only the reruns that ran the whole script (fragment runs that
+escalate with st.rerun() included).
+Finished sessions' pickled session state is checked against the script's
+SESSION_STATE_BUDGET (or --state-budget); exceeding it fails the run like an incomplete one.
+
+    python load_test.py --sessions 200
+    python load_test.py --script risk_survey_consolidated.py --sessions 50 --json report.json
+    python load_test.py --mode bisection --sessions 200
+    python load_test.py --mode switch --sessions 200
+    python load_test.py --script riskySurvey.py --sessions 50
+
+Clicks on widgets inside an st.fragment are replayed as fragment-scoped reruns, as the browser
+sends them (AppTest itself only does full reruns), so scripts that wrap their ladder in a
+fragment are measured the way they actually run.
+
+Message accounting and fragment replay hook LocalScriptRunner.run and read a few private
+Streamlit attributes, checked against STREAMLIT_CHECKED_VERSION. The hook is installed only
+for the duration of each measured rerun and then restored. On any other Streamlit version,
+or if those internals have moved, the harness warns once and falls back to AppTest's public
+API: reruns are still counted and timed, but bytes/deltas are reported as null and fragment
+clicks run as full reruns.
+
+Scripts that only embed the HTML survey (riskySurvey.py, risk-survey4.py) have no Streamlit
+widgets to drive; their sessions just rerun a few times so bytes per rerun can be compared.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import pickle
+import random
+import resource
+import statistics
+import sys
+import time
+import tracemalloc
+import warnings
+from typing import Callable, Dict, Generator, List, Optional, Tuple
+from urllib import parse
+
+import streamlit
+from streamlit.testing.v1 import AppTest
+
+try:
+    # Private modules; only used while the runner hook is installed (see runner_hook)
+    from streamlit.runtime.scriptrunner_utils.script_requests import RerunData
+    from streamlit.testing.v1.element_tree import parse_tree_from_messages
+    from streamlit.testing.v1.local_script_runner import LocalScriptRunner, require_widgets_deltas
+except ImportError:
+    LocalScriptRunner = None
+
+from survey_variants import load_survey_functions
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SCRIPT = os.path.join(HERE, "risky_survey_streamlit_v3.py")
+EMBEDDED_RERUNS = 5
+
+# The Streamlit release whose AppTest internals (LocalScriptRunner.run, forward_msgs, event_data,
+# _requests._rerun_data, _script_thread) the runner hook was written and checked against
+STREAMLIT_CHECKED_VERSION = "1.65.0"
+
+
+# ---------- Per-rerun message accounting ----------
+# LocalScriptRunner is created fresh inside every AppTest.run(); runner_hook wraps its run()
+# for one rerun to see the ForwardMsgs the browser would have received for that rerun.
+_last_run: Dict[str, Optional[int]] = {"msgs": None, "deltas": None, "bytes": None}
+_last_widget_fragments: Dict[str, str] = {}  # widget id -> id of the fragment it was drawn in
+_last_page: List = []  # the composed message queue after the last run (what the browser shows)
+_pending_fragment: Dict = {"id": None, "page": []}
+_original_runner_run = LocalScriptRunner.run if LocalScriptRunner is not None else None
+_hook_warned = False
+_escalated = [False]  # the last fragment run turned into a full rerun
+
+
+def hook_supported() -> bool:
+    """True if the private internals runner_hook needs are the ones it was checked against."""
+    return (LocalScriptRunner is not None and streamlit.__version__ == STREAMLIT_CHECKED_VERSION
+            and all(hasattr(LocalScriptRunner, name) for name in ("run", "forward_msgs", "start", "join")))
+
+
+@contextlib.contextmanager
+def runner_hook():
+    """Install the measuring LocalScriptRunner.run for one rerun and always restore the original.
+
+    Yields False (and installs nothing) where the hook isn't supported; see hook_supported.
+    """
+    global _hook_warned
+    _last_run.update(msgs=None, deltas=None, bytes=None)
+    _escalated[0] = False
+    _last_widget_fragments.clear()
+    if not hook_supported():
+        if not _hook_warned:
+            _hook_warned = True
+            warnings.warn(f"load_test: Streamlit {streamlit.__version__} is not the checked "
+                          f"{STREAMLIT_CHECKED_VERSION}; measuring through the public AppTest API only "
+                          "(no bytes/deltas, fragment clicks run as full reruns)", RuntimeWarning, stacklevel=3)
+        yield False
+        return
+    LocalScriptRunner.run = _measured_runner_run
+    try:
+        yield True
+    finally:
+        LocalScriptRunner.run = _original_runner_run
+
+
+def _run_fragment(runner: LocalScriptRunner, fragment_id: str, page: List, widget_state=None,
+                  query_params=None, timeout: float = 3, page_hash: str = ""):
+    """LocalScriptRunner.run, scoped to one fragment like a click inside st.fragment.
+
+    The runner is created with a full rerun already queued; replace it rather than calling
+    request_rerun, which would fold the fragment request into that full rerun. Its queue is
+    seeded with the previous page so elements outside the fragment survive, as in the browser.
+    """
+    for msg in page:
+        runner.forward_msg_queue.enqueue(msg)
+    rerun_data = RerunData(
+        widget_states=widget_state,
+        query_string=parse.urlencode(query_params or {}, doseq=True),
+        page_script_hash=page_hash,
+        fragment_id_queue=[fragment_id],
+    )
+    requests = getattr(runner, "_requests", None)
+    if requests is None or not hasattr(requests, "_rerun_data"):
+        raise RuntimeError(f"LocalScriptRunner internals changed (checked against Streamlit {STREAMLIT_CHECKED_VERSION}); "
+                           "fragment replay is unavailable")
+    with requests._lock:
+        requests._rerun_data = rerun_data
+    try:
+        if not runner._script_thread:
+            runner.start()
+        require_widgets_deltas(runner, timeout)
+    finally:
+        runner.join()
+    return parse_tree_from_messages(_page_order(runner.forward_msgs()))
+
+
+def _page_order(msgs: List) -> List:
+    """The browser places deltas by path; the queue has the fragment's rows appended last."""
+    deltas = sorted((m for m in msgs if m.HasField("delta")), key=lambda m: tuple(m.metadata.delta_path))
+    return [m for m in msgs if not m.HasField("delta")] + deltas
+
+
+def _measured_runner_run(self, *args, **kwargs):
+    fragment_id = _pending_fragment["id"]
+    if fragment_id:
+        tree = _run_fragment(self, fragment_id, _pending_fragment["page"], *args, **kwargs)
+    else:
+        tree = _original_runner_run(self, *args, **kwargs)
+    _last_page[:] = _page_order(self.forward_msgs())
+    # A fragment run's queue starts with the seeded page; count only what the run itself sent
+    msgs = [d["forward_msg"] for d in self.event_data if "forward_msg" in d] if fragment_id else _last_page
+    _last_run["msgs"] = len(msgs)
+    _last_run["deltas"] = sum(1 for m in msgs if m.HasField("delta"))
+    _last_run["bytes"] = sum(m.ByteSize() for m in msgs)
+    # A fragment that calls st.rerun() escalates to a full run, whose deltas have no fragment id
+    _escalated[0] = bool(fragment_id) and any(m.HasField("delta") and not m.delta.fragment_id for m in msgs)
+    _last_widget_fragments.clear()
+    for m in msgs:
+        if m.HasField("delta") and m.delta.fragment_id and m.delta.HasField("new_element"):
+            element = m.delta.new_element
+            widget_id = getattr(getattr(element, element.WhichOneof("type")), "id", None)
+            if widget_id:
+                _last_widget_fragments[widget_id] = m.delta.fragment_id
+    return tree
+
+
+# ---------- Respondent ----------
+class Recorder:
+    def __init__(self):
+        self.samples: List[Dict] = []
+        self._fragments: Dict[int, Dict[str, str]] = {}  # id(AppTest) -> widget id -> fragment id
+        self._pages: Dict[int, List] = {}  # id(AppTest) -> messages currently on its page
+
+    def fragment_of(self, at: AppTest, widget) -> Optional[Tuple[str, List]]:
+        """(fragment id, current page) if `widget` was drawn in a fragment, whose rerun a click
+        on it triggers; None for widgets that trigger a full rerun."""
+        fragment_id = self._fragments.get(id(at), {}).get(widget.id)
+        return (fragment_id, self._pages[id(at)]) if fragment_id else None
+
+    def rerun(self, action: Callable[[], AppTest], trigger: str,
+              fragment: Optional[Tuple[str, List]] = None) -> AppTest:
+        fragment_id, page = fragment or (None, [])
+        with runner_hook() as hooked:
+            _pending_fragment.update(id=fragment_id if hooked else None, page=page)
+            t0 = time.perf_counter()
+            try:
+                at = action()
+            finally:
+                _pending_fragment.update(id=None, page=[])
+            elapsed = time.perf_counter() - t0
+        fragment_only = hooked and fragment_id and not _escalated[0]
+        self.samples.append({"trigger": trigger, "scope": "fragment" if fragment_only else "app",
+                             "seconds": elapsed, **_last_run})
+        if hooked:
+            self._fragments.setdefault(id(at), {}).update(_last_widget_fragments)
+            self._pages[id(at)] = list(_last_page)
+        if at.exception:
+            raise RuntimeError(f"script raised during {trigger}: {at.exception[0].message}")
+        return at
+
+
+def _continue_button(at: AppTest):
+    for b in at.button:
+        if b.label == "Continue":
+            return b
+    return None
+
+
+def _bisection_buttons(at: AppTest):
+    return [b for b in at.button if b.label == "Prefer Gamble" or b.label.startswith("Prefer Sure")]
+
+
+def respondent(script: str, seed: int, rec: Recorder, timeout: float,
+               mode: Optional[str] = None) -> Generator[AppTest, None, AppTest]:
+    """Drive one participant through the survey, yielding after every rerun.
+    Returns the finished AppTest."""
+    rng = random.Random(seed)
+    at = AppTest.from_file(script, default_timeout=timeout)
+    if mode:
+        at.query_params["mode"] = mode
+    yield rec.rerun(at.run, "load")
+
+    if not at.text_input:
+        # Embedded HTML survey: everything happens in the iframe, so just rerun
+        for _ in range(EMBEDDED_RERUNS):
+            yield rec.rerun(at.run, "rerun")
+        return at
+
+    at.text_input[0].input(f"Respondent {seed}")
+    yield rec.rerun(at.run, "input")
+    start = next(b for b in at.button if b.label == "Start Survey")
+    yield rec.rerun(start.click().run, "start")
+
+    while not at.success and _bisection_buttons(at):
+        # Adaptive mode: one sure amount per rerun (just the fragment, if in one)
+        button = rng.choice(_bisection_buttons(at))
+        yield rec.rerun(button.click().run, "answer", rec.fragment_of(at, button))
+
+    while _continue_button(at) is not None and not at.success:
+        in_form = len(at.get("form")) > 0
+        if at.button_group:
+            # Switch-point mode: one widget per phase, its options are switch points 0..7
+            switch_point = at.button_group[0]
+            switch_point.set_value(rng.randint(0, len(switch_point.options) - 1))
+            yield rec.rerun(_continue_button(at).click().run, "submit")
+            continue
+        switch = rng.randint(0, len(at.radio))
+        for i in range(len(at.radio)):
+            radio = at.radio[i]
+            if radio.disabled or radio.value is not None:
+                continue
+            radio.set_value(radio.options[1] if i < switch else radio.options[0])
+            if not in_form:
+                # Live-validated scripts rerun on every click (just the fragment, if in one)
+                yield rec.rerun(at.run, "click", rec.fragment_of(at, radio))
+        button = _continue_button(at)
+        yield rec.rerun(button.click().run, "submit", rec.fragment_of(at, button))
+    # The last submit rendered the results table and built the JSON/CSV export blobs
+    return at
+
+
+def _session_state_bytes(at: AppTest) -> int:
+    try:
+        return len(pickle.dumps(at.session_state.to_dict()))
+    except Exception:
+        return 0
+
+
+def _state_budget(script: str) -> Optional[int]:
+    try:
+        return load_survey_functions(script).get("SESSION_STATE_BUDGET")
+    except Exception:
+        return None
+
+
+def _mean(values) -> Optional[float]:
+    """Mean of the measured values; None when message accounting was unavailable."""
+    values = [v for v in values if v is not None]
+    return statistics.fmean(values) if values else None
+
+
+def _round(value: Optional[float], digits: int) -> Optional[float]:
+    return None if value is None else round(value, digits)
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    qs = statistics.quantiles(values, n=100, method="inclusive") if len(values) > 1 else [values[0]] * 99
+    return {
+        "p50_ms": round(qs[49] * 1000, 3),
+        "p90_ms": round(qs[89] * 1000, 3),
+        "p99_ms": round(qs[98] * 1000, 3),
+        "max_ms": round(max(values) * 1000, 3),
+        "mean_ms": round(statistics.fmean(values) * 1000, 3),
+    }
+
+
+# ---------- Driver ----------
+def run_load_test(script: str = DEFAULT_SCRIPT, sessions: int = 50, seed: int = 0, timeout: float = 30,
+                  trace_memory: bool = False, mode: Optional[str] = None,
+                  state_budget: Optional[int] = None) -> Dict:
+    # One throwaway session first so imports and caches aren't billed to the measured sessions
+    for _ in respondent(script, seed - 1, Recorder(), timeout, mode):
+        pass
+
+    if trace_memory:
+        tracemalloc.start()
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    traced_before = tracemalloc.get_traced_memory()[0] if trace_memory else 0
+
+    rec = Recorder()
+    active = [respondent(script, seed + i, rec, timeout, mode) for i in range(sessions)]
+    finished: List[AppTest] = []
+    t0 = time.perf_counter()
+    while active:
+        still_active = []
+        for gen in active:
+            try:
+                next(gen)
+            except StopIteration as done:
+                if done.value is not None and (done.value.success or not done.value.text_input):
+                    finished.append(done.value)
+                continue
+            still_active.append(gen)
+        active = still_active
+    wall = time.perf_counter() - t0
+
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    traced_after = tracemalloc.get_traced_memory()[0] if trace_memory else 0
+    if trace_memory:
+        tracemalloc.stop()
+
+    state_bytes = [_session_state_bytes(at) for at in finished]
+    if state_budget is None:
+        state_budget = _state_budget(script)
+
+    by_trigger: Dict[str, List[Dict]] = {}
+    for s in rec.samples:
+        by_trigger.setdefault(s["trigger"], []).append(s)
+
+    report = {
+        "script": os.path.basename(script),
+        "mode": mode,
+        "sessions": sessions,
+        "completed": len(finished),
+        "wall_seconds": round(wall, 3),
+        "reruns": len(rec.samples),
+        "reruns_per_second": round(len(rec.samples) / wall, 2) if wall else None,
+        "sessions_per_second": round(len(finished) / wall, 3) if wall else None,
+        "latency": _percentiles([s["seconds"] for s in rec.samples]),
+        "latency_by_trigger": {t: _percentiles([s["seconds"] for s in v]) for t, v in by_trigger.items()},
+        "messages_by_trigger": {
+            t: {
+                "bytes_per_rerun": _round(_mean(s["bytes"] for s in v), 1),
+                "deltas_per_rerun": _round(_mean(s["deltas"] for s in v), 2),
+                "fragment_reruns": sum(s["scope"] == "fragment" for s in v),
+            }
+            for t, v in by_trigger.items()
+        },
+        "streamlit_version": streamlit.__version__,
+        "message_accounting": hook_supported(),
+        "bytes_per_rerun": _round(_mean(s["bytes"] for s in rec.samples), 1),
+        "deltas_per_rerun": _round(_mean(s["deltas"] for s in rec.samples), 2),
+        "reruns_per_session": round(len(rec.samples) / sessions, 1),
+        "full_reruns_per_session": round(sum(s["scope"] == "app" for s in rec.samples) / sessions, 1),
+        "session_state_bytes": round(statistics.fmean(state_bytes), 1) if state_bytes else None,
+        "session_state_max_bytes": max(state_bytes) if state_bytes else None,
+        "session_state_budget": state_budget,
+        "over_state_budget": sum(b > state_budget for b in state_bytes) if state_budget else 0,
+        "rss_kb_per_session": round((rss_after - rss_before) / sessions, 1),
+    }
+    if trace_memory:
+        report["traced_bytes_per_session"] = round((traced_after - traced_before) / sessions, 1)
+    return report
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--script", default=DEFAULT_SCRIPT, help="survey script to load (default: v3)")
+    parser.add_argument("--sessions", type=int, default=50, help="number of simulated respondents")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=30, help="per-rerun timeout in seconds")
+    parser.add_argument("--trace-memory", action="store_true", help="also measure with tracemalloc (slower)")
+    parser.add_argument("--mode", choices=["ladder", "bisection", "switch"], help="elicitation mode (?mode= query param)")
+    parser.add_argument("--state-budget", type=int, help="max pickled session state in bytes "
+                        "(default: the script's SESSION_STATE_BUDGET, if any)")
+    parser.add_argument("--json", help="write the report to this file as well")
+    args = parser.parse_args(argv)
+
+    script = args.script if os.path.isabs(args.script) else os.path.join(HERE, args.script)
+    report = run_load_test(script, args.sessions, args.seed, args.timeout, args.trace_memory, args.mode,
+                           args.state_budget)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    return 0 if report["completed"] == args.sessions and not report["over_state_budget"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,288 @@
+"""Prospect catalogs: loaded from data files, and compiled into immutable precomputed records.
+
+Catalogs live in catalogs/ as JSON or TOML: a table of named sections ("gains", "losses",
+"prospects", ...), each a list of {outcomes, probabilities, description}. `load_prospects`
+validates a file on first load (two or more outcomes, one probability per outcome, each in
+[0, 1], summing to 1) and writes the validated sections to a pickled cache next to it
+(`<file>.cache`). Later loads, in any process, read the cache as long as the source's size
+and mtime are unchanged, and repeated loads in one process (every Streamlit rerun) only
+stat the file.
+
+The scripts keep prospects as raw dicts and recompute `expected_value`, `is_loss_domain`
+and the description (and in some variants `describe_prospect`) for the current prospect on
+every rerun. `compile_catalog` does that once per process, using the script's own helpers
+so each variant keeps its exact numbers, and returns a tuple of frozen, slotted `Prospect`
+records whose position in the tuple is the prospect id. Hot paths then read attributes.
+
+    python prospect_catalog.py    # per-rerun cost: raw dicts vs compiled records, cache vs parse
+"""
+
+import contextlib
+import json
+import math
+import os
+import pickle
+import sys
+import threading
+import timeit
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CACHE_SUFFIX = ".cache"
+CACHE_VERSION = 1
+PROBABILITY_TOLERANCE = 1e-6
+
+Sections = Dict[str, List[Dict]]
+
+_loaded: Dict[str, Tuple[int, int, Sections]] = {}  # path -> (mtime_ns, size, sections)
+_lock = threading.Lock()
+
+
+@dataclass(frozen=True, slots=True)
+class Prospect:
+    pid: int
+    outcomes: Tuple[float, ...]
+    probabilities: Tuple[float, ...]
+    description: str
+    expected_value: float
+    rounded_ev: float              # round(expected_value, 2), as results store it
+    domain: str                    # "Gain Domain" / "Loss Domain"
+    is_loss: bool
+    low: float                     # worst outcome
+    high: float                    # best outcome
+    phase1_ladder: Tuple[float, ...]
+
+
+def compile_catalog(
+    prospects: Sequence[Dict],
+    expected_value: Callable[[Dict], float],
+    is_loss_domain: Callable[[Dict], bool],
+    generate_sure_amounts: Callable,
+    describe: Optional[Callable[[Dict], str]] = None,
+) -> Tuple[Prospect, ...]:
+    """One Prospect per dict in `prospects`, in order; build once per process (st.cache_resource)."""
+    describe = describe or (lambda p: p["description"])
+    catalog = []
+    for pid, p in enumerate(prospects):
+        ev = expected_value(p)
+        loss = bool(is_loss_domain(p))
+        catalog.append(Prospect(
+            pid=pid,
+            outcomes=tuple(p["outcomes"]),
+            probabilities=tuple(p["probabilities"]),
+            description=describe(p),
+            expected_value=ev,
+            rounded_ev=round(ev, 2),
+            domain="Loss Domain" if loss else "Gain Domain",
+            is_loss=loss,
+            low=float(min(p["outcomes"])),
+            high=float(max(p["outcomes"])),
+            phase1_ladder=tuple(generate_sure_amounts(p, phase=1)),
+        ))
+    return tuple(catalog)
+
+
+# ---------- Loading ----------
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def validate_prospect(item, where: str) -> Dict:
+    """Return the prospect as a plain dict, or raise ValueError naming `where` and the problem."""
+    if not isinstance(item, dict):
+        raise ValueError(f"{where}: expected a table with outcomes, probabilities and description")
+    outcomes, probabilities = item.get("outcomes"), item.get("probabilities")
+    if not isinstance(outcomes, list) or len(outcomes) < 2 or not all(_is_number(o) for o in outcomes):
+        raise ValueError(f"{where}: outcomes must be a list of two or more numbers")
+    if not isinstance(probabilities, list) or len(probabilities) != len(outcomes):
+        raise ValueError(f"{where}: probabilities must have one entry per outcome")
+    if not all(_is_number(p) and 0 <= p <= 1 for p in probabilities):
+        raise ValueError(f"{where}: probabilities must be numbers between 0 and 1")
+    if abs(math.fsum(probabilities) - 1) > PROBABILITY_TOLERANCE:
+        raise ValueError(f"{where}: probabilities sum to {math.fsum(probabilities):g}, not 1")
+    description = item.get("description")
+    if not isinstance(description, str) or not description.strip():
+        raise ValueError(f"{where}: description must be a non-empty string")
+    return {"outcomes": outcomes, "probabilities": probabilities, "description": description}
+
+
+def parse_catalog(path: str) -> Sections:
+    """Read and validate a JSON or TOML catalog; every list at the top level is a section."""
+    if path.endswith(".toml"):
+        import tomllib
+
+        with open(path, "rb") as f:
+            data = tomllib.load(f)
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    if not isinstance(data, dict):
+        raise ValueError(f"{path}: expected a table of prospect sections")
+    sections = {
+        name: [validate_prospect(item, f"{path}: {name}[{i}]") for i, item in enumerate(items)]
+        for name, items in data.items() if isinstance(items, list)
+    }
+    if not sections:
+        raise ValueError(f"{path}: no prospect sections")
+    return sections
+
+
+def _read_cache(cache_path: str, mtime_ns: int, size: int) -> Optional[Sections]:
+    try:
+        with open(cache_path, "rb") as f:
+            cached = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+        return None
+    if (isinstance(cached, dict) and cached.get("version") == CACHE_VERSION
+            and cached.get("mtime_ns") == mtime_ns and cached.get("size") == size):
+        return cached["sections"]
+    return None
+
+
+def _write_cache(cache_path: str, mtime_ns: int, size: int, sections: Sections) -> None:
+    tmp = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            pickle.dump({"version": CACHE_VERSION, "mtime_ns": mtime_ns, "size": size, "sections": sections},
+                        f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, cache_path)
+    except OSError:
+        # A read-only deployment still works, it just validates on every process start
+        with contextlib.suppress(OSError):
+            os.remove(tmp)
+
+
+def load_catalog_file(path: str) -> Sections:
+    """Validated sections of the catalog at `path` (relative paths are from this directory)."""
+    if not os.path.isabs(path):
+        path = os.path.join(HERE, path)
+    stat = os.stat(path)
+    hit = _loaded.get(path)
+    if hit is not None and hit[:2] == (stat.st_mtime_ns, stat.st_size):
+        return hit[2]
+
+    with _lock:
+        hit = _loaded.get(path)
+        if hit is not None and hit[:2] == (stat.st_mtime_ns, stat.st_size):
+            return hit[2]
+        cache_path = path + CACHE_SUFFIX
+        sections = _read_cache(cache_path, stat.st_mtime_ns, stat.st_size)
+        if sections is None:
+            sections = parse_catalog(path)
+            _write_cache(cache_path, stat.st_mtime_ns, stat.st_size, sections)
+        _loaded[path] = (stat.st_mtime_ns, stat.st_size, sections)
+        return sections
+
+
+def load_prospects(path: str, section: str) -> List[Dict]:
+    """One section of a catalog file as a list of prospect dicts, e.g. GAINS in the scripts."""
+    sections = load_catalog_file(path)
+    if section not in sections:
+        raise ValueError(f"{path}: no section {section!r} (has {', '.join(sorted(sections))})")
+    return list(sections[section])
+
+
+# ---------- Benchmark ----------
+def _benchmark(script: str = "risky_survey_streamlit_v3.py", number: int = 20_000) -> List[str]:
+    """What one v3 rerun derives from the current prospect: dict helpers vs record fields."""
+    from survey_variants import load_survey_functions
+
+    ns = load_survey_functions(script)
+    raw = ns["GAINS"] + ns["LOSSES"]
+    expected_value, is_loss_domain, gen = ns["expected_value"], ns["is_loss_domain"], ns["generate_sure_amounts"]
+    catalog = compile_catalog(raw, expected_value, is_loss_domain, gen)
+
+    for p, rec in zip(raw, catalog):
+        assert rec.expected_value == expected_value(p) and rec.is_loss == is_loss_domain(p)
+        assert rec.phase1_ladder == tuple(gen(p, phase=1))
+
+    # Both return what the page renders, so neither loop body can be optimised away
+    def from_dicts():
+        shown = []
+        for p in raw:
+            ev = expected_value(p)
+            domain = "Loss Domain" if is_loss_domain(p) else "Gain Domain"
+            text = f"**Gamble:** {p['description']}"
+            evs = f"**Expected Value:** ${ev:.2f}"
+            shown.append((domain, text, evs, float(min(p["outcomes"])), float(max(p["outcomes"]))))
+        return shown
+
+    def from_records():
+        shown = []
+        for rec in catalog:
+            ev = rec.expected_value
+            text = f"**Gamble:** {rec.description}"
+            evs = f"**Expected Value:** ${ev:.2f}"
+            shown.append((rec.domain, text, evs, rec.low, rec.high))
+        return shown
+
+    assert from_dicts() == from_records()
+
+    per_prospect = number * len(raw)
+    t_dict = min(timeit.repeat(from_dicts, number=number, repeat=3)) / per_prospect
+    t_rec = min(timeit.repeat(from_records, number=number, repeat=3)) / per_prospect
+    t_ladder = min(timeit.repeat(lambda: gen(raw[0], phase=1), number=number, repeat=3)) / number
+    return [
+        f"{len(catalog)} prospects compiled; fields match the script's helpers",
+        f"per rerun, current prospect: dicts {t_dict * 1e6:.2f} us, records {t_rec * 1e6:.2f} us "
+        f"({t_dict / t_rec:.1f}x)",
+        f"phase-1 ladder: generate_sure_amounts {t_ladder * 1e6:.2f} us, record field ~0 us",
+    ]
+
+
+def _cache_check(items: int = 10_000) -> List[str]:
+    """Cold parse + validation vs the compiled cache on a large synthetic catalog."""
+    import random
+    import tempfile
+
+    rng = random.Random(0)
+    sections = {"gains": [], "losses": []}
+    for i in range(items):
+        p = round(rng.uniform(0.01, 0.99), 2)
+        x = rng.randrange(10, 1000)
+        name, sign = ("gains", 1) if i % 2 else ("losses", -1)
+        sections[name].append({"outcomes": [0, sign * x], "probabilities": [round(1 - p, 2), p],
+                               "description": f"{p:.0%} chance to {'win' if sign > 0 else 'lose'} ${x}"})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "large.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(sections, f)
+
+        t0 = timeit.default_timer()
+        cold = load_catalog_file(path)
+        t_cold = timeit.default_timer() - t0
+        _loaded.clear()  # as in a fresh process
+        t0 = timeit.default_timer()
+        warm = load_catalog_file(path)
+        t_warm = timeit.default_timer() - t0
+        t0 = timeit.default_timer()
+        load_prospects(path, "gains")
+        t_rerun = timeit.default_timer() - t0
+        assert warm == cold == sections
+
+        bad = os.path.join(tmp, "bad.json")
+        for item, reason in (({"outcomes": [0, 10], "probabilities": [0.5, 0.4], "description": "x"}, "sum to"),
+                             ({"outcomes": [10], "probabilities": [1.0], "description": "x"}, "two or more")):
+            with open(bad, "w", encoding="utf-8") as f:
+                json.dump({"gains": [item]}, f)
+            try:
+                load_catalog_file(bad)
+            except ValueError as e:
+                assert reason in str(e), e
+            else:
+                raise AssertionError(f"accepted an invalid prospect ({reason})")
+        _loaded.clear()
+
+    return [
+        f"{items} prospects: parse + validate {t_cold * 1e3:.1f} ms, compiled cache {t_warm * 1e3:.1f} ms "
+        f"({t_cold / t_warm:.0f}x), same-process reload {t_rerun * 1e6:.0f} us",
+        "invalid catalogs are rejected (probability sum, outcome count)",
+    ]
+
+
+if __name__ == "__main__":
+    for line in _benchmark(*sys.argv[1:2]) + _cache_check():
+        print(line)
@@ -0,0 +1,358 @@
+"""Opt-in per-rerun instrumentation for the Streamlit survey scripts.
+
+Run a survey script through this file instead of directly and every rerun is recorded: wall
+time, time spent in the ladder, validation and export helpers, widgets emitted, pickled
+session-state size and what triggered it. The script itself is unchanged; this file execs it
+each rerun inside a timing envelope, and wraps the helpers named in SECTIONS as the script
+defines or imports them.
+
+    RISK_SURVEY_METRICS_PORT=9464 streamlit run rerun_metrics.py -- risky_survey_streamlit_v3.py
+    curl localhost:9464/metrics          # Prometheus text format
+    curl localhost:9464/metrics.jsonl    # the last RING_SIZE reruns, one JSON object each
+    curl localhost:9464/sessions.json    # with RISK_SURVEY_MEMORY_PROFILE=1: session_memory report
+    python rerun_metrics.py              # self-check: a few AppTest sessions, then both dumps
+
+Records go to an in-process ring buffer shared by every session. Triggers are inferred from
+session state: "load" (a session's first run, or its state was reset), "rerun" (after
+st.rerun), "phase_change" (problem or phase advanced), "click" (exactly one keyed widget
+changed) and "submit" (anything else, e.g. a button or a form submitted with several
+changes). Fragment reruns only run the fragment, not the script, so they are not recorded;
+load_test.py measures those.
+"""
+
+import collections
+import functools
+import http.server
+import json
+import os
+import pickle
+import sys
+import threading
+import time
+from typing import Callable, Deque, Dict, List, Optional
+
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+import session_memory
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SCRIPT = "risky_survey_streamlit_v3.py"
+RING_SIZE = 4096
+DEFAULT_PORT = 9464
+
+# Script-level names whose calls are timed, and the section their time is reported under
+SECTIONS = {
+    "generate_sure_amounts": "ladders",
+    "ladder_by_id": "ladders",
+    "lookup_ladder": "ladders",
+    "check_consistency": "validation",
+    "consistency_message": "validation",
+    "monotonic_violation_for_mask": "validation",
+    "is_complete": "validation",
+    "export_json_blob": "export",
+    "export_csv_blob": "export",
+}
+
+# Session-state keys whose change during a run (or in a callback before it) is a phase change
+PROGRESS_KEYS = ("started", "index", "phase")
+
+Record = Dict
+
+
+# ---------- Ring buffer ----------
+class RerunLog:
+    """The last `size` rerun records plus cumulative per-trigger and per-section totals."""
+
+    def __init__(self, size: int = RING_SIZE):
+        self._records: Deque[Record] = collections.deque(maxlen=size)
+        self._lock = threading.Lock()
+        self._reruns: Dict[str, int] = collections.Counter()
+        self._seconds: Dict[str, float] = collections.Counter()
+        self._sections: Dict[str, float] = collections.Counter()
+
+    def append(self, record: Record) -> None:
+        with self._lock:
+            self._records.append(record)
+            self._reruns[record["trigger"]] += 1
+            self._seconds[record["trigger"]] += record["seconds"]
+            for section, seconds in record["sections"].items():
+                self._sections[section] += seconds
+
+    def records(self) -> List[Record]:
+        with self._lock:
+            return list(self._records)
+
+    def to_jsonl(self) -> str:
+        return "".join(json.dumps(r, separators=(",", ":")) + "\n" for r in self.records())
+
+    def to_prometheus(self) -> str:
+        with self._lock:
+            records = list(self._records)
+            reruns, seconds, sections = dict(self._reruns), dict(self._seconds), dict(self._sections)
+        lines = [
+            "# HELP risk_survey_rerun_seconds Script rerun wall time by trigger (quantiles over the ring buffer).",
+            "# TYPE risk_survey_rerun_seconds summary",
+        ]
+        by_trigger: Dict[str, List[float]] = collections.defaultdict(list)
+        for r in records:
+            by_trigger[r["trigger"]].append(r["seconds"])
+        for trigger in sorted(reruns):
+            durations = sorted(by_trigger.get(trigger, ()))
+            for q in (0.5, 0.9, 0.99):
+                if durations:
+                    value = durations[min(len(durations) - 1, int(q * len(durations)))]
+                    lines.append(f'risk_survey_rerun_seconds{{trigger="{trigger}",quantile="{q}"}} {value:.6f}')
+            lines.append(f'risk_survey_rerun_seconds_sum{{trigger="{trigger}"}} {seconds[trigger]:.6f}')
+            lines.append(f'risk_survey_rerun_seconds_count{{trigger="{trigger}"}} {reruns[trigger]}')
+        lines += [
+            "# HELP risk_survey_section_seconds_total Time spent in instrumented helpers, by section.",
+            "# TYPE risk_survey_section_seconds_total counter",
+        ]
+        lines += [f'risk_survey_section_seconds_total{{section="{s}"}} {t:.6f}' for s, t in sorted(sections.items())]
+        if records:
+            widgets = [r["widgets"] for r in records if r["widgets"] is not None]
+            state = [r["state_bytes"] for r in records if r["state_bytes"] is not None]
+            lines += [
+                "# HELP risk_survey_rerun_widgets Mean widgets emitted per rerun over the ring buffer.",
+                "# TYPE risk_survey_rerun_widgets gauge",
+                f"risk_survey_rerun_widgets {sum(widgets) / len(widgets) if widgets else 0:.2f}",
+                "# HELP risk_survey_session_state_bytes Largest pickled session state over the ring buffer.",
+                "# TYPE risk_survey_session_state_bytes gauge",
+                f"risk_survey_session_state_bytes {max(state, default=0)}",
+            ]
+        return "\n".join(lines) + "\n"
+
+
+LOG = RerunLog()
+
+
+# ---------- Timing ----------
+_current = threading.local()  # .sections of the rerun running on this script thread
+
+
+def timed(section: str, func: Callable) -> Callable:
+    """`func`, adding its wall time to `section` of the current rerun (outermost call only)."""
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        sections = getattr(_current, "sections", None)
+        if sections is None or _current.depth.get(section):
+            return func(*args, **kwargs)
+        _current.depth[section] = 1
+        t0 = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            sections[section] = sections.get(section, 0.0) + time.perf_counter() - t0
+            _current.depth[section] = 0
+
+    wrapper.__wrapped_section__ = section
+    return wrapper
+
+
+class _TimedNamespace(dict):
+    """Script globals that wrap SECTIONS functions as the script defines or imports them."""
+
+    def __setitem__(self, name, value):
+        section = SECTIONS.get(name)
+        if section and callable(value) and not hasattr(value, "__wrapped_section__"):
+            value = timed(section, value)
+        super().__setitem__(name, value)
+
+
+# ---------- Envelope ----------
+_code_cache: Dict[str, tuple] = {}  # path -> (mtime_ns, code)
+_previous: Dict[str, Dict] = {}  # session id -> {"progress", "widgets", "outcome"} at the end of its last run
+_server_lock = threading.Lock()
+_server: Optional[http.server.ThreadingHTTPServer] = None
+
+
+def _compiled(path: str):
+    mtime = os.stat(path).st_mtime_ns
+    hit = _code_cache.get(path)
+    if hit is None or hit[0] != mtime:
+        with open(path, "r", encoding="utf-8") as f:
+            hit = (mtime, compile(f.read(), path, "exec"))
+        _code_cache[path] = hit
+    return hit[1]
+
+
+def _this_run(ctx, name: str) -> Optional[frozenset]:
+    """ctx's `name` set (widget ids, user keys) for this run; it moved to ctx.shared in newer Streamlit."""
+    shared = getattr(ctx, "shared", None)
+    ids = getattr(shared if shared is not None else ctx, name, None)
+    if ids is None:
+        return None
+    return ids.snapshot() if hasattr(ids, "snapshot") else frozenset(ids)
+
+
+def _state_bytes(state: Dict) -> Optional[int]:
+    try:
+        return len(pickle.dumps(state))
+    except Exception:
+        return None
+
+
+def _trigger(previous: Optional[Dict], widgets: Dict, progress_before: tuple, progress_after: tuple) -> str:
+    """`widgets`: the previous run's keyed widgets, as they are at the start of this one."""
+    if previous is None or not any(v is not None for v in progress_before):
+        return "load"  # a new session, or one whose state was cleared
+    if previous["outcome"] == "rerun":
+        return "rerun"
+    if progress_before != previous["progress"] or progress_after != progress_before:
+        return "phase_change"
+    changed = sum(1 for k, v in previous["widgets"].items() if widgets.get(k) != v)
+    return "click" if changed == 1 else "submit"
+
+
+def run_instrumented(script: str) -> None:
+    """Exec `script` as this rerun's main script, recording the rerun in LOG."""
+    import streamlit as st
+    from streamlit.runtime.scriptrunner_utils.exceptions import RerunException, StopException
+
+    path = script if os.path.isabs(script) else os.path.join(HERE, script)
+    ctx = get_script_run_ctx()
+    session = ctx.session_id if ctx is not None else ""
+    previous = _previous.get(session)
+    state = st.session_state
+    progress_before = tuple(state.get(k) for k in PROGRESS_KEYS)
+    widgets_before = {k: state.get(k) for k in (previous or {}).get("widgets", ())}
+
+    _current.sections, _current.depth = {}, {}
+    namespace = _TimedNamespace(__name__="__main__", __file__=path, __builtins__=__builtins__)
+    outcome = "ok"
+    t0 = time.perf_counter()
+    try:
+        exec(_compiled(path), namespace)
+    except RerunException:
+        outcome = "rerun"
+        raise
+    except StopException:
+        outcome = "stop"
+        raise
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        seconds = time.perf_counter() - t0
+        sections, _current.sections = _current.sections, None
+        progress_after = tuple(state.get(k) for k in PROGRESS_KEYS)
+        snapshot = state.to_dict()
+        LOG.append({
+            "ts": round(time.time(), 3),
+            "session": session[:8],
+            "script": os.path.basename(path),
+            "trigger": _trigger(previous, widgets_before, progress_before, progress_after),
+            "outcome": outcome,
+            "seconds": round(seconds, 6),
+            "sections": {k: round(v, 6) for k, v in sections.items()},
+            "widgets": len(_this_run(ctx, "widget_ids_this_run") or ()) if ctx is not None else None,
+            "state_bytes": _state_bytes(snapshot),
+        })
+        if session_memory.PROFILER is not None:
+            session_memory.PROFILER.observe(session, snapshot)
+        keys = _this_run(ctx, "widget_user_keys_this_run") or () if ctx is not None else ()
+        _previous.pop(session, None)
+        _previous[session] = {"progress": progress_after, "outcome": outcome,
+                              "widgets": {k: snapshot.get(k) for k in keys}}
+        if len(_previous) > RING_SIZE:
+            del _previous[next(iter(_previous))]
+
+
+# ---------- Endpoint ----------
+class _MetricsHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/metrics":
+            body, content_type = LOG.to_prometheus(), "text/plain; version=0.0.4"
+        elif self.path == "/metrics.jsonl":
+            body, content_type = LOG.to_jsonl(), "application/x-ndjson"
+        elif self.path == "/sessions.json" and session_memory.PROFILER is not None:
+            body, content_type = json.dumps(session_memory.PROFILER.report()), "application/json"
+        else:
+            self.send_error(404)
+            return
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_metrics(port: int = DEFAULT_PORT, host: str = "127.0.0.1") -> http.server.ThreadingHTTPServer:
+    """Start the dump endpoint on a daemon thread, once per process."""
+    global _server
+    with _server_lock:
+        if _server is None:
+            _server = http.server.ThreadingHTTPServer((host, port), _MetricsHandler)
+            threading.Thread(target=_server.serve_forever, name="rerun-metrics", daemon=True).start()
+        return _server
+
+
+def _target_script() -> str:
+    """RISK_SURVEY_METRICS_SCRIPT, else the script named after `--` on the command line."""
+    script = os.environ.get("RISK_SURVEY_METRICS_SCRIPT")
+    if script:
+        return script
+    return sys.argv[1] if len(sys.argv) > 1 and sys.argv[1].endswith(".py") else DEFAULT_SCRIPT
+
+
+# ---------- Self-check ----------
+def _self_check(sessions: int = 3) -> List[str]:
+    """Drive a few v3 sessions through the envelope with AppTest and read both dumps back."""
+    import urllib.request
+
+    import load_test
+
+    server = serve_metrics(port=0)
+    lines = []
+    saved = {k: os.environ.get(k) for k in ("RISK_SURVEY_METRICS_PORT", "RISK_SURVEY_METRICS_SCRIPT")}
+    os.environ["RISK_SURVEY_METRICS_PORT"] = "0"  # the AppTest runs must not bind the port
+    os.environ["RISK_SURVEY_METRICS_SCRIPT"] = DEFAULT_SCRIPT
+    try:
+        for mode in ("ladder", "switch"):
+            start = len(LOG.records())
+            for seed in range(sessions):
+                for _ in load_test.respondent(os.path.abspath(__file__), seed, load_test.Recorder(), 30, mode):
+                    pass
+            records = LOG.records()[start:]
+            triggers = collections.Counter(r["trigger"] for r in records)
+            widgets = max(r["widgets"] or 0 for r in records)
+            lines.append(f"{mode}: {len(records)} reruns recorded {dict(sorted(triggers.items()))}, "
+                         f"up to {widgets} widgets per rerun")
+            assert triggers["load"] == sessions and triggers["phase_change"] >= sessions * 20, triggers
+            assert all(r["state_bytes"] for r in records)
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    prometheus = urllib.request.urlopen(base + "/metrics").read().decode()
+    jsonl = urllib.request.urlopen(base + "/metrics.jsonl").read().decode().splitlines()
+    assert len(jsonl) == len(LOG.records()) and json.loads(jsonl[-1])["script"] == DEFAULT_SCRIPT
+    assert 'risk_survey_section_seconds_total{section="export"}' in prometheus
+    lines.append(f"/metrics.jsonl: {len(jsonl)} lines; /metrics:")
+    return lines + ["  " + line for line in prometheus.splitlines() if not line.startswith("#")]
+
+
+if __name__ == "__main__":
+    # Both ways in use the imported module, whose LOG the AppTest / Streamlit runs share;
+    # under `streamlit run` this file is re-executed every rerun
+    import rerun_metrics
+
+    if get_script_run_ctx() is None:
+        for line in rerun_metrics._self_check():
+            print(line)
+        sys.exit(0)
+
+    port = int(os.environ.get("RISK_SURVEY_METRICS_PORT", DEFAULT_PORT))
+    if port:
+        rerun_metrics.serve_metrics(port)
+    rerun_metrics.run_instrumented(rerun_metrics._target_script())
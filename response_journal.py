@@ -0,0 +1,201 @@
+"""Local write-ahead journal for survey responses, drained to Google Sheets in the background.
+
+Submitting a survey only appends its rows to a SQLite journal in WAL mode with
+synchronous=FULL, so the response is on disk (fsynced) before the participant sees the
+confirmation. `JournalSyncer` runs on its own thread, reads unsynced entries in batches and
+writes them to the sheet through `sheets_writer.append_rows_with_retry` (rate limit and backoff).
+Entries are only marked synced after `append_rows` succeeds, so a failed connection or a
+Sheets outage just leaves them queued; delivery is at-least-once.
+"""
+
+import datetime
+import json
+import logging
+import os
+import sqlite3
+import threading
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from sheets_writer import Row, TokenBucket, append_rows_with_retry
+
+
+DEFAULT_JOURNAL_PATH = os.environ.get("RISK_SURVEY_JOURNAL", "survey_journal.db")
+
+logger = logging.getLogger("response_journal")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL,
+    rows TEXT NOT NULL,
+    synced_at TEXT
+);
+CREATE INDEX IF NOT EXISTS responses_unsynced ON responses (id) WHERE synced_at IS NULL;
+"""
+
+
+# ---------- Journal ----------
+class ResponseJournal:
+    """Append-only SQLite journal of sheet rows; one entry per submitted survey."""
+
+    def __init__(self, path: str = DEFAULT_JOURNAL_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.executescript(_SCHEMA)
+
+    def append(self, rows: List[Row]) -> int:
+        """Durably record one submission's rows and return its journal id."""
+        now = datetime.datetime.now().isoformat()
+        with self._lock:
+            cur = self._conn.execute(
+                "INSERT INTO responses (created_at, rows) VALUES (?, ?)",
+                (now, json.dumps(rows)),
+            )
+            return cur.lastrowid
+
+    def pending(self, limit: int = 100) -> List[Tuple[int, List[Row]]]:
+        with self._lock:
+            cur = self._conn.execute(
+                "SELECT id, rows FROM responses WHERE synced_at IS NULL ORDER BY id LIMIT ?", (limit,)
+            )
+            return [(entry_id, json.loads(rows)) for entry_id, rows in cur.fetchall()]
+
+    def iter_rows(self, batch_entries: int = 500) -> Iterator[Row]:
+        """Rows of every entry still in the journal, synced or not, in submission order.
+
+        Reads `batch_entries` entries per query (keyset pagination on id), so memory stays
+        constant and appends are never blocked for longer than one page.
+        """
+        last_id = 0
+        while True:
+            with self._lock:
+                page = self._conn.execute(
+                    "SELECT id, rows FROM responses WHERE id > ? ORDER BY id LIMIT ?", (last_id, batch_entries)
+                ).fetchall()
+            if not page:
+                return
+            for entry_id, rows in page:
+                yield from json.loads(rows)
+            last_id = page[-1][0]
+
+    def all_rows(self) -> List[Row]:
+        return list(self.iter_rows())
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses WHERE synced_at IS NULL").fetchone()[0]
+
+    def mark_synced(self, ids: List[int]) -> None:
+        if not ids:
+            return
+        now = datetime.datetime.now().isoformat()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany("UPDATE responses SET synced_at = ? WHERE id = ?", [(now, i) for i in ids])
+            self._conn.execute("COMMIT")
+
+    def prune_synced(self) -> int:
+        """Delete entries that already reached the sheet; returns how many were removed."""
+        with self._lock:
+            cur = self._conn.execute("DELETE FROM responses WHERE synced_at IS NOT NULL")
+            return cur.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# ---------- Background sync ----------
+class JournalSyncer:
+    """Drain a `ResponseJournal` to a worksheet on a daemon thread.
+
+    `connect` returns a worksheet (or None if it can't connect right now); it is called again
+    after failures so a sheet that was unreachable at startup is picked up later.
+    """
+
+    def __init__(
+        self,
+        journal: ResponseJournal,
+        connect: Callable[[], object],
+        batch_entries: int = 50,
+        interval: float = 2.0,
+        rate_per_sec: float = 0.9,
+        burst: float = 5,
+        max_retries: int = 2,
+        base_backoff: float = 1.0,
+        max_backoff: float = 32.0,
+    ):
+        self.journal = journal
+        self.connect = connect
+        self.batch_entries = batch_entries
+        self.interval = interval
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.bucket = TokenBucket(rate_per_sec, burst)
+        self.worksheet = None
+        self.stats: Dict[str, int] = {"entries": 0, "rows": 0, "batches": 0, "retries": 0, "failures": 0}
+
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "JournalSyncer":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="journal-syncer", daemon=True)
+            self._thread.start()
+        return self
+
+    def notify(self) -> None:
+        """Wake the syncer after a new append instead of waiting for the next interval."""
+        self._wake.set()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def sync_once(self) -> int:
+        """Push one batch of pending entries; returns the number of entries synced."""
+        entries = self.journal.pending(self.batch_entries)
+        if not entries:
+            return 0
+        if self.worksheet is None:
+            self.worksheet = self.connect()
+            if self.worksheet is None:
+                raise ConnectionError("worksheet unavailable")
+
+        rows = [row for _, entry_rows in entries for row in entry_rows]
+        error = append_rows_with_retry(
+            self.worksheet, rows, self.bucket, self.max_retries, self.base_backoff, self.max_backoff,
+            stats=self.stats,
+        )
+        if error is not None:
+            raise error
+        self.journal.mark_synced([entry_id for entry_id, _ in entries])
+        self.stats["entries"] += len(entries)
+        self.stats["rows"] += len(rows)
+        self.stats["batches"] += 1
+        return len(entries)
+
+    def _run(self) -> None:
+        failures = 0
+        while not self._stop.is_set():
+            try:
+                synced = self.sync_once()
+                failures = 0
+            except Exception as e:
+                self.stats["failures"] += 1
+                self.worksheet = None
+                failures += 1
+                logger.warning("Journal sync failed (%d in a row), entries stay queued: %s", failures, e)
+                self._stop.wait(min(self.max_backoff, self.base_backoff * (2 ** failures)))
+                continue
+            if synced == self.batch_entries:
+                continue  # more backlog waiting
+            self._wake.wait(self.interval)
+            self._wake.clear()
@@ -6,6 +6,8 @@ from datetime import datetime
 import streamlit as st
 import pandas as pd
 
+from survey_ladders import build_ladder_index, lookup_ladder
+
 # ---------- Page setup ----------
 st.set_page_config(page_title="Risk Preference Survey", layout="wide")
 
@@ -252,6 +254,13 @@ def export_csv_blob(results, name, age):
     df = pd.DataFrame(rows)
     return df.to_csv(index=False).encode("utf-8")
 
+@st.cache_resource
+def load_ladder_index():
+    """Every phase-1/phase-2 ladder for GAINS + LOSSES, built once per process."""
+    return build_ladder_index(GAINS + LOSSES, generate_sure_amounts)
+
+LADDERS = load_ladder_index()
+
 # ---------- Session State init ----------
 if "started" not in st.session_state:
     st.session_state.started = False
@@ -276,11 +285,6 @@ if "results" not in st.session_state:
 if "__violation_msg" not in st.session_state:
     st.session_state.__violation_msg = None
 
-# ---------- Display violation message if exists ----------
-if st.session_state.__violation_msg:
-    st.error(st.session_state.__violation_msg)
-    st.session_state.__violation_msg = None
-
 # ---------- UI ----------
 st.title("Risk Preference Survey")
 
@@ -323,7 +327,7 @@ if not st.session_state.started:
         st.session_state.phase1_choices = []
         st.session_state.current_choices = [None] * 7
         st.session_state.results = []
-        st.session_state.amounts = generate_sure_amounts(prospects[0], phase=1)
+        st.session_state.amounts = lookup_ladder(LADDERS, prospects[0], phase=1)
         st.session_state.started = True
         st.rerun()
 
@@ -430,29 +434,40 @@ else:
 
             # Render choice rows
             amounts = st.session_state.amounts
-            choices = st.session_state.current_choices
-            
-            for i, amt in enumerate(amounts):
-                col_a, col_b = st.columns([3, 4])
-                with col_a:
-                    st.markdown(f"**Sure amount:** ${amt:,.2f}")
-                with col_b:
-                    options = ("Prefer Gamble", f"Prefer Sure ${amt:,.2f}")
-                    key = f"choice_{current}_{st.session_state.phase}_{i}"
-                    
-                    default_index = None
-                    if choices[i] is not None:
-                        default_index = 0 if choices[i] == "prospect" else 1
-                    
-                    st.radio(
-                        "Your choice",
-                        options=options,
-                        index=default_index,
-                        horizontal=True,
-                        key=key,
-                        on_change=on_radio_change,
-                        args=(key, i),
-                    )
+
+            # The ladder is a fragment: a click reruns and redraws only these rows, not the page
+            # above them. Continue below is a full rerun (it changes phase or problem).
+            @st.fragment
+            def ladder_rows():
+                # Violation message from a row's callback, shown above the rows
+                if st.session_state.__violation_msg:
+                    st.error(st.session_state.__violation_msg)
+                    st.session_state.__violation_msg = None
+                choices = st.session_state.current_choices
+
+                for i, amt in enumerate(amounts):
+                    col_a, col_b = st.columns([3, 4])
+                    with col_a:
+                        st.markdown(f"**Sure amount:** ${amt:,.2f}")
+                    with col_b:
+                        options = ("Prefer Gamble", f"Prefer Sure ${amt:,.2f}")
+                        key = f"choice_{current}_{st.session_state.phase}_{i}"
+
+                        default_index = None
+                        if choices[i] is not None:
+                            default_index = 0 if choices[i] == "prospect" else 1
+
+                        st.radio(
+                            "Your choice",
+                            options=options,
+                            index=default_index,
+                            horizontal=True,
+                            key=key,
+                            on_change=on_radio_change,
+                            args=(key, i),
+                        )
+
+            ladder_rows()
 
             # Continue button
             if st.button("Continue", use_container_width=True):
@@ -468,8 +483,8 @@ else:
                     # Move to phase 2
                     st.session_state.phase1_choices.append(list(choices))
                     st.session_state.phase = 2
-                    st.session_state.amounts = generate_sure_amounts(
-                        prospect, phase=2, phase1_choices=choices
+                    st.session_state.amounts = lookup_ladder(
+                        LADDERS, prospect, phase=2, phase1_choices=choices
                     )
                     st.session_state.current_choices = [None] * 7
                     st.rerun()
@@ -496,7 +511,7 @@ else:
                     st.session_state.current_choices = [None] * 7
                     
                     if st.session_state.index < total_problems:
-                        st.session_state.amounts = generate_sure_amounts(
-                            st.session_state.prospects[st.session_state.index], phase=1
+                        st.session_state.amounts = lookup_ladder(
+                            LADDERS, st.session_state.prospects[st.session_state.index], phase=1
                         )
                     st.rerun()
\ No newline at end of file
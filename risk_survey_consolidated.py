@@ -1,12 +1,22 @@
 
+import os
 import random
 import json
+import uuid
 from dataclasses import dataclass
 from typing import List, Tuple, Dict, Optional
 
 import pandas as pd
 import streamlit as st
 
+from answer_log import open_answer_log
+from prospect_catalog import load_prospects
+from session_memory import purge_widget_keys
+from survey_choices import (
+    EMPTY, ChoiceMask, choice_at, decode_choices, encode_choices, first_violation, is_complete, set_choice,
+)
+from survey_ladders import build_ladder_index, lookup_ladder, pack_choices
+
 # ---------- Page Setup ----------
 st.set_page_config(page_title="Risk Preference Survey", layout="wide")
 
@@ -49,20 +59,34 @@ def expected_value(prospect: Dict) -> float:
     return outs[0]*probs[0] + outs[1]*probs[1]
 
 
+def consistency_message(mask: ChoiceMask) -> Optional[str]:
+    """Return an error string if the encoded choices violate monotonicity; else None."""
+    if first_violation(mask) is None:
+        return None
+    # Scanning top-down, the first offender is always a gamble row with a sure row below it
+    return "Choices are inconsistent: chose gamble at a higher sure amount but chose sure at a lower amount."
+
+
 def check_consistency(choices: List[Optional[str]], amounts: List[float]) -> Optional[str]:
     """Return an error string if choices violate monotonicity; else None.
        amounts are descending (largest first)."""
-    # If chose gamble at some amount i, must choose gamble for all smaller amounts (j > i)
-    for i, ch in enumerate(choices):
-        if ch == "prospect":
-            for j in range(i+1, len(choices)):
-                if choices[j] == "sure":
-                    return "Choices are inconsistent: chose gamble at a higher sure amount but chose sure at a lower amount."
-        if ch == "sure":
-            for j in range(0, i):
-                if choices[j] == "prospect":
-                    return "Choices are inconsistent: chose sure at a lower sure amount but chose gamble at a higher amount."
-    return None
+    return consistency_message(encode_choices(choices))
+
+
+def monotonic_violation_for_mask(mask: ChoiceMask, amounts: List[float], new_choice: str, idx: int) -> Tuple[bool, str]:
+    """Bitmask form of `check_monotonic_violation`: O(1) regardless of ladder length."""
+    hit = first_violation(set_choice(mask, idx, new_choice))
+    if hit is None:
+        return False, ""
+    i, j = hit
+    msg = (
+        "Monotonicity violation.\n\n"
+        f"You chose the gamble instead of {format_money(amounts[i])}, "
+        f"but also chose a sure amount of {format_money(amounts[j])} on a lower row.\n\n"
+        "Monotonicity (Tversky & Kahneman, 1992): "
+        "If a gamble is better than some amount of money, it should be better than any smaller amount."
+    )
+    return True, msg
 
 
 def check_monotonic_violation(choices: List[Optional[str]], amounts: List[float], new_choice: str, idx: int) -> Tuple[bool, str]:
@@ -72,40 +96,7 @@ def check_monotonic_violation(choices: List[Optional[str]], amounts: List[float]
       - If you prefer the gamble over a sure amount X, you must also prefer it over any smaller sure amount.
       - If you prefer a sure amount X over the gamble, you must also prefer any larger sure amount.
     """
-    temp = list(choices)
-    temp[idx] = new_choice
-
-    for i, ch in enumerate(temp):
-        if ch is None:
-            continue
-
-        # If you choose the gamble at amount[i], you must choose it for all smaller amounts (rows below, j > i)
-        if ch == "prospect":
-            for j in range(i + 1, len(temp)):
-                if temp[j] == "sure":
-                    msg = (
-                        "Monotonicity violation.\n\n"
-                        f"You chose the gamble instead of {format_money(amounts[i])}, "
-                        f"but also chose a sure amount of {format_money(amounts[j])} on a lower row.\n\n"
-                        "Monotonicity (Tversky & Kahneman, 1992): "
-                        "If a gamble is better than some amount of money, it should be better than any smaller amount."
-                    )
-                    return True, msg
-
-        # If you choose sure at amount[i], you must choose sure for all larger amounts (rows above, j < i)
-        if ch == "sure":
-            for j in range(0, i):
-                if temp[j] == "prospect":
-                    msg = (
-                        "Monotonicity violation.\n\n"
-                        f"You chose a sure amount of {format_money(amounts[i])}, "
-                        f"but chose the gamble over a larger sure amount of {format_money(amounts[j])} on an upper row.\n\n"
-                        "Monotonicity (Tversky & Kahneman, 1992): "
-                        "If a certain amount is better than the gamble, any larger amount should also be better."
-                    )
-                    return True, msg
-
-    return False, ""
+    return monotonic_violation_for_mask(encode_choices(choices), amounts, new_choice, idx)
 
 
 def compute_certainty_equivalent(choices: List[str], amounts: List[float]) -> float:
@@ -213,20 +204,32 @@ def risk_attitude_from_ce(ce: float, ev: float) -> str:
 
 
 # ---------- Prospects (10 problems) ----------
-# A simple fixed set: 5 gains, 5 losses
-PROSPECTS = [
-    {"outcomes": [0, 150], "probabilities": [0.9, 0.1], "description": "10% to win 150, else 0"},   # EV 15
-    {"outcomes": [0, 100], "probabilities": [0.75, 0.25], "description": "25% to win 100, else 0"}, # EV 25
-    {"outcomes": [0, 200], "probabilities": [0.5, 0.5], "description": "50% to win 200, else 0"},   # EV 100
-    {"outcomes": [0, 300], "probabilities": [0.67, 0.33], "description": "33% to win 300, else 0"}, # ~99
-    {"outcomes": [0, 50],  "probabilities": [0.2, 0.8], "description": "80% to win 50, else 0"},    # 40
-    # Losses
-    {"outcomes": [0, -100], "probabilities": [0.5, 0.5], "description": "50% to lose 100, else 0"}, # -50
-    {"outcomes": [0, -150], "probabilities": [0.9, 0.1], "description": "10% to lose 150, else 0"}, # -15
-    {"outcomes": [0, -200], "probabilities": [0.75, 0.25], "description": "25% to lose 200, else 0"},# -50
-    {"outcomes": [0, -50],  "probabilities": [0.2, 0.8], "description": "80% to lose 50, else 0"},   # -40
-    {"outcomes": [0, -300], "probabilities": [0.67, 0.33], "description": "33% to lose 300, else 0"},# -99
-]
+# A simple fixed set: 5 gains, 5 losses (catalogs/consolidated.toml)
+PROSPECTS = load_prospects("catalogs/consolidated.toml", "prospects")
+
+
+@st.cache_resource
+def load_ladder_index():
+    """Every phase-1/phase-2 ladder for PROSPECTS, built once per process."""
+    return build_ladder_index(PROSPECTS, generate_sure_amounts)
+
+
+LADDERS = load_ladder_index()
+
+
+@st.cache_resource
+def load_answer_log(path: Optional[str]):
+    """The event log (answer_log) every step is appended to; None unless RISK_SURVEY_ANSWER_LOG is set."""
+    return open_answer_log(path)
+
+
+ANSWER_LOG = load_answer_log(os.environ.get("RISK_SURVEY_ANSWER_LOG"))
+
+
+def log_event(*event):
+    """Append one answer_log event for this participant (no-op with the log off or before Start)."""
+    if ANSWER_LOG is not None and st.session_state.get("log_id"):
+        ANSWER_LOG.append(st.session_state.log_id, event)
 
 
 # ---------- Session State Init ----------
@@ -237,16 +240,17 @@ def init_state():
         st.session_state.age = None
 
     if "prospects" not in st.session_state:
-        # Randomize order but keep both domains mixed
-        random.seed()  # remove for reproducibility
-        st.session_state.prospects = random.sample(PROSPECTS, k=len(PROSPECTS))
+        # Randomize order but keep both domains mixed; the seed is logged so a replay gets the same order
+        if st.session_state.get("start_seed") is None:  # a replay sets it beforehand; 0 is a valid seed
+            st.session_state.start_seed = random.getrandbits(32)
+        st.session_state.prospects = random.Random(st.session_state.start_seed).sample(PROSPECTS, k=len(PROSPECTS))
 
     if "index" not in st.session_state:
         st.session_state.index = 0  # problem index
     if "phase" not in st.session_state:
         st.session_state.phase = 1  # 1 or 2
-    if "current_choices" not in st.session_state:
-        st.session_state.current_choices = [None] * 7  # 'prospect' or 'sure'
+    if "choice_mask" not in st.session_state:
+        st.session_state.choice_mask = EMPTY  # (answered bits, sure bits), row 0 = top
     if "amounts" not in st.session_state:
         # filled when problem starts
         st.session_state.amounts = None
@@ -279,22 +283,18 @@ if not st.session_state.started:
         # Set up first problem
         st.session_state.index = 0
         st.session_state.phase = 1
-        st.session_state.current_choices = [None] * 7
+        st.session_state.choice_mask = EMPTY
         st.session_state.phase1_choices = []
         st.session_state.results = []
 
         prospect = st.session_state.prospects[st.session_state.index]
-        st.session_state.amounts = generate_sure_amounts(prospect, phase=1)
+        st.session_state.amounts = lookup_ladder(LADDERS, prospect, phase=1)
+        st.session_state.log_id = uuid.uuid4().hex
+        log_event("start", {"script": os.path.basename(__file__), "seed": st.session_state.start_seed, "mode": None})
         st.rerun()
     st.stop()
 
 
-# ---------- Show any violation message (from last callback) ----------
-if st.session_state.get("__violation_msg"):
-    st.error(st.session_state["__violation_msg"])
-    st.session_state["__violation_msg"] = None
-
-
 # ---------- Main Flow ----------
 total = len(st.session_state.prospects)
 current = st.session_state.index + 1
@@ -317,7 +317,6 @@ else:
 
 # Ensure amounts exist for this phase
 amounts = st.session_state.amounts
-choices = st.session_state.current_choices
 
 # ---------- Radio Callback ----------
 def _on_radio_change(key: str, idx: int):
@@ -325,24 +324,30 @@ def _on_radio_change(key: str, idx: int):
     if val is None:
         return
     proposed = "prospect" if val == "Prefer Gamble" else "sure"
-    violated, msg = check_monotonic_violation(choices, amounts, proposed, idx)
+    log_event("choice", st.session_state.index, st.session_state.phase, idx, int(proposed == "sure"))
+    violated, msg = monotonic_violation_for_mask(st.session_state.choice_mask, st.session_state.amounts, proposed, idx)
     if violated:
+        log_event("reject", st.session_state.index, st.session_state.phase, "monotonic", idx)
         # Reset this selection; show message on next render
         st.session_state[key] = None
-        st.session_state.current_choices[idx] = None
+        st.session_state.choice_mask = set_choice(st.session_state.choice_mask, idx, None)
         st.session_state["__violation_msg"] = msg
     else:
-        st.session_state.current_choices[idx] = proposed
+        st.session_state.choice_mask = set_choice(st.session_state.choice_mask, idx, proposed)
 
 
 # ---------- Render 7 rows (no forms; live on_change) ----------
-for i, amt in enumerate(amounts):
+# Each row is its own fragment: a click only changes that row's radio (the callback resets
+# nothing else), so only that row is rerun and redrawn. Continue below is a full rerun.
+@st.fragment
+def ladder_row(i: int, amt: float):
     c1, c2 = st.columns([3, 4])
     with c1:
         st.markdown(f"**Sure amount:** {format_money(amt)}")
     with c2:
         key = f"choice_{current}_{st.session_state.phase}_{i}"
-        default_index = 0 if choices[i] == "prospect" else (1 if choices[i] == "sure" else None)
+        ch = choice_at(st.session_state.choice_mask, i)
+        default_index = 0 if ch == "prospect" else (1 if ch == "sure" else None)
         st.radio(
             "Your choice",
             options=("Prefer Gamble", f"Prefer Sure {format_money(amt)}"),
@@ -352,33 +357,49 @@ for i, amt in enumerate(amounts):
             on_change=_on_radio_change,
             args=(key, i),
         )
+    # Violation message from this row's callback, shown right under the row
+    if st.session_state.get("__violation_msg"):
+        st.error(st.session_state["__violation_msg"])
+        st.session_state["__violation_msg"] = None
+
+
+for i, amt in enumerate(amounts):
+    ladder_row(i, amt)
 
 # ---------- Continue Button ----------
 if st.button("Continue", type="primary", use_container_width=True):
+    mask = st.session_state.choice_mask
+    log_event("submit", st.session_state.index, st.session_state.phase)
     # Require all rows answered
-    if any(c is None for c in choices):
+    if not is_complete(mask, len(amounts)):
+        log_event("reject", st.session_state.index, st.session_state.phase, "incomplete")
         st.error("Please answer **all 7 rows** before continuing.")
         st.stop()
 
     # Guard (should be consistent due to live check)
-    err = check_consistency(choices, amounts)
+    err = consistency_message(mask)
     if err:
+        log_event("reject", st.session_state.index, st.session_state.phase, "inconsistent")
         st.error(err)
         st.stop()
 
+    choices = decode_choices(mask, len(amounts))
+    purge_widget_keys(st.session_state)  # the next phase's rows have new keys
+    log_event("phase", st.session_state.index, st.session_state.phase, pack_choices(choices))
     if st.session_state.phase == 1:
         # Save phase1 choices & set up phase 2
         st.session_state.phase1_choices.append(list(choices))
         st.session_state.phase = 2
-        st.session_state.current_choices = [None] * 7
-        st.session_state.amounts = generate_sure_amounts(
-            prospect, phase=2, phase1_choices=choices
+        st.session_state.choice_mask = EMPTY
+        st.session_state.amounts = lookup_ladder(
+            LADDERS, prospect, phase=2, phase1_choices=choices
         )
         st.rerun()
     else:
         # Phase 2 complete -> compute CE & store result
         ce = compute_certainty_equivalent(choices, amounts)
         risk_att = risk_attitude_from_ce(ce, ev)
+        log_event("result", st.session_state.index, ce)
 
         st.session_state.results.append({
             "participant": st.session_state.name,
@@ -394,10 +415,10 @@ if st.button("Continue", type="primary", use_container_width=True):
         # Advance to next problem
         st.session_state.index += 1
         st.session_state.phase = 1
-        st.session_state.current_choices = [None] * 7
+        st.session_state.choice_mask = EMPTY
         if st.session_state.index < total:
             next_prospect = st.session_state.prospects[st.session_state.index]
-            st.session_state.amounts = generate_sure_amounts(next_prospect, phase=1)
+            st.session_state.amounts = lookup_ladder(LADDERS, next_prospect, phase=1)
             st.rerun()
 
 # ---------- If finished ----------
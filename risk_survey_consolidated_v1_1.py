@@ -6,6 +6,8 @@ from typing import List, Tuple, Dict, Optional
 import pandas as pd
 import streamlit as st
 
+from survey_ladders import build_ladder_index, lookup_ladder
+
 # ---------- Page Setup ----------
 st.set_page_config(page_title="Risk Preference Survey", layout="wide")
 st.title("Risk Preference Survey")
@@ -175,6 +177,15 @@ PROSPECTS = [
     {"outcomes": [0, -300], "probabilities": [0.67, 0.33]},
 ]
 
+@st.cache_resource
+def load_ladder_index():
+    """Every phase-1/phase-2 ladder for PROSPECTS, built once per process."""
+    return build_ladder_index(PROSPECTS, generate_sure_amounts)
+
+
+LADDERS = load_ladder_index()
+
+
 # ---------- Session State Init ----------
 def init_state():
     if "started" not in st.session_state:
@@ -222,15 +233,10 @@ if not st.session_state.started:
         st.session_state.phase1_choices = []
         st.session_state.results = []
         p0 = st.session_state.prospects[st.session_state.index]
-        st.session_state.amounts = generate_sure_amounts(p0, phase=1)
+        st.session_state.amounts = lookup_ladder(LADDERS, p0, phase=1)
         st.rerun()
     st.stop()
 
-# ---------- Show any violation message from callback ----------
-if st.session_state.get("__violation_msg"):
-    st.error(st.session_state["__violation_msg"])
-    st.session_state["__violation_msg"] = None
-
 # ---------- Main ----------
 total = len(st.session_state.prospects)
 current = st.session_state.index + 1
@@ -266,22 +272,33 @@ def _on_radio_change(key: str, idx: int):
     else:
         st.session_state.current_choices[idx] = proposed
 
-for i, amt in enumerate(amounts):
-    c1, c2 = st.columns([3, 4])
-    with c1:
-        st.markdown(f"**Sure amount:** {format_money(amt)}")
-    with c2:
-        key = f"choice_{current}_{st.session_state.phase}_{i}"
-        default_index = 0 if choices[i] == "prospect" else (1 if choices[i] == "sure" else None)
-        st.radio(
-            "Your choice",
-            options=("Prefer Gamble", f"Prefer Sure {format_money(amt)}"),
-            index=default_index,
-            horizontal=True,
-            key=key,
-            on_change=_on_radio_change,
-            args=(key, i),
-        )
+# The ladder is a fragment: a click reruns and redraws only these rows, not the page
+# above them. Continue below is a full rerun (it changes phase or problem).
+@st.fragment
+def ladder_rows():
+    choices = st.session_state.current_choices
+    # Violation message from a row's callback, shown above the rows
+    if st.session_state.get("__violation_msg"):
+        st.error(st.session_state["__violation_msg"])
+        st.session_state["__violation_msg"] = None
+    for i, amt in enumerate(amounts):
+        c1, c2 = st.columns([3, 4])
+        with c1:
+            st.markdown(f"**Sure amount:** {format_money(amt)}")
+        with c2:
+            key = f"choice_{current}_{st.session_state.phase}_{i}"
+            default_index = 0 if choices[i] == "prospect" else (1 if choices[i] == "sure" else None)
+            st.radio(
+                "Your choice",
+                options=("Prefer Gamble", f"Prefer Sure {format_money(amt)}"),
+                index=default_index,
+                horizontal=True,
+                key=key,
+                on_change=_on_radio_change,
+                args=(key, i),
+            )
+
+ladder_rows()
 
 if st.button("Continue", type="primary", use_container_width=True):
     if any(c is None for c in choices):
@@ -297,7 +314,7 @@ if st.button("Continue", type="primary", use_container_width=True):
         st.session_state.phase1_choices.append(list(choices))
         st.session_state.phase = 2
         st.session_state.current_choices = [None] * 7
-        st.session_state.amounts = generate_sure_amounts(prospect, phase=2, phase1_choices=choices)
+        st.session_state.amounts = lookup_ladder(LADDERS, prospect, phase=2, phase1_choices=choices)
         st.rerun()
     else:
         ce = compute_certainty_equivalent(choices, amounts)
@@ -317,7 +334,7 @@ if st.button("Continue", type="primary", use_container_width=True):
         st.session_state.current_choices = [None] * 7
         if st.session_state.index < total:
             nxt = st.session_state.prospects[st.session_state.index]
-            st.session_state.amounts = generate_sure_amounts(nxt, phase=1)
+            st.session_state.amounts = lookup_ladder(LADDERS, nxt, phase=1)
             st.rerun()
 
 # Done
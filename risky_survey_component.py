@@ -0,0 +1,70 @@
+
+from datetime import datetime
+
+import streamlit as st
+import pandas as pd
+
+from survey_component import risk_survey, score_payload
+from survey_variants import load_survey_functions
+
+# ---------- Page setup ----------
+st.set_page_config(page_title="Risk Preference Survey", layout="centered")
+
+# ---------- Helper data ----------
+@st.cache_resource
+def load_v3():
+    """GAINS/LOSSES and export helpers from the v3 script, loaded once per process."""
+    return load_survey_functions("risky_survey_streamlit_v3.py")
+
+V3 = load_v3()
+GAINS, LOSSES = V3["GAINS"], V3["LOSSES"]
+
+# ---------- UI ----------
+st.title("Risk Preference Survey")
+
+# The whole survey runs in the browser; the script only reruns once, when the payload arrives
+if "payload" not in st.session_state:
+    payload = risk_survey(GAINS, LOSSES, key="survey")
+    if payload is None:
+        st.stop()
+    st.session_state.payload = payload
+
+payload = st.session_state.payload
+try:
+    results = score_payload(payload, GAINS, LOSSES)
+except ValueError as e:
+    st.error(f"Could not read the survey responses: {e}")
+    st.stop()
+
+name, age = str(payload.get("name", "")).strip(), payload.get("age")
+st.success("Survey complete!")
+st.dataframe(pd.DataFrame(results), use_container_width=True)
+
+timestamp = datetime.utcnow().strftime("%Y-%m-%dT%H-%M-%SZ")
+summary = {
+    "participant": {"name": name, "age": age, "timestamp_utc": timestamp},
+    "results": results,
+    "summary": {
+        "totalProblems": len(results),
+        "gainProblems": sum(1 for r in results if r["domain"] == "Gain Domain"),
+        "lossProblems": sum(1 for r in results if r["domain"] == "Loss Domain"),
+        "riskAverseCount": sum(1 for r in results if r["risk_attitude"] == "Risk Averse"),
+        "riskSeekingCount": sum(1 for r in results if r["risk_attitude"] == "Risk Seeking"),
+        "riskNeutralCount": sum(1 for r in results if r["risk_attitude"] == "Risk Neutral"),
+    }
+}
+
+st.download_button(
+    "Download results (JSON)",
+    data=V3["export_json_blob"](summary),
+    file_name=f"risk_survey_{name.replace(' ', '_')}_{timestamp}.json",
+    mime="application/json",
+    use_container_width=True,
+)
+st.download_button(
+    "Download results (CSV)",
+    data=V3["export_csv_blob"](results, name, age),
+    file_name=f"risk_survey_{name.replace(' ', '_')}_{timestamp}.csv",
+    mime="text/csv",
+    use_container_width=True,
+)
@@ -7,6 +7,8 @@ from datetime import datetime
 import streamlit as st
 import pandas as pd
 
+from survey_ladders import build_ladder_index, lookup_ladder
+
 # ---------- Page setup ----------
 st.set_page_config(page_title="Risk Preference Survey", layout="wide")
 
@@ -236,6 +238,13 @@ def export_csv_blob(results, name, age):
     df = pd.DataFrame(rows)
     return df.to_csv(index=False).encode("utf-8")
 
+@st.cache_resource
+def load_ladder_index():
+    """Every phase-1/phase-2 ladder for GAINS + LOSSES, built once per process."""
+    return build_ladder_index(GAINS + LOSSES, generate_sure_amounts)
+
+LADDERS = load_ladder_index()
+
 # ---------- Session State init ----------
 if "started" not in st.session_state:
     st.session_state.started = False
@@ -298,7 +307,7 @@ if not st.session_state.started:
         st.session_state.results = []
 
         # Precompute first set of amounts
-        st.session_state.amounts = generate_sure_amounts(st.session_state.prospects[0], phase=1)
+        st.session_state.amounts = lookup_ladder(LADDERS, st.session_state.prospects[0], phase=1)
         st.session_state.started = True
         st.rerun()
 
@@ -416,8 +425,8 @@ else:
                     st.session_state.phase1_choices.append(list(choices))
                     st.session_state.phase = 2
                     # Generate refined amounts
-                    st.session_state.amounts = generate_sure_amounts(
-                        prospect, phase=2, phase1_choices=choices
+                    st.session_state.amounts = lookup_ladder(
+                        LADDERS, prospect, phase=2, phase1_choices=choices
                     )
                     # Reset current choices
                     st.session_state.current_choices = [None] * 7
@@ -444,7 +453,7 @@ else:
                     st.session_state.current_choices = [None] * 7
 
                     if st.session_state.index < total_problems:
-                        st.session_state.amounts = generate_sure_amounts(
-                            st.session_state.prospects[st.session_state.index], phase=1
+                        st.session_state.amounts = lookup_ladder(
+                            LADDERS, st.session_state.prospects[st.session_state.index], phase=1
                         )
                     st.rerun()
@@ -7,6 +7,8 @@ from datetime import datetime
 import streamlit as st
 import pandas as pd
 
+from survey_ladders import build_ladder_index, lookup_ladder
+
 # ---------- Page setup ----------
 st.set_page_config(page_title="Risk Preference Survey", layout="wide")
 
@@ -236,6 +238,13 @@ def export_csv_blob(results, name, age):
     df = pd.DataFrame(rows)
     return df.to_csv(index=False).encode("utf-8")
 
+@st.cache_resource
+def load_ladder_index():
+    """Every phase-1/phase-2 ladder for GAINS + LOSSES, built once per process."""
+    return build_ladder_index(GAINS + LOSSES, generate_sure_amounts)
+
+LADDERS = load_ladder_index()
+
 # ---------- Session State init ----------
 if "started" not in st.session_state:
     st.session_state.started = False
@@ -298,7 +307,7 @@ if not st.session_state.started:
         st.session_state.results = []
 
         # Precompute first set of amounts
-        st.session_state.amounts = generate_sure_amounts(st.session_state.prospects[0], phase=1)
+        st.session_state.amounts = lookup_ladder(LADDERS, st.session_state.prospects[0], phase=1)
         st.session_state.started = True
         st.rerun()
 
@@ -397,56 +406,62 @@ else:
                 return
             st.session_state.current_choices[idx] = "prospect" if val == "Prefer Gamble" else "sure"
 
-        # Determine forced regions based on current selections
-        choices = st.session_state.current_choices
-        first_sure_idx = None
-        last_prospect_idx = None
-        for _i, ch in enumerate(choices):
-            if ch == "sure" and first_sure_idx is None:
-                first_sure_idx = _i
-            if ch == "prospect":
-                last_prospect_idx = _i if last_prospect_idx is None else max(last_prospect_idx, _i)
+        # The ladder is a fragment: a click reruns and redraws only these rows, not the page
+        # above them. Continue below is a full rerun (it changes phase or problem).
+        @st.fragment
+        def ladder_rows():
+            # Determine forced regions based on current selections
+            choices = st.session_state.current_choices
+            first_sure_idx = None
+            last_prospect_idx = None
+            for _i, ch in enumerate(choices):
+                if ch == "sure" and first_sure_idx is None:
+                    first_sure_idx = _i
+                if ch == "prospect":
+                    last_prospect_idx = _i if last_prospect_idx is None else max(last_prospect_idx, _i)
 
-        for i, amt in enumerate(amounts):
-            col_a, col_b = st.columns([3, 3])
-            with col_a:
-                st.markdown(f"**Sure amount:** ${amt}")
-            with col_b:
-                force_choice = None
-                if first_sure_idx is not None and i < first_sure_idx:
-                    force_choice = "sure"
-                elif last_prospect_idx is not None and i > last_prospect_idx:
-                    force_choice = "prospect"
-
-                options = ("Prefer Gamble", f"Prefer Sure ${amt}")
-                key = f"choice_{current}_{st.session_state.phase}_{i}"
-
-                if force_choice is not None:
-                    # Force and disable
-                    st.session_state.current_choices[i] = force_choice
-                    default_index = 0 if force_choice == "prospect" else 1
-                    st.radio(
-                        "Your choice",
-                        options=options,
-                        index=default_index,
-                        horizontal=True,
-                        key=key,
-                        disabled=True,
-                    )
-                else:
-                    # Free selection; default from current state
-                    default_index = None
-                    if st.session_state.current_choices[i] is not None:
-                        default_index = 0 if st.session_state.current_choices[i] == "prospect" else 1
-                    st.radio(
-                        "Your choice",
-                        options=options,
-                        index=default_index,
-                        horizontal=True,
-                        key=key,
-                        on_change=_set_choice,
-                        args=(key, i),
-                    )
+            for i, amt in enumerate(amounts):
+                col_a, col_b = st.columns([3, 3])
+                with col_a:
+                    st.markdown(f"**Sure amount:** ${amt}")
+                with col_b:
+                    force_choice = None
+                    if first_sure_idx is not None and i < first_sure_idx:
+                        force_choice = "sure"
+                    elif last_prospect_idx is not None and i > last_prospect_idx:
+                        force_choice = "prospect"
+
+                    options = ("Prefer Gamble", f"Prefer Sure ${amt}")
+                    key = f"choice_{current}_{st.session_state.phase}_{i}"
+
+                    if force_choice is not None:
+                        # Force and disable
+                        st.session_state.current_choices[i] = force_choice
+                        default_index = 0 if force_choice == "prospect" else 1
+                        st.radio(
+                            "Your choice",
+                            options=options,
+                            index=default_index,
+                            horizontal=True,
+                            key=key,
+                            disabled=True,
+                        )
+                    else:
+                        # Free selection; default from current state
+                        default_index = None
+                        if st.session_state.current_choices[i] is not None:
+                            default_index = 0 if st.session_state.current_choices[i] == "prospect" else 1
+                        st.radio(
+                            "Your choice",
+                            options=options,
+                            index=default_index,
+                            horizontal=True,
+                            key=key,
+                            on_change=_set_choice,
+                            args=(key, i),
+                        )
+
+        ladder_rows()
 
         # Continue button to advance phase or problem
         if st.button("Continue", use_container_width=True):
@@ -482,8 +497,8 @@ else:
             if st.session_state.phase == 1:
                 st.session_state.phase1_choices.append(list(choices))
                 st.session_state.phase = 2
-                st.session_state.amounts = generate_sure_amounts(
-                    prospect, phase=2, phase1_choices=choices
+                st.session_state.amounts = lookup_ladder(
+                    LADDERS, prospect, phase=2, phase1_choices=choices
                 )
                 st.session_state.current_choices = [None] * 7
                 st.rerun()
@@ -507,7 +522,7 @@ else:
                 st.session_state.current_choices = [None] * 7
 
                 if st.session_state.index < total_problems:
-                    st.session_state.amounts = generate_sure_amounts(
-                        st.session_state.prospects[st.session_state.index], phase=1
+                    st.session_state.amounts = lookup_ladder(
+                        LADDERS, st.session_state.prospects[st.session_state.index], phase=1
                     )
                 st.rerun()
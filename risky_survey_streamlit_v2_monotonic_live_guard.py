@@ -7,6 +7,8 @@ from datetime import datetime
 import streamlit as st
 import pandas as pd
 
+from survey_ladders import build_ladder_index, lookup_ladder
+
 # ---------- Page setup ----------
 st.set_page_config(page_title="Risk Preference Survey", layout="wide")
 
@@ -236,6 +238,13 @@ def export_csv_blob(results, name, age):
     df = pd.DataFrame(rows)
     return df.to_csv(index=False).encode("utf-8")
 
+@st.cache_resource
+def load_ladder_index():
+    """Every phase-1/phase-2 ladder for GAINS + LOSSES, built once per process."""
+    return build_ladder_index(GAINS + LOSSES, generate_sure_amounts)
+
+LADDERS = load_ladder_index()
+
 # ---------- Session State init ----------
 if "started" not in st.session_state:
     st.session_state.started = False
@@ -298,7 +307,7 @@ if not st.session_state.started:
         st.session_state.results = []
 
         # Precompute first set of amounts
-        st.session_state.amounts = generate_sure_amounts(st.session_state.prospects[0], phase=1)
+        st.session_state.amounts = lookup_ladder(LADDERS, st.session_state.prospects[0], phase=1)
         st.session_state.started = True
         st.rerun()
 
@@ -406,27 +415,33 @@ else:
             else:
                 st.session_state.current_choices[idx] = proposed
         
-        # Render radios; keep all enabled; default from session state
-        choices = st.session_state.current_choices
-        for i, amt in enumerate(amounts):
-            col_a, col_b = st.columns([3, 3])
-            with col_a:
-                st.markdown(f"**Sure amount:** ${amt}")
-            with col_b:
-                options = ("Prefer Gamble", f"Prefer Sure ${amt}")
-                key = f"choice_{current}_{st.session_state.phase}_{i}"
-                default_index = None
-                if choices[i] is not None:
-                    default_index = 0 if choices[i] == "prospect" else 1
-                st.radio(
-                    "Your choice",
-                    options=options,
-                    index=default_index,
-                    horizontal=True,
-                    key=key,
-                    on_change=_on_radio_change,
-                    args=(key, i),
-                )
+        # The ladder is a fragment: a click reruns and redraws only these rows, not the page
+        # above them. Continue below is a full rerun (it changes phase or problem).
+        @st.fragment
+        def ladder_rows():
+            # Render radios; keep all enabled; default from session state
+            choices = st.session_state.current_choices
+            for i, amt in enumerate(amounts):
+                col_a, col_b = st.columns([3, 3])
+                with col_a:
+                    st.markdown(f"**Sure amount:** ${amt}")
+                with col_b:
+                    options = ("Prefer Gamble", f"Prefer Sure ${amt}")
+                    key = f"choice_{current}_{st.session_state.phase}_{i}"
+                    default_index = None
+                    if choices[i] is not None:
+                        default_index = 0 if choices[i] == "prospect" else 1
+                    st.radio(
+                        "Your choice",
+                        options=options,
+                        index=default_index,
+                        horizontal=True,
+                        key=key,
+                        on_change=_on_radio_change,
+                        args=(key, i),
+                    )
+
+        ladder_rows()
         # Continue button to advance phase or problem
         if st.button("Continue", use_container_width=True):
             choices = st.session_state.current_choices
@@ -461,8 +476,8 @@ else:
             if st.session_state.phase == 1:
                 st.session_state.phase1_choices.append(list(choices))
                 st.session_state.phase = 2
-                st.session_state.amounts = generate_sure_amounts(
-                    prospect, phase=2, phase1_choices=choices
+                st.session_state.amounts = lookup_ladder(
+                    LADDERS, prospect, phase=2, phase1_choices=choices
                 )
                 st.session_state.current_choices = [None] * 7
                 st.rerun()
@@ -486,7 +501,7 @@ else:
                 st.session_state.current_choices = [None] * 7
 
                 if st.session_state.index < total_problems:
-                    st.session_state.amounts = generate_sure_amounts(
-                        st.session_state.prospects[st.session_state.index], phase=1
+                    st.session_state.amounts = lookup_ladder(
+                        LADDERS, st.session_state.prospects[st.session_state.index], phase=1
                     )
                 st.rerun()
@@ -2,102 +2,38 @@
 import random
 import json
 import io
+import os
 from datetime import datetime
 
 import streamlit as st
 import pandas as pd
 
+from answer_log import open_answer_log
+from cohort_aggregates import CohortAggregates
+from prospect_catalog import compile_catalog, load_prospects
+from session_memory import purge_widget_keys
+from session_store import new_session_id, open_session_store
+from survey_ladders import (
+    bisection_amount,
+    bisection_certainty_equivalent,
+    bisection_done,
+    bisection_start,
+    bisection_steps,
+    bisection_update,
+    build_ladder_index,
+    ladder_by_id,
+    monotone_pattern,
+    pack_choices,
+)
+
 # ---------- Page setup ----------
 st.set_page_config(page_title="Risk Preference Survey", layout="wide")
 
 # ---------- Helper data ----------
 
-# Prospects adapted from your HTML (gains and losses)
-GAINS = [
-    {"outcomes": [0, 50], "probabilities": [0.99, 0.01], "description": "1% chance to win $50, 99% chance to win nothing"},
-    {"outcomes": [0, 50], "probabilities": [0.95, 0.05], "description": "5% chance to win $50, 95% chance to win nothing"},
-    {"outcomes": [0, 50], "probabilities": [0.90, 0.10], "description": "10% chance to win $50, 90% chance to win nothing"},
-    {"outcomes": [0, 50], "probabilities": [0.75, 0.25], "description": "25% chance to win $50, 75% chance to win nothing"},
-    {"outcomes": [0, 50], "probabilities": [0.50, 0.50], "description": "50% chance to win $50, 50% chance to win nothing"},
-
-    {"outcomes": [0, 100], "probabilities": [0.95, 0.05], "description": "5% chance to win $100, 95% chance to win nothing"},
-    {"outcomes": [0, 100], "probabilities": [0.90, 0.10], "description": "10% chance to win $100, 90% chance to win nothing"},
-    {"outcomes": [0, 100], "probabilities": [0.75, 0.25], "description": "25% chance to win $100, 75% chance to win nothing"},
-    {"outcomes": [0, 100], "probabilities": [0.50, 0.50], "description": "50% chance to win $100, 50% chance to win nothing"},
-    {"outcomes": [0, 100], "probabilities": [0.25, 0.75], "description": "75% chance to win $100, 25% chance to win nothing"},
-    {"outcomes": [0, 100], "probabilities": [0.10, 0.90], "description": "90% chance to win $100, 10% chance to win nothing"},
-    {"outcomes": [0, 100], "probabilities": [0.05, 0.95], "description": "95% chance to win $100, 5% chance to win nothing"},
-    {"outcomes": [0, 100], "probabilities": [0.01, 0.99], "description": "99% chance to win $100, 1% chance to win nothing"},
-
-    {"outcomes": [0, 200], "probabilities": [0.99, 0.01], "description": "1% chance to win $200, 99% chance to win nothing"},
-    {"outcomes": [0, 200], "probabilities": [0.95, 0.05], "description": "5% chance to win $200, 95% chance to win nothing"},
-    {"outcomes": [0, 200], "probabilities": [0.90, 0.10], "description": "10% chance to win $200, 90% chance to win nothing"},
-    {"outcomes": [0, 200], "probabilities": [0.50, 0.50], "description": "50% chance to win $200, 50% chance to win nothing"},
-    {"outcomes": [0, 200], "probabilities": [0.25, 0.75], "description": "75% chance to win $200, 25% chance to win nothing"},
-    {"outcomes": [0, 200], "probabilities": [0.10, 0.90], "description": "90% chance to win $200, 10% chance to win nothing"},
-    {"outcomes": [0, 200], "probabilities": [0.05, 0.95], "description": "95% chance to win $200, 5% chance to win nothing"},
-    {"outcomes": [0, 200], "probabilities": [0.01, 0.99], "description": "99% chance to win $200, 1% chance to win nothing"},
-
-    {"outcomes": [0, 400], "probabilities": [0.99, 0.01], "description": "1% chance to win $400, 99% chance to win nothing"},
-    {"outcomes": [0, 400], "probabilities": [0.95, 0.05], "description": "5% chance to win $400, 95% chance to win nothing"},
-    {"outcomes": [0, 400], "probabilities": [0.01, 0.99], "description": "99% chance to win $400, 1% chance to win nothing"},
-
-    {"outcomes": [50, 100], "probabilities": [0.90, 0.10], "description": "10% chance to win $100, 90% chance to win $50"},
-    {"outcomes": [50, 100], "probabilities": [0.50, 0.50], "description": "50% chance to win $100, 50% chance to win $50"},
-    {"outcomes": [50, 100], "probabilities": [0.25, 0.75], "description": "75% chance to win $100, 25% chance to win $50"},
-
-    {"outcomes": [50, 150], "probabilities": [0.95, 0.05], "description": "5% chance to win $150, 95% chance to win $50"},
-    {"outcomes": [50, 150], "probabilities": [0.90, 0.10], "description": "10% chance to win $150, 90% chance to win $50"},
-    {"outcomes": [50, 150], "probabilities": [0.50, 0.50], "description": "50% chance to win $150, 50% chance to win $50"},
-    {"outcomes": [50, 150], "probabilities": [0.25, 0.75], "description": "75% chance to win $150, 25% chance to win $50"},
-    {"outcomes": [50, 150], "probabilities": [0.10, 0.90], "description": "90% chance to win $150, 10% chance to win $50"},
-    {"outcomes": [50, 150], "probabilities": [0.05, 0.95], "description": "95% chance to win $150, 5% chance to win $50"},
-
-    {"outcomes": [100, 200], "probabilities": [0.95, 0.05], "description": "5% chance to win $200, 95% chance to win $100"},
-    {"outcomes": [100, 200], "probabilities": [0.90, 0.10], "description": "10% chance to win $200, 90% chance to win $100"},
-    {"outcomes": [100, 200], "probabilities": [0.50, 0.50], "description": "50% chance to win $200, 50% chance to win $100"},
-    {"outcomes": [100, 200], "probabilities": [0.25, 0.75], "description": "75% chance to win $200, 25% chance to win $100"},
-    {"outcomes": [100, 200], "probabilities": [0.10, 0.90], "description": "90% chance to win $200, 10% chance to win $100"},
-]
-
-LOSSES = [
-    {"outcomes": [0, -50], "probabilities": [0.90, 0.10], "description": "10% chance to lose $50, 90% chance to lose nothing"},
-    {"outcomes": [0, -50], "probabilities": [0.50, 0.50], "description": "50% chance to lose $50, 50% chance to lose nothing"},
-    {"outcomes": [0, -50], "probabilities": [0.10, 0.90], "description": "90% chance to lose $50, 10% chance to lose nothing"},
-
-    {"outcomes": [0, -100], "probabilities": [0.95, 0.05], "description": "5% chance to lose $100, 95% chance to lose nothing"},
-    {"outcomes": [0, -100], "probabilities": [0.75, 0.25], "description": "25% chance to lose $100, 75% chance to lose nothing"},
-    {"outcomes": [0, -100], "probabilities": [0.50, 0.50], "description": "50% chance to lose $100, 50% chance to lose nothing"},
-    {"outcomes": [0, -100], "probabilities": [0.25, 0.75], "description": "75% chance to lose $100, 25% chance to lose nothing"},
-    {"outcomes": [0, -100], "probabilities": [0.05, 0.95], "description": "95% chance to lose $100, 5% chance to lose nothing"},
-
-    {"outcomes": [0, -200], "probabilities": [0.99, 0.01], "description": "1% chance to lose $200, 99% chance to lose nothing"},
-    {"outcomes": [0, -200], "probabilities": [0.95, 0.05], "description": "5% chance to lose $200, 95% chance to lose nothing"},
-    {"outcomes": [0, -200], "probabilities": [0.50, 0.50], "description": "50% chance to lose $200, 50% chance to lose nothing"},
-    {"outcomes": [0, -200], "probabilities": [0.10, 0.90], "description": "90% chance to lose $200, 10% chance to lose nothing"},
-    {"outcomes": [0, -200], "probabilities": [0.05, 0.95], "description": "95% chance to lose $200, 5% chance to lose nothing"},
-
-    {"outcomes": [0, -400], "probabilities": [0.99, 0.01], "description": "1% chance to lose $400, 99% chance to lose nothing"},
-    {"outcomes": [0, -400], "probabilities": [0.95, 0.05], "description": "5% chance to lose $400, 95% chance to lose nothing"},
-    {"outcomes": [0, -400], "probabilities": [0.01, 0.99], "description": "99% chance to lose $400, 1% chance to lose nothing"},
-
-    {"outcomes": [-50, -100], "probabilities": [0.50, 0.50], "description": "50% chance to lose $100, 50% chance to lose $50"},
-    {"outcomes": [-50, -100], "probabilities": [0.25, 0.75], "description": "75% chance to lose $100, 25% chance to lose $50"},
-    {"outcomes": [-50, -100], "probabilities": [0.10, 0.90], "description": "90% chance to lose $100, 10% chance to lose $50"},
-
-    {"outcomes": [-50, -150], "probabilities": [0.95, 0.05], "description": "5% chance to lose $150, 95% chance to lose $50"},
-    {"outcomes": [-50, -150], "probabilities": [0.90, 0.10], "description": "10% chance to lose $150, 90% chance to lose $50"},
-    {"outcomes": [-50, -150], "probabilities": [0.50, 0.50], "description": "50% chance to lose $150, 50% chance to lose $50"},
-    {"outcomes": [-50, -150], "probabilities": [0.25, 0.75], "description": "75% chance to lose $150, 25% chance to lose $50"},
-    {"outcomes": [-50, -150], "probabilities": [0.10, 0.90], "description": "90% chance to lose $150, 10% chance to lose $50"},
-    {"outcomes": [-50, -150], "probabilities": [0.05, 0.95], "description": "95% chance to lose $150, 5% chance to lose $50"},
-
-    {"outcomes": [-100, -200], "probabilities": [0.95, 0.05], "description": "5% chance to lose $200, 95% chance to lose $100"},
-    {"outcomes": [-100, -200], "probabilities": [0.90, 0.10], "description": "10% chance to lose $200, 90% chance to lose $100"},
-    {"outcomes": [-100, -200], "probabilities": [0.50, 0.50], "description": "50% chance to lose $200, 50% chance to lose $100"},
-    {"outcomes": [-100, -200], "probabilities": [0.25, 0.75], "description": "75% chance to lose $200, 25% chance to lose $100"},
-    {"outcomes": [-100, -200], "probabilities": [0.10, 0.90], "description": "90% chance to lose $200, 10% chance to lose $100"},
-]
+# Prospects adapted from your HTML (gains and losses); edit catalogs/v3.json to change them
+GAINS = load_prospects("catalogs/v3.json", "gains")
+LOSSES = load_prospects("catalogs/v3.json", "losses")
 
 # ---------- Utilities ----------
 
@@ -236,6 +172,236 @@ def export_csv_blob(results, name, age):
     df = pd.DataFrame(rows)
     return df.to_csv(index=False).encode("utf-8")
 
+@st.cache_resource
+def load_ladder_index():
+    """Every phase-1/phase-2 ladder for GAINS + LOSSES, built once per process."""
+    return build_ladder_index(GAINS + LOSSES, generate_sure_amounts)
+
+LADDERS = load_ladder_index()
+
+@st.cache_resource
+def load_catalog():
+    """GAINS + LOSSES as frozen records with EV, domain and phase-1 ladder precomputed."""
+    return compile_catalog(GAINS + LOSSES, expected_value, is_loss_domain, generate_sure_amounts)
+
+# Sessions keep prospect ids (positions in CATALOG, the order LADDERS was built in), packed
+# phase-1 answers and bare CEs; descriptions, EVs and ladders are shared by every session.
+CATALOG = load_catalog()
+
+# Pickled size of a finished session's state that load_test.py checks against
+SESSION_STATE_BUDGET = 1024
+
+@st.cache_resource
+def load_cohort_aggregates():
+    """Running per-prospect / per-domain statistics over every result this process records."""
+    return CohortAggregates()
+
+COHORT = load_cohort_aggregates()
+
+ATTITUDE_COUNT_KEYS = {
+    "Risk Averse": "riskAverseCount",
+    "Risk Seeking": "riskSeekingCount",
+    "Risk Neutral": "riskNeutralCount",
+}
+
+def empty_summary():
+    return {
+        "totalProblems": 0, "gainProblems": 0, "lossProblems": 0,
+        "riskAverseCount": 0, "riskSeekingCount": 0, "riskNeutralCount": 0,
+    }
+
+@st.cache_resource
+def load_session_store(url):
+    """The shared progress store (session_store), one client per process and URL."""
+    return open_session_store(url)
+
+SESSION_STORE = load_session_store(os.environ.get("RISK_SURVEY_SESSION_STORE", "memory://"))
+
+@st.cache_resource
+def load_answer_log(path):
+    """The event log (answer_log) every step is appended to; None unless RISK_SURVEY_ANSWER_LOG is set."""
+    return open_answer_log(path)
+
+ANSWER_LOG = load_answer_log(os.environ.get("RISK_SURVEY_ANSWER_LOG"))
+
+# What a participant's progress is saved as after every step, under their ?sid= token, so a
+# new session on any worker resumes them; everything else in session state is derived
+PROGRESS_KEYS = ("started", "name", "age", "mode", "start_seed", "prospect_ids", "index", "phase", "phase1_choices", "ces", "bracket")
+
+# "ladder": two 7-row phases per problem. "bisection": one sure amount at a time, halving the
+# bracket around the CE after each answer. "switch": the same two ladders, but each phase is
+# one widget where the participant picks the row they switch at. Override per link with
+# ?mode=bisection or ?mode=switch.
+ELICITATION_MODE = "ladder"
+ELICITATION_MODES = ("ladder", "bisection", "switch")
+
+# ---------- Survey flow ----------
+def classify_risk_attitude(ce, ev):
+    return (
+        "Risk Averse" if ce < ev else
+        "Risk Seeking" if ce > ev else
+        "Risk Neutral"
+    )
+
+def current_prospect():
+    return CATALOG[st.session_state.prospect_ids[st.session_state.index]]
+
+def current_amounts():
+    """The current problem's ladder, looked up from the ids and packed answers in session state."""
+    pid = st.session_state.prospect_ids[st.session_state.index]
+    if st.session_state.phase == 1:
+        return CATALOG[pid].phase1_ladder
+    return ladder_by_id(LADDERS, pid, phase=2, phase1_mask=st.session_state.phase1_choices[st.session_state.index])
+
+def result_rows():
+    """Results in the export layout, expanded from the prospect ids and CEs in session state."""
+    rows = []
+    for pid, ce in zip(st.session_state.prospect_ids, st.session_state.ces):
+        prospect = CATALOG[pid]
+        rows.append({
+            "prospect": prospect.description,
+            "expected_value": prospect.rounded_ev,
+            "certainty_equivalent": ce,
+            "domain": prospect.domain,
+            "risk_attitude": classify_risk_attitude(ce, prospect.expected_value),
+        })
+    return rows
+
+def cohort_comparison(results):
+    """Per domain: this participant's mean risk premium (CE - EV) next to everyone's so far."""
+    cohort = {row["domain"]: row for row in COHORT.by_domain()}
+    rows = []
+    for domain in ("Gain Domain", "Loss Domain"):
+        premiums = [r["certainty_equivalent"] - r["expected_value"] for r in results if r["domain"] == domain]
+        if not premiums or domain not in cohort:
+            continue
+        rows.append({
+            "domain": domain,
+            "your_mean_premium": round(sum(premiums) / len(premiums), 2),
+            "cohort_mean_premium": round(cohort[domain]["mean_premium"], 2),
+            "cohort_results": cohort[domain]["count"],
+        })
+    return rows
+
+def save_progress():
+    if st.session_state.sid:
+        SESSION_STORE.save(st.session_state.sid, {k: st.session_state[k] for k in PROGRESS_KEYS})
+
+def log_event(*event):
+    """Append one answer_log event for this participant (no-op with the log off)."""
+    if ANSWER_LOG is not None and st.session_state.sid:
+        ANSWER_LOG.append(st.session_state.sid, event)
+
+def restore_progress(sid):
+    """Load a saved participant into this session; False if the store doesn't know `sid`."""
+    saved = SESSION_STORE.load(sid)
+    if saved is None:
+        return False
+    for k, v in saved.items():
+        st.session_state[k] = v
+    counts = empty_summary()
+    for row in result_rows():
+        counts["totalProblems"] += 1
+        counts["gainProblems" if row["domain"] == "Gain Domain" else "lossProblems"] += 1
+        counts[ATTITUDE_COUNT_KEYS[row["risk_attitude"]]] += 1
+    st.session_state.summary_counts = counts
+    return True
+
+def record_result(ce):
+    """Store the CE for the current problem and move on to the next one."""
+    prospect = current_prospect()
+    ev = prospect.expected_value
+    risk_att = classify_risk_attitude(ce, ev)
+    domain = prospect.domain
+    st.session_state.ces.append(ce)
+    log_event("result", st.session_state.index, ce)
+
+    # Summary counts and cohort statistics are updated here instead of rescanning results
+    counts = st.session_state.summary_counts
+    counts["totalProblems"] += 1
+    counts["gainProblems" if domain == "Gain Domain" else "lossProblems"] += 1
+    counts[ATTITUDE_COUNT_KEYS[risk_att]] += 1
+    COHORT.add(prospect.description, domain, ev, ce, risk_att)
+
+    st.session_state.index += 1
+    st.session_state.phase = 1
+    st.session_state.current_choices = [None] * 7
+    if st.session_state.index < len(st.session_state.prospect_ids):
+        nxt = current_prospect()
+        st.session_state.bracket = bisection_start(nxt.low, nxt.high)
+
+def finish_phase(choices, amounts):
+    """Store a complete, monotone phase answer: phase 1 selects the phase-2 ladder, phase 2 the CE."""
+    purge_widget_keys(st.session_state)  # this phase's radios / switch control are done with
+    log_event("phase", st.session_state.index, st.session_state.phase, pack_choices(choices))
+    if st.session_state.phase == 1:
+        st.session_state.phase1_choices += bytes([pack_choices(choices)])
+        st.session_state.phase = 2
+        st.session_state.current_choices = [None] * 7
+    else:
+        record_result(compute_certainty_equivalent(choices, amounts))
+    save_progress()
+
+def switch_label(k, amounts):
+    """Switch-point option k: the lowest sure amount still preferred to the gamble (k sure rows)."""
+    return "None" if k == 0 else f"${amounts[k - 1]}"
+
+def answer_bisection(choice):
+    """on_click for the bisection buttons; runs before the rerun so each answer costs one rerun."""
+    log_event("answer", st.session_state.index, st.session_state.bracket[2], int(choice == "sure"))
+    bracket = bisection_update(st.session_state.bracket, choice)
+    st.session_state.bracket = bracket
+    if bisection_done(bracket):
+        record_result(bisection_certainty_equivalent(bracket))
+    save_progress()
+
+def show_progress():
+    total_problems = len(st.session_state.prospect_ids)
+    if st.session_state.mode == "bisection":
+        steps_per_problem = bisection_steps()
+        step_in_problem = st.session_state.bracket[2] if st.session_state.bracket else 0
+    else:
+        steps_per_problem = 2  # two phases each
+        step_in_problem = st.session_state.phase - 1
+    total_steps = total_problems * steps_per_problem
+    current_step = st.session_state.index * steps_per_problem + step_in_problem
+    st.progress(min(1.0, current_step / total_steps))
+
+@st.fragment
+def bisection_question(problem):
+    """One sure amount per screen; the buttons' callbacks update the bracket.
+
+    Answers within a problem rerun only this fragment. The answer that finishes the problem
+    moves the index on, and the whole page is rerun for the next problem (or the results).
+    """
+    if st.session_state.index != problem:
+        st.rerun()
+    show_progress()
+    prospect = current_prospect()
+    ev = prospect.expected_value
+    domain = prospect.domain
+    amt = bisection_amount(st.session_state.bracket)
+
+    st.subheader(
+        f"Problem {problem + 1} of {len(st.session_state.prospect_ids)} — "
+        f"Question {st.session_state.bracket[2] + 1} of {bisection_steps()}"
+    )
+    st.caption(domain)
+    st.markdown(f"**Gamble:** {prospect.description}")
+    st.markdown(f"**Expected Value:** ${ev:.2f}")
+
+    if domain == "Loss Domain":
+        st.info("Do you prefer to **PAY** the sure amount to avoid the gamble, or **take the gamble**?")
+    else:
+        st.info("Do you prefer to **RECEIVE** the sure amount or **take the gamble**?")
+
+    st.markdown(f"**Sure amount:** ${amt}")
+    col_a, col_b = st.columns(2)
+    with col_a:
+        st.button("Prefer Gamble", on_click=answer_bisection, args=("prospect",), use_container_width=True)
+    with col_b:
+        st.button(f"Prefer Sure ${amt}", on_click=answer_bisection, args=("sure",), use_container_width=True)
+
 # ---------- Session State init ----------
 if "started" not in st.session_state:
     st.session_state.started = False
@@ -243,35 +409,55 @@ if "name" not in st.session_state:
     st.session_state.name = ""
 if "age" not in st.session_state:
     st.session_state.age = None
-if "prospects" not in st.session_state:
-    st.session_state.prospects = []
+if "prospect_ids" not in st.session_state:
+    st.session_state.prospect_ids = b""  # one byte per problem: its position in CATALOG
 if "index" not in st.session_state:
     st.session_state.index = 0
 if "phase" not in st.session_state:
     st.session_state.phase = 1  # 1 or 2
 if "phase1_choices" not in st.session_state:
-    st.session_state.phase1_choices = []  # stores choices for each prospect (list of 7)
+    st.session_state.phase1_choices = b""  # one pack_choices byte per problem
 if "current_choices" not in st.session_state:
     st.session_state.current_choices = [None] * 7
-if "amounts" not in st.session_state:
-    st.session_state.amounts = []
-if "results" not in st.session_state:
-    st.session_state.results = []
+if "ces" not in st.session_state:
+    st.session_state.ces = []  # certainty equivalent per finished problem; see result_rows()
+if "summary_counts" not in st.session_state:
+    st.session_state.summary_counts = empty_summary()
+if "mode" not in st.session_state:
+    mode = st.query_params.get("mode", ELICITATION_MODE)
+    st.session_state.mode = mode if mode in ELICITATION_MODES else ELICITATION_MODE
+if "bracket" not in st.session_state:
+    st.session_state.bracket = None  # (highest rejected, lowest accepted, answers) in bisection mode
+if "sid" not in st.session_state:
+    # A new session: resume the participant if the link carries a token the store knows
+    sid = st.query_params.get("sid")
+    st.session_state.sid = sid if sid and restore_progress(sid) else None
 
 # ---------- UI ----------
 st.title("Risk Preference Survey")
 
 if not st.session_state.started:
     with st.expander("What is this?", expanded=True):
-        st.markdown(
-            """
-            This survey examines how people make decisions involving **risk**. 
-            You'll see a series of problems where you choose between a **risky gamble** 
-            and a **sure amount**. Each problem has **two phases**:
-            1) an initial pass across 7 sure amounts, and 
-            2) a refined pass that zooms in based on your first answers.
-            """
-        )
+        if st.session_state.mode == "bisection":
+            st.markdown(
+                """
+                This survey examines how people make decisions involving **risk**. 
+                You'll see a series of problems where you choose between a **risky gamble** 
+                and a **sure amount**. Each problem shows **one sure amount at a time**; 
+                the next amount moves closer to the point where you switch, 
+                so each problem takes only a few answers.
+                """
+            )
+        else:
+            st.markdown(
+                """
+                This survey examines how people make decisions involving **risk**. 
+                You'll see a series of problems where you choose between a **risky gamble** 
+                and a **sure amount**. Each problem has **two phases**:
+                1) an initial pass across 7 sure amounts, and 
+                2) a refined pass that zooms in based on your first answers.
+                """
+            )
 
     col1, col2 = st.columns(2)
     with col1:
@@ -284,54 +470,62 @@ if not st.session_state.started:
             st.warning("Please enter both name and age.")
             st.stop()
 
-        # Randomly select 5 gains + 5 losses, shuffle
-        gains = random.sample(GAINS, 5)
-        losses = random.sample(LOSSES, 5)
-        prospects = gains + losses
-        random.shuffle(prospects)
-
-        st.session_state.prospects = prospects
+        # Randomly select 5 gains + 5 losses, shuffle; the seed is logged so a replay gets the same order
+        if st.session_state.get("start_seed") is None:  # a replay sets it beforehand; 0 is a valid seed
+            st.session_state.start_seed = random.getrandbits(32)
+        seed = st.session_state.start_seed
+        rng = random.Random(seed)
+        gains = rng.sample(range(len(GAINS)), 5)
+        losses = rng.sample(range(len(GAINS), len(CATALOG)), 5)
+        prospect_ids = gains + losses
+        rng.shuffle(prospect_ids)
+
+        st.session_state.prospect_ids = bytes(prospect_ids)
         st.session_state.index = 0
         st.session_state.phase = 1
-        st.session_state.phase1_choices = []  # reset all
+        st.session_state.phase1_choices = b""  # reset all
         st.session_state.current_choices = [None] * 7
-        st.session_state.results = []
+        st.session_state.ces = []
+        st.session_state.summary_counts = empty_summary()
 
-        # Precompute first set of amounts
-        st.session_state.amounts = generate_sure_amounts(st.session_state.prospects[0], phase=1)
+        first = CATALOG[prospect_ids[0]]
+        st.session_state.bracket = bisection_start(first.low, first.high)
         st.session_state.started = True
+        st.session_state.sid = new_session_id()
+        st.query_params["sid"] = st.session_state.sid
+        log_event("start", {"script": os.path.basename(__file__), "seed": seed, "mode": st.session_state.mode})
+        save_progress()
         st.rerun()
 
 else:
     # Survey in progress or finished
-    total_problems = len(st.session_state.prospects)
+    total_problems = len(st.session_state.prospect_ids)
     current = st.session_state.index
 
-    # Progress
-    total_steps = total_problems * 2  # two phases each
-    current_step = current * 2 + (st.session_state.phase - 1)
-    st.progress(min(1.0, current_step / total_steps))
+    # Progress (bisection questions draw their own, inside their fragment)
+    if st.session_state.mode != "bisection" or current >= total_problems:
+        show_progress()
 
     if current >= total_problems:
         # Done
         st.success("Survey complete!")
         # Show results table
-        df = pd.DataFrame(st.session_state.results)
+        results = result_rows()
+        df = pd.DataFrame(results)
         st.dataframe(df, use_container_width=True)
 
+        # How this participant compares with everyone this server has recorded
+        comparison = cohort_comparison(results)
+        if comparison:
+            st.markdown("**Compared with other participants** (risk premium = CE - EV; negative is risk averse)")
+            st.dataframe(pd.DataFrame(comparison), use_container_width=True, hide_index=True)
+
         # Export buttons
         timestamp = datetime.utcnow().strftime("%Y-%m-%dT%H-%M-%SZ")
         summary = {
             "participant": {"name": st.session_state.name, "age": st.session_state.age, "timestamp_utc": timestamp},
-            "results": st.session_state.results,
-            "summary": {
-                "totalProblems": len(st.session_state.results),
-                "gainProblems": sum(1 for r in st.session_state.results if r["domain"] == "Gain Domain"),
-                "lossProblems": sum(1 for r in st.session_state.results if r["domain"] == "Loss Domain"),
-                "riskAverseCount": sum(1 for r in st.session_state.results if r["risk_attitude"] == "Risk Averse"),
-                "riskSeekingCount": sum(1 for r in st.session_state.results if r["risk_attitude"] == "Risk Seeking"),
-                "riskNeutralCount": sum(1 for r in st.session_state.results if r["risk_attitude"] == "Risk Neutral"),
-            }
+            "results": results,
+            "summary": dict(st.session_state.summary_counts),
         }
 
         st.download_button(
@@ -344,7 +538,7 @@ else:
 
         st.download_button(
             "Download results (CSV)",
-            data=export_csv_blob(st.session_state.results, st.session_state.name, st.session_state.age),
+            data=export_csv_blob(results, st.session_state.name, st.session_state.age),
             file_name=f"risk_survey_{st.session_state.name.replace(' ', '_')}_{timestamp}.csv",
             mime="text/csv",
             use_container_width=True,
@@ -352,19 +546,66 @@ else:
 
         # Restart option
         if st.button("Start a new survey", use_container_width=True):
+            if st.session_state.sid:
+                SESSION_STORE.delete(st.session_state.sid)
+                del st.query_params["sid"]
             for k in list(st.session_state.keys()):
                 del st.session_state[k]
             st.rerun()
 
+    elif st.session_state.mode == "bisection":
+        bisection_question(current)
+
+    elif st.session_state.mode == "switch":
+        # One widget per phase instead of seven radios: the participant picks the lowest sure
+        # amount they still prefer, and the monotone row choices are derived from it here
+        prospect = current_prospect()
+        ev = prospect.expected_value
+        domain = prospect.domain
+        amounts = current_amounts()
+
+        st.subheader(f"Problem {current + 1} of {total_problems} — Phase {st.session_state.phase}")
+        st.caption(domain)
+        st.markdown(f"**Gamble:** {prospect.description}")
+        st.markdown(f"**Expected Value:** ${ev:.2f}")
+
+        if domain == "Loss Domain":
+            st.info("Pick the **most you would PAY** to avoid the gamble; for any larger payment you take the gamble. "
+                    "Pick **None** if you would rather take the gamble than pay any of these amounts.")
+            label = "Most you would pay instead of taking the gamble"
+        else:
+            st.info("Pick the **lowest sure amount you would RECEIVE** instead of the gamble; below it you take the gamble. "
+                    "Pick **None** if you would rather take the gamble than any of these amounts.")
+            label = "Lowest sure amount you prefer to the gamble"
+
+        with st.form(f"switch_form_{current}_{st.session_state.phase}"):
+            switch = st.segmented_control(
+                label,
+                options=list(range(1, len(amounts) + 1)) + [0],  # amounts high to low, as in the ladder, then None
+                format_func=lambda k: switch_label(k, amounts),
+                key=f"switch_{current}_{st.session_state.phase}",
+            )
+            submitted = st.form_submit_button("Continue", use_container_width=True)
+            if submitted:
+                if switch is None:
+                    log_event("submit", current, st.session_state.phase)
+                    log_event("reject", current, st.session_state.phase, "incomplete")
+                    st.error("Please pick an amount (or None) before continuing.")
+                    st.stop()
+                log_event("switch", current, st.session_state.phase, switch)
+                log_event("submit", current, st.session_state.phase)
+                finish_phase(monotone_pattern(switch, len(amounts)), amounts)
+                st.rerun()
+
     else:
         # Show current problem
-        prospect = st.session_state.prospects[current]
-        ev = expected_value(prospect)
-        domain = "Loss Domain" if is_loss_domain(prospect) else "Gain Domain"
+        prospect = current_prospect()
+        ev = prospect.expected_value
+        domain = prospect.domain
 
         st.subheader(f"Problem {current + 1} of {total_problems} — Phase {st.session_state.phase}")
         st.caption(domain)
-        st.markdown(f"**Gamble:** {prospect['description']}")
+        st.markdown(f"**Gamble:** {prospect.description}")
         st.markdown(f"**Expected Value:** ${ev:.2f}")
 
         # Prompt text
@@ -374,7 +615,7 @@ else:
             st.info("For each row below, choose whether you prefer to **RECEIVE** the sure amount or **take the gamble**.")
 
         # Amounts for this phase
-        amounts = st.session_state.amounts
+        amounts = current_amounts()
         choices = st.session_state.current_choices
 
         # Render 7 rows with radios
@@ -390,6 +631,7 @@ else:
             if ch == "prospect":
                 last_prospect_idx = _i if last_prospect_idx is None else max(last_prospect_idx, _i)
 
+        answered = []  # (row, 1 sure / 0 gamble, forced) as submitted, for the answer log
         with st.form(f"choices_form_{current}_{st.session_state.phase}"):
             for i, amt in enumerate(amounts):
                 col_a, col_b = st.columns([3, 3])
@@ -408,6 +650,7 @@ else:
                         # Force and disable the widget
                         choices[i] = force_choice
                         default_index = 0 if force_choice == "prospect" else 1
+                        answered.append((i, default_index, True))
                         st.radio(
                             "Your choice",
                             options=options,
@@ -431,9 +674,14 @@ else:
                             choices[i] = None
                         else:
                             choices[i] = "prospect" if val == "Prefer Gamble" else "sure"
+                            answered.append((i, int(choices[i] == "sure"), False))
 
             submitted = st.form_submit_button("Continue", use_container_width=True)
             if submitted:
+                phase = st.session_state.phase
+                for i, v, forced in answered:
+                    log_event("forced" if forced else "choice", current, phase, i, v)
+                log_event("submit", current, phase)
                 # After submit, enforce forced regions again to finalize the monotonic pattern
                 first_sure_idx = None
                 last_prospect_idx = None
@@ -446,81 +694,24 @@ else:
                 for i in range(len(choices)):
                     if first_sure_idx is not None and i < first_sure_idx:
                         choices[i] = "sure"
+                        log_event("forced", current, phase, i, 1)
                     if last_prospect_idx is not None and i > last_prospect_idx:
                         choices[i] = "prospect"
+                        log_event("forced", current, phase, i, 0)
 
                 # Validate all selected
                 if any(c is None for c in choices):
+                    log_event("reject", current, phase, "incomplete")
                     st.error("Please make a selection for all 7 rows.")
                     st.stop()
 
                 # Check consistency (should already be consistent, but keep the guard)
                 err = check_consistency(choices, amounts)
                 if err:
+                    log_event("reject", current, phase, "inconsistent")
                     st.error(err)
                     st.stop()
 
-                # Proceed
-                if st.session_state.phase == 1:
-                    # Save phase1 choices, advance to phase 2
-                    st.session_state.phase1_choices.append(list(choices))
-                    st.session_state.phase = 2
-                    # Generate refined amounts
-                    st.session_state.amounts = generate_sure_amounts(
-                        prospect, phase=2, phase1_choices=choices
-                    )
-                    # Reset current choices
-                    st.session_state.current_choices = [None] * 7
-                    st.rerun()
-                else:
-                    # Compute CE, store result, move to next prospect
-                    ce = compute_certainty_equivalent(choices, amounts)
-                    risk_att = (
-                        "Risk Averse" if ce < ev else
-                        "Risk Seeking" if ce > ev else
-                        "Risk Neutral"
-                    )
-                    st.session_state.results.append({
-                        "prospect": prospect["description"],
-                        "expected_value": round(ev, 2),
-                        "certainty_equivalent": ce,
-                        "domain": domain,
-                        "risk_attitude": risk_att,
-                    })
-
-                    # Advance to next
-                    st.session_state.index += 1
-                    st.session_state.phase = 1
-                    st.session_state.current_choices = [None] * 7
-
-                    if st.session_state.index < total_problems:
-                        st.session_state.amounts = generate_sure_amounts(
-                            st.session_state.prospects[st.session_state.index], phase=1
-                        )
-                    st.rerun()
-                else:
-                    # Compute CE, store result, move to next prospect
-                    ce = compute_certainty_equivalent(choices, amounts)
-                    risk_att = (
-                        "Risk Averse" if ce < ev else
-                        "Risk Seeking" if ce > ev else
-                        "Risk Neutral"
-                    )
-                    st.session_state.results.append({
-                        "prospect": prospect["description"],
-                        "expected_value": round(ev, 2),
-                        "certainty_equivalent": ce,
-                        "domain": domain,
-                        "risk_attitude": risk_att,
-                    })
-
-                    # Advance to next
-                    st.session_state.index += 1
-                    st.session_state.phase = 1
-                    st.session_state.current_choices = [None] * 7
-
-                    if st.session_state.index < total_problems:
-                        st.session_state.amounts = generate_sure_amounts(
-                            st.session_state.prospects[st.session_state.index], phase=1
-                        )
-                    st.rerun()
+                # Proceed: phase 1 advances to phase 2 (whose ladder it selects), phase 2 records the CE
+                finish_phase(choices, amounts)
+                st.rerun()
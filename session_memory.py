@@ -0,0 +1,211 @@
+"""Session-state memory profiler, leak detector and stale widget-key purge.
+
+A long-lived Streamlit process keeps every open session's st.session_state, so anything a
+script keeps appending to (results, per-phase answers, keyed widgets of finished phases)
+is retained for as long as the tab stays open. This module makes that visible:
+
+  key_footprint(state)      retained bytes per key, measured with tracemalloc as the size of
+                            a fresh copy of the value: memory rather than pickle size, with
+                            objects shared between sessions (catalog dicts) counted in each
+  SessionMemoryProfiler     per-session history of those footprints; `growing()` flags
+                            sessions whose total kept rising over the last `window`
+                            observations, with the keys that grew, and `top_growth()` diffs
+                            tracemalloc snapshots to the source lines still holding new memory
+  purge_widget_keys(state)  deletes the keyed ladder widgets (choice_<problem>_<phase>_<row>,
+                            switch_<problem>_<phase>) of finished phases; the survey scripts
+                            call it on every phase transition
+
+Diagnostic mode rides on rerun_metrics: every rerun's state is observed and the report is
+served next to the metrics.
+
+    RISK_SURVEY_MEMORY_PROFILE=1 streamlit run rerun_metrics.py -- risk_survey_consolidated.py
+    curl localhost:9464/sessions.json
+    python session_memory.py    # self-check on AppTest sessions and a simulated leak
+"""
+
+import collections
+import os
+import pickle
+import re
+import threading
+import tracemalloc
+from typing import Deque, Dict, List, Mapping, MutableMapping, Optional, Tuple
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Keys of the per-row radios / switch controls; "choice_mask" and other state don't match
+LADDER_WIDGET_KEYS = re.compile(r"^(choice|switch)_\d+_\d+(_\d+)?$")
+
+GROWTH_WINDOW = 50          # observations (reruns) a session must keep growing over
+GROWTH_BYTES = 32 * 1024    # ... by at least this much, to be flagged
+MAX_SESSIONS = 4096         # sessions tracked at once; the least recently seen is dropped
+
+
+# ---------- Measuring ----------
+def _copy_bytes(value) -> Optional[int]:
+    before = tracemalloc.get_traced_memory()[0]
+    try:
+        copy = pickle.loads(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return None
+    size = tracemalloc.get_traced_memory()[0] - before
+    del copy
+    return max(size, 0)
+
+
+def key_footprint(state: Mapping) -> Dict[str, Optional[int]]:
+    """Retained bytes of each key's value (None if it can't be copied), largest first."""
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    try:
+        sizes = {key: _copy_bytes(value) for key, value in state.items()}
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+    return dict(sorted(sizes.items(), key=lambda kv: -(kv[1] or 0)))
+
+
+def purge_widget_keys(state: MutableMapping, pattern: re.Pattern = LADDER_WIDGET_KEYS) -> List[str]:
+    """Delete every key matching `pattern` from `state` (st.session_state); returns the keys removed.
+
+    Call it when a phase ends: the next phase's widgets have new keys, so the old ones would
+    otherwise stay until Streamlit's own cleanup after the next completed run.
+    """
+    stale = [key for key in list(state.keys()) if isinstance(key, str) and pattern.match(key)]
+    for key in stale:
+        del state[key]
+    return stale
+
+
+# ---------- Profiler ----------
+class SessionMemoryProfiler:
+    """Footprint history per session, leak flags, and tracemalloc snapshot diffs.
+
+    With `trace=True` tracemalloc runs continuously (slower, but `top_growth` can attribute
+    memory to source lines); otherwise it is only switched on while measuring a footprint.
+    """
+
+    def __init__(self, window: int = GROWTH_WINDOW, min_growth: int = GROWTH_BYTES,
+                 trace: bool = False, frames: int = 1):
+        self.window = window
+        self.min_growth = min_growth
+        self._history: Dict[str, Deque[Tuple[int, Dict[str, Optional[int]]]]] = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+        if trace and not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    def observe(self, session: str, state: Mapping) -> int:
+        """Record one footprint of `session`'s state (e.g. after a rerun); returns its total bytes."""
+        sizes = key_footprint(state)
+        total = sum(size or 0 for size in sizes.values())
+        with self._lock:
+            history = self._history.pop(session, None) or collections.deque(maxlen=self.window)
+            history.append((total, sizes))
+            self._history[session] = history
+            if len(self._history) > MAX_SESSIONS:
+                self._history.popitem(last=False)
+        return total
+
+    def forget(self, session: str) -> None:
+        with self._lock:
+            self._history.pop(session, None)
+
+    def growing(self) -> List[Dict]:
+        """Sessions whose footprint never shrank over a full window and grew by min_growth."""
+        flagged = []
+        with self._lock:
+            histories = [(s, list(h)) for s, h in self._history.items()]
+        for session, history in histories:
+            if len(history) < self.window:
+                continue
+            totals = [total for total, _ in history]
+            growth = totals[-1] - totals[0]
+            if growth < self.min_growth or any(b < a for a, b in zip(totals, totals[1:])):
+                continue
+            first, last = history[0][1], history[-1][1]
+            grown = {key: (size or 0) - (first.get(key) or 0) for key, size in last.items()}
+            flagged.append({
+                "session": session,
+                "bytes": totals[-1],
+                "growth": growth,
+                "keys": {k: d for k, d in sorted(grown.items(), key=lambda kv: -kv[1]) if d > 0},
+            })
+        return sorted(flagged, key=lambda f: -f["growth"])
+
+    def sessions(self) -> List[Dict]:
+        """Latest footprint of every tracked session, largest first."""
+        with self._lock:
+            latest = [(s, h[-1]) for s, h in self._history.items() if h]
+        rows = [{"session": s, "bytes": total, "keys": sizes} for s, (total, sizes) in latest]
+        return sorted(rows, key=lambda r: -r["bytes"])
+
+    def top_growth(self, limit: int = 10, under: str = HERE) -> List[Dict]:
+        """Source lines under `under` whose retained memory grew since the previous call."""
+        if not tracemalloc.is_tracing():
+            return []
+        snapshot = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(True, os.path.join(under, "*"))])
+        previous, self._snapshot = self._snapshot, snapshot
+        if previous is None:
+            return []
+        stats = [s for s in snapshot.compare_to(previous, "lineno") if s.size_diff > 0][:limit]
+        return [{"line": f"{os.path.relpath(s.traceback[0].filename, under)}:{s.traceback[0].lineno}",
+                 "size_diff": s.size_diff, "count_diff": s.count_diff} for s in stats]
+
+    def report(self, limit: int = 20) -> Dict:
+        sessions = self.sessions()
+        return {
+            "sessions": len(sessions),
+            "total_bytes": sum(r["bytes"] for r in sessions),
+            "largest": sessions[:limit],
+            "growing": self.growing()[:limit],
+            "top_growth": self.top_growth(limit),
+        }
+
+
+PROFILER = SessionMemoryProfiler(trace=True) if os.environ.get("RISK_SURVEY_MEMORY_PROFILE") == "1" else None
+
+
+# ---------- Self-check ----------
+def _self_check(sessions: int = 3) -> List[str]:
+    """Profile consolidated-survey sessions with AppTest, then a session that leaks widget keys."""
+    import load_test
+
+    lines = []
+    profiler = SessionMemoryProfiler(window=20, min_growth=8 * 1024)
+    finals = []
+    for seed in range(sessions):
+        gen = load_test.respondent(os.path.join(HERE, "risk_survey_consolidated.py"), seed, load_test.Recorder(), 30)
+        try:
+            while True:
+                at = next(gen)
+                profiler.observe(f"s{seed}", at.session_state.to_dict())
+        except StopIteration as done:
+            finals.append(done.value.session_state.to_dict())
+    assert not any(LADDER_WIDGET_KEYS.match(k) for state in finals for k in state), "stale ladder widget keys"
+    top = profiler.sessions()[0]
+    lines.append(f"{sessions} finished sessions: {top['bytes']} bytes retained, largest keys "
+                 + ", ".join(f"{k} {v}" for k, v in list(top["keys"].items())[:3]))
+    lines.append(f"no ladder widget keys left after the last phase; flagged as growing: {len(profiler.growing())}")
+
+    # A session that keeps every phase's widget keys, as without purge_widget_keys
+    leaky: Dict = dict(finals[0])
+    for step in range(40):
+        for row in range(7):
+            leaky[f"choice_{step // 2}_{step % 2 + 1}_{row}"] = "Prefer Gamble" * 40
+        profiler.observe("leaky", leaky)
+    flagged = profiler.growing()
+    assert [f["session"] for f in flagged] == ["leaky"], flagged
+    lines.append(f"simulated leak flagged: +{flagged[0]['growth']} bytes over {profiler.window} reruns, "
+                 f"{len(flagged[0]['keys'])} keys grew")
+    purged = purge_widget_keys(leaky)
+    assert len(purged) == 280 and "choice_mask" in leaky
+    lines.append(f"purge_widget_keys removed {len(purged)} keys and kept choice_mask")
+    return lines
+
+
+if __name__ == "__main__":
+    for line in _self_check():
+        print(line)
@@ -0,0 +1,428 @@
+"""External session store, so any worker process can resume any participant.
+
+Streamlit keeps survey progress in the worker's st.session_state: a participant must stay on
+one process (sticky sessions) and a worker crash loses everyone's progress. Here the part of
+the state that can't be recomputed is saved after every step under a participant token
+(the ?sid= query parameter) to a shared backend, and a new session that arrives with a known
+token, on any worker, picks up where the participant left off.
+
+Backends, chosen by RISK_SURVEY_SESSION_STORE:
+
+  memory://                      process-local (the default; survives reconnects, not restarts)
+  sqlite:///path/sessions.db     a file shared by the workers on one host, WAL mode
+  redis://host:6379/0            anything speaking the Redis protocol (GET/SET EX/DEL); for
+                                 local runs, `python session_store.py --serve 6379` is a stand-in
+
+Progress is a small dict (ints, strings, bytes, and tuples, lists and dicts of those) stored
+as compact JSON: bytes as base64, tuples tagged so they come back as tuples. Entries expire
+after DEFAULT_TTL seconds without a save.
+
+    RISK_SURVEY_SESSION_STORE=sqlite:///sessions.db streamlit run risky_survey_streamlit_v3.py
+    python session_store.py --self-check
+"""
+
+import argparse
+import base64
+import json
+import os
+import secrets
+import socket
+import socketserver
+import sqlite3
+import sys
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib import parse
+
+
+DEFAULT_STORE_URL = os.environ.get("RISK_SURVEY_SESSION_STORE", "memory://")
+DEFAULT_TTL = 7 * 24 * 3600
+KEY_PREFIX = "risk_survey:session:"
+
+Progress = Dict[str, Any]
+
+
+# ---------- Encoding ----------
+# JSON has no bytes or tuples: they become one-key objects under these tags. An ordinary dict
+# that happens to look like a tag (one key, a tag name) is itself wrapped as {"__d": ...}.
+BYTES_TAG, TUPLE_TAG, DICT_TAG = "__b", "__t", "__d"
+_TAGS = (BYTES_TAG, TUPLE_TAG, DICT_TAG)
+
+
+def _encode_value(value):
+    if isinstance(value, (bytes, bytearray)):
+        return {BYTES_TAG: base64.b64encode(value).decode("ascii")}
+    if isinstance(value, tuple):
+        return {TUPLE_TAG: [_encode_value(v) for v in value]}
+    if isinstance(value, list):
+        return [_encode_value(v) for v in value]
+    if isinstance(value, dict):
+        encoded = {k: _encode_value(v) for k, v in value.items()}
+        return {DICT_TAG: encoded} if len(encoded) == 1 and next(iter(encoded)) in _TAGS else encoded
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        tag = next(iter(value)) if len(value) == 1 else None
+        if tag == BYTES_TAG:
+            return base64.b64decode(value[BYTES_TAG])
+        if tag == TUPLE_TAG:
+            return tuple(_decode_value(v) for v in value[TUPLE_TAG])
+        if tag == DICT_TAG:
+            value = value[DICT_TAG]
+        return {k: _decode_value(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_decode_value(v) for v in value]
+    return value
+
+
+def encode_progress(progress: Progress) -> bytes:
+    return json.dumps({k: _encode_value(v) for k, v in progress.items()}, separators=(",", ":")).encode("utf-8")
+
+
+def decode_progress(blob: bytes) -> Progress:
+    return {k: _decode_value(v) for k, v in json.loads(blob).items()}
+
+
+def new_session_id() -> str:
+    return secrets.token_urlsafe(12)
+
+
+# ---------- Backends ----------
+class SessionStore:
+    """get/set/delete of encoded progress by session id; backends only move bytes."""
+
+    def get(self, sid: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, sid: str, blob: bytes, ttl: int = DEFAULT_TTL) -> None:
+        raise NotImplementedError
+
+    def delete(self, sid: str) -> None:
+        raise NotImplementedError
+
+    def load(self, sid: str) -> Optional[Progress]:
+        blob = self.get(sid)
+        return None if blob is None else decode_progress(blob)
+
+    def save(self, sid: str, progress: Progress, ttl: int = DEFAULT_TTL) -> None:
+        self.set(sid, encode_progress(progress), ttl)
+
+
+class MemorySessionStore(SessionStore):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[bytes, float]] = {}
+
+    def get(self, sid: str) -> Optional[bytes]:
+        with self._lock:
+            hit = self._entries.get(sid)
+            if hit is None or hit[1] < time.time():
+                self._entries.pop(sid, None)
+                return None
+            return hit[0]
+
+    def set(self, sid: str, blob: bytes, ttl: int = DEFAULT_TTL) -> None:
+        with self._lock:
+            self._entries[sid] = (blob, time.time() + ttl)
+
+    def delete(self, sid: str) -> None:
+        with self._lock:
+            self._entries.pop(sid, None)
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    sid TEXT PRIMARY KEY,
+    progress BLOB NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+class SqliteSessionStore(SessionStore):
+    """One row per participant; WAL so several worker processes can share the file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def get(self, sid: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT progress FROM sessions WHERE sid = ? AND expires_at >= ?", (sid, time.time())
+            ).fetchone()
+        return None if row is None else bytes(row[0])
+
+    def set(self, sid: str, blob: bytes, ttl: int = DEFAULT_TTL) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO sessions (sid, progress, expires_at) VALUES (?, ?, ?)",
+                (sid, blob, time.time() + ttl),
+            )
+
+    def delete(self, sid: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE sid = ?", (sid,))
+
+    def prune_expired(self) -> int:
+        with self._lock:
+            return self._conn.execute("DELETE FROM sessions WHERE expires_at < ?", (time.time(),)).rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class RespError(RuntimeError):
+    pass
+
+
+def _resp_command(*parts) -> bytes:
+    out = [b"*%d\r\n" % len(parts)]
+    for part in parts:
+        data = part if isinstance(part, bytes) else str(part).encode("utf-8")
+        out.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(out)
+
+
+def _read_resp(f):
+    line = f.readline()
+    if not line:
+        raise ConnectionError("connection closed")
+    kind, rest = line[:1], line[1:-2]
+    if kind == b"+":
+        return rest
+    if kind == b"-":
+        raise RespError(rest.decode("utf-8", "replace"))
+    if kind == b":":
+        return int(rest)
+    if kind == b"$":
+        n = int(rest)
+        if n < 0:
+            return None
+        data = f.read(n + 2)
+        return data[:-2]
+    if kind == b"*":
+        return [_read_resp(f) for _ in range(int(rest))]
+    raise RespError(f"unexpected reply {line!r}")
+
+
+class RedisSessionStore(SessionStore):
+    """Minimal Redis-protocol client (one connection, reconnects once on failure); no redis package needed."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 6379, db: int = 0, timeout: float = 5):
+        self.address = (host, port)
+        self.db = db
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._sock: Optional[socket.socket] = None
+        self._file = None
+
+    def _connect(self) -> None:
+        self._sock = socket.create_connection(self.address, timeout=self.timeout)
+        self._file = self._sock.makefile("rb")
+        if self.db:
+            self._send("SELECT", self.db)
+
+    def _send(self, *parts):
+        self._sock.sendall(_resp_command(*parts))
+        return _read_resp(self._file)
+
+    def command(self, *parts):
+        with self._lock:
+            for attempt in (0, 1):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    return self._send(*parts)
+                except (OSError, ConnectionError):
+                    self.close_unlocked()
+                    if attempt:
+                        raise
+
+    def get(self, sid: str) -> Optional[bytes]:
+        return self.command("GET", KEY_PREFIX + sid)
+
+    def set(self, sid: str, blob: bytes, ttl: int = DEFAULT_TTL) -> None:
+        self.command("SET", KEY_PREFIX + sid, blob, "EX", ttl)
+
+    def delete(self, sid: str) -> None:
+        self.command("DEL", KEY_PREFIX + sid)
+
+    def close_unlocked(self) -> None:
+        if self._sock is not None:
+            self._sock.close()
+        self._sock = self._file = None
+
+    def close(self) -> None:
+        with self._lock:
+            self.close_unlocked()
+
+
+def open_session_store(url: str = DEFAULT_STORE_URL) -> SessionStore:
+    """memory://, sqlite:///path (or sqlite:///:memory:) or redis://host:port/db."""
+    parts = parse.urlparse(url)
+    if parts.scheme == "memory":
+        return MemorySessionStore()
+    if parts.scheme == "sqlite":
+        return SqliteSessionStore(parts.path[1:] if parts.path.startswith("/") else parts.path)
+    if parts.scheme == "redis":
+        db = int(parts.path.strip("/") or 0)
+        return RedisSessionStore(parts.hostname or "127.0.0.1", parts.port or 6379, db)
+    raise ValueError(f"unknown session store {url!r} (use memory://, sqlite:///path or redis://host:port)")
+
+
+# ---------- Redis-protocol stand-in ----------
+class _RespHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        data: Dict[bytes, Tuple[bytes, float]] = self.server.data
+        lock: threading.Lock = self.server.lock
+        while True:
+            try:
+                request = _read_resp(self.rfile)
+            except (ConnectionError, OSError):
+                return
+            if not isinstance(request, list) or not request:
+                self.wfile.write(b"-ERR expected a command array\r\n")
+                continue
+            name, args = request[0].upper(), request[1:]
+            with lock:
+                if name == b"PING":
+                    reply = b"+PONG\r\n"
+                elif name == b"SELECT":
+                    reply = b"+OK\r\n"
+                elif name == b"GET" and len(args) == 1:
+                    hit = data.get(args[0])
+                    if hit is not None and hit[1] < time.time():
+                        del data[args[0]]
+                        hit = None
+                    reply = b"$-1\r\n" if hit is None else b"$%d\r\n%s\r\n" % (len(hit[0]), hit[0])
+                elif name == b"SET" and len(args) in (2, 4):
+                    ttl = int(args[3]) if len(args) == 4 and args[2].upper() == b"EX" else DEFAULT_TTL
+                    data[args[0]] = (args[1], time.time() + ttl)
+                    reply = b"+OK\r\n"
+                elif name == b"DEL":
+                    reply = b":%d\r\n" % sum(data.pop(k, None) is not None for k in args)
+                else:
+                    reply = b"-ERR unsupported command\r\n"
+            self.wfile.write(reply)
+
+
+class RespStandIn(socketserver.ThreadingTCPServer):
+    """In-memory GET / SET [EX] / DEL / PING server for running without Redis."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address: Tuple[str, int] = ("127.0.0.1", 6379)):
+        super().__init__(address, _RespHandler)
+        self.data: Dict[bytes, Tuple[bytes, float]] = {}
+        self.lock = threading.Lock()
+
+    def start(self) -> "RespStandIn":
+        threading.Thread(target=self.serve_forever, name="resp-stand-in", daemon=True).start()
+        return self
+
+
+# ---------- Self-check ----------
+def _self_check() -> List[str]:
+    """Round trips on every backend, then a v3 participant resumed by a fresh session."""
+    import tempfile
+
+    progress = {"index": 3, "phase": 2, "prospect_ids": bytes([4, 17, 0, 9]), "phase1_choices": b"\x07\x1f\x00",
+                "ces": [12.5, -40.0, 0.0], "bracket": (10.0, 25.5, 2), "name": "Ada", "started": True}
+    blob = encode_progress(progress)
+    assert decode_progress(blob) == progress
+    lines = [f"codec: {len(blob)} bytes for a mid-survey participant, round trip exact"]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        server = RespStandIn(("127.0.0.1", 0)).start()
+        stores = {
+            "memory": MemorySessionStore(),
+            "sqlite": SqliteSessionStore(os.path.join(tmp, "sessions.db")),
+            "redis": open_session_store(f"redis://127.0.0.1:{server.server_address[1]}/0"),
+        }
+        for name, store in stores.items():
+            store.save("abc", progress)
+            assert store.load("abc") == progress and store.load("missing") is None, name
+            store.set("short", b"x", ttl=-1)
+            assert store.get("short") is None, name
+            store.delete("abc")
+            assert store.load("abc") is None, name
+        lines.append("memory, sqlite and redis (stand-in) backends: save/load/expire/delete")
+
+        lines += _resume_check(f"sqlite:///{os.path.join(tmp, 'resume.db')}")
+        stores["sqlite"].close()
+        server.shutdown()
+    return lines
+
+
+def _resume_check(url: str) -> List[str]:
+    """Half a v3 survey in one session, the rest in a new one (another worker) with the same ?sid=."""
+    saved = os.environ.get("RISK_SURVEY_SESSION_STORE")
+    os.environ["RISK_SURVEY_SESSION_STORE"] = url  # read by the v3 script on every run
+    try:
+        return _resume_in_new_session(url)
+    finally:
+        if saved is None:
+            os.environ.pop("RISK_SURVEY_SESSION_STORE", None)
+        else:
+            os.environ["RISK_SURVEY_SESSION_STORE"] = saved
+
+
+def _resume_in_new_session(url: str) -> List[str]:
+    from streamlit.testing.v1 import AppTest
+
+    import load_test
+
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "risky_survey_streamlit_v3.py")
+    first = load_test.respondent(script, 7, load_test.Recorder(), 30)
+    for _ in range(9):  # load, name, start, then three problems (two phases each)
+        at = next(first)
+    sid, index, phase = at.query_params["sid"], at.session_state["index"], at.session_state["phase"]
+    assert index == 3 and phase == 1, (index, phase)
+
+    second = AppTest.from_file(script, default_timeout=30)
+    second.query_params["sid"] = sid
+    second.run()
+    state = second.session_state
+    assert state["started"] and state["index"] == index and state["phase"] == phase
+    assert state["start_seed"] == at.session_state["start_seed"]
+    assert state["prospect_ids"] == at.session_state["prospect_ids"] and state["ces"] == at.session_state["ces"]
+    assert state["summary_counts"] == at.session_state["summary_counts"]
+    while not second.success:
+        for radio in second.radio:
+            if not radio.disabled:
+                radio.set_value(radio.options[0])
+        next(b for b in second.button if b.label == "Continue").click().run()
+    assert len(second.session_state["ces"]) == len(state["prospect_ids"])
+    return [f"{url.split(':')[0]}: participant {sid} resumed by a new session at problem {index + 1}, "
+            f"phase {phase}, and finished"]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Session store backends; a Redis-protocol stand-in server.")
+    parser.add_argument("--serve", type=int, metavar="PORT", help="run the in-memory Redis-protocol stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--self-check", action="store_true")
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        server = RespStandIn((args.host, args.serve))
+        print(f"Redis-protocol stand-in on {args.host}:{args.serve}", file=sys.stderr)
+        server.serve_forever()
+        return 0
+    for line in _self_check():
+        print(line)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
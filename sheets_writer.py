@@ -0,0 +1,168 @@
+"""Row building, rate limiting and retries for writing survey rows to Google Sheets.
+
+`save_to_google_sheets` used to call `worksheet.append_row` once per problem, i.e. 10 API calls
+per participant, which trips the Sheets write quota as soon as a class submits together.
+`response_journal.JournalSyncer` now writes many participants' rows per `append_rows` call
+through `append_rows_with_retry`: at most `rate_per_sec` calls per second (token bucket), and
+quota (429), server (5xx) and network errors retried with exponential backoff and jitter.
+Any other error is raised at once, since retrying a bad request only burns quota.
+
+`FakeWorksheet` stands in for a gspread worksheet so the syncer can be exercised locally.
+"""
+
+import datetime
+import random
+import threading
+import time
+import types
+from typing import Callable, Dict, List, Optional
+
+try:
+    from requests.exceptions import ConnectionError as RequestsConnectionError, Timeout as RequestsTimeout
+except ImportError:  # requests comes with gspread; without it only socket errors are network errors
+    NETWORK_ERRORS = (ConnectionError, TimeoutError)
+else:
+    NETWORK_ERRORS = (ConnectionError, TimeoutError, RequestsConnectionError, RequestsTimeout)
+
+
+Row = List
+
+
+# ---------- Row building ----------
+def rows_from_survey_data(survey_data: Dict, timestamp: Optional[str] = None) -> List[Row]:
+    """Flatten one participant's survey payload into sheet rows (one per problem)."""
+    timestamp = timestamp or datetime.datetime.now().isoformat()
+    participant_data = survey_data.get('participant', {})
+    name = participant_data.get('name', '')
+    age = participant_data.get('age', '')
+
+    rows = []
+    for i, result in enumerate(survey_data.get('results', [])):
+        rows.append([
+            timestamp,
+            name,
+            age,
+            i + 1,  # Problem number
+            result.get('domain', ''),
+            result.get('prospect', ''),
+            result.get('expectedValue', ''),
+            result.get('certaintyEquivalent', ''),
+            result.get('riskAttitude', ''),
+        ])
+    return rows
+
+
+# ---------- Rate limiting ----------
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, holding at most `capacity`."""
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """Take `tokens` if available and return 0.0; otherwise return the seconds to wait."""
+        with self._lock:
+            self._refill()
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return 0.0
+            return (tokens - self.tokens) / self.rate
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait <= 0:
+                return
+            self._sleep(wait)
+
+
+def is_retryable(error: Exception) -> bool:
+    """Whether a failed `append_rows` is worth retrying: a network error, or an HTTP 429 or 5xx.
+
+    gspread's APIError carries the HTTP response as `error.response`.
+    """
+    if isinstance(error, NETWORK_ERRORS):
+        return True
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    return isinstance(status, int) and (status == 429 or 500 <= status < 600)
+
+
+def append_rows_with_retry(
+    worksheet,
+    rows: List[Row],
+    bucket: TokenBucket,
+    max_retries: int = 5,
+    base_backoff: float = 1.0,
+    max_backoff: float = 32.0,
+    sleep: Callable[[float], None] = time.sleep,
+    stats: Optional[Dict] = None,
+) -> Optional[Exception]:
+    """One rate-limited `append_rows` call, retried with jittered exponential backoff.
+
+    Returns None on success, or the last exception once `max_retries` retries are used up.
+    Errors that `is_retryable` rejects are raised immediately.
+    """
+    for attempt in range(max_retries + 1):
+        bucket.acquire()
+        try:
+            worksheet.append_rows(rows)
+            return None
+        except Exception as e:
+            if not is_retryable(e):
+                raise
+            if attempt == max_retries:
+                return e
+            if stats is not None:
+                stats["retries"] = stats.get("retries", 0) + 1
+            delay = min(max_backoff, base_backoff * (2 ** attempt))
+            sleep(delay * (0.5 + random.random() / 2))
+    return None
+
+
+# ---------- Local stand-in ----------
+class FakeAPIError(Exception):
+    """Shaped like gspread's APIError: the HTTP response is on `.response`."""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(f"{status_code}: {message}")
+        self.response = types.SimpleNamespace(status_code=status_code)
+
+
+class FakeWorksheet:
+    """In-memory worksheet with the gspread append API; can fail the first `fail_first` calls.
+
+    The failures are 429 quota errors unless `error` says otherwise.
+    """
+
+    def __init__(self, fail_first: int = 0, latency: float = 0.0, error: Optional[Callable[[], Exception]] = None):
+        self.rows: List[Row] = []
+        self.calls = 0
+        self.fail_first = fail_first
+        self.latency = latency
+        self.error = error or (lambda: FakeAPIError(429, "Quota exceeded for quota metric 'Write requests'"))
+        self._lock = threading.Lock()
+
+    def append_rows(self, values, **kwargs) -> None:
+        with self._lock:
+            self.calls += 1
+            if self.calls <= self.fail_first:
+                raise self.error()
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.rows.extend(list(r) for r in values)
+
+    def append_row(self, values, **kwargs) -> None:
+        self.append_rows([values], **kwargs)
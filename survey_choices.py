@@ -0,0 +1,99 @@
+"""Bitmask encoding of a ladder's choice vector.
+
+A ladder answer is stored as a pair of ints `(answered, sure)`: bit i of `answered` is set
+once row i has a choice, and bit i of `sure` is set when that choice is the sure amount.
+Rows are ordered like the amounts (descending), so row 0 is the largest sure amount.
+
+Monotonicity only requires every answered 'sure' row to sit above every answered 'prospect'
+row, i.e. the highest sure bit must be below the lowest prospect bit. That is a couple of
+bit operations instead of the O(n^2) scans over lists of strings.
+"""
+
+from typing import List, Optional, Sequence, Tuple
+
+
+ChoiceMask = Tuple[int, int]  # (answered, sure)
+
+EMPTY: ChoiceMask = (0, 0)
+
+
+# ---------- Bit helpers ----------
+def _lowbit(x: int) -> int:
+    """Index of the lowest set bit (x must be non-zero)."""
+    return (x & -x).bit_length() - 1
+
+
+def _highbit(x: int) -> int:
+    """Index of the highest set bit (x must be non-zero)."""
+    return x.bit_length() - 1
+
+
+# ---------- Encoding ----------
+def encode_choices(choices: Sequence[Optional[str]]) -> ChoiceMask:
+    answered = sure = 0
+    for i, ch in enumerate(choices):
+        if ch is None:
+            continue
+        answered |= 1 << i
+        if ch == "sure":
+            sure |= 1 << i
+    return answered, sure
+
+
+def decode_choices(mask: ChoiceMask, rows: int) -> List[Optional[str]]:
+    answered, sure = mask
+    return [
+        None if not (answered >> i) & 1 else ("sure" if (sure >> i) & 1 else "prospect")
+        for i in range(rows)
+    ]
+
+
+def choice_at(mask: ChoiceMask, idx: int) -> Optional[str]:
+    answered, sure = mask
+    if not (answered >> idx) & 1:
+        return None
+    return "sure" if (sure >> idx) & 1 else "prospect"
+
+
+def set_choice(mask: ChoiceMask, idx: int, choice: Optional[str]) -> ChoiceMask:
+    """Return a new mask with row `idx` set to 'sure', 'prospect' or cleared (None)."""
+    answered, sure = mask
+    bit = 1 << idx
+    if choice is None:
+        return answered & ~bit, sure & ~bit
+    if choice == "sure":
+        return answered | bit, sure | bit
+    return answered | bit, sure & ~bit
+
+
+def is_complete(mask: ChoiceMask, rows: int) -> bool:
+    return mask[0] == (1 << rows) - 1
+
+
+# ---------- Monotonicity ----------
+def first_violation(mask: ChoiceMask) -> Optional[Tuple[int, int]]:
+    """Return (i, j) for the first row i where the gamble was chosen while a lower row j > i
+    chose the sure amount, or None if the answered rows are monotone.
+
+    Scanning rows top-down, the first offending row is always the topmost 'prospect' row,
+    and its partner is the nearest 'sure' row below it.
+    """
+    answered, sure = mask
+    prospect = answered & ~sure
+    if not sure or not prospect:
+        return None
+    i = _lowbit(prospect)
+    if _highbit(sure) <= i:
+        return None
+    return i, _lowbit(sure >> (i + 1)) + i + 1
+
+
+def switch_index(mask: ChoiceMask, rows: int) -> Optional[int]:
+    """Number of 'sure' rows on top if the mask is a complete monotone answer, else None."""
+    answered, sure = mask
+    if answered != (1 << rows) - 1:
+        return None
+    # A complete monotone answer has its sure bits as a contiguous run starting at row 0
+    if sure & (sure + 1):
+        return None
+    return sure.bit_length()
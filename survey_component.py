@@ -0,0 +1,186 @@
+"""Bidirectional Streamlit component that runs the whole survey in the browser.
+
+The native Streamlit scripts make a server round trip on every answer. This component
+serves survey_component_frontend/index.html, which runs the riskysurvey.html survey
+(ladder generation, consistency checks, CE scoring) entirely client-side from
+survey_engine.js and posts a single compact payload when the participant finishes:
+
+    {"name": "Ada", "age": 34, "answers": [[prospect index, phase-1 switch, phase-2 switch], ...]}
+
+Because answers are kept monotone, the two switch points determine every choice, so
+`score_payload` rebuilds the ladders and CEs on the server with a Python port of the engine
+instead of trusting client-computed numbers. Run this module directly to check the port
+against survey_engine.js (needs node).
+"""
+
+import json
+import math
+import os
+import shutil
+import subprocess
+from typing import Dict, List, Optional, Sequence
+
+import streamlit.components.v1 as components
+
+from survey_ladders import ROWS, monotone_pattern
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FRONTEND_DIR = os.path.join(HERE, "survey_component_frontend")
+
+PER_DOMAIN = 5
+
+_component = components.declare_component("risk_survey", path=FRONTEND_DIR)
+
+
+def risk_survey(gains: Sequence[Dict], losses: Sequence[Dict], per_domain: int = PER_DOMAIN,
+                key: Optional[str] = None) -> Optional[Dict]:
+    """Render the survey; returns the final payload once the participant finishes, else None."""
+    def slim(p):
+        return {k: p[k] for k in ("outcomes", "probabilities", "description")}
+    return _component(
+        gains=[slim(p) for p in gains],
+        losses=[slim(p) for p in losses],
+        per_domain=per_domain,
+        key=key,
+        default=None,
+    )
+
+
+# ---------- Engine port (survey_engine.js) ----------
+def _js_round(x: float) -> float:
+    """Math.round: halves go towards +infinity."""
+    return float(math.floor(x + 0.5))
+
+
+def engine_sure_amounts(prospect: Dict, phase: int, phase1_choices: Optional[Sequence[str]] = None) -> List[float]:
+    lo, hi = min(prospect["outcomes"]), max(prospect["outcomes"])
+    rng = hi - lo
+
+    if phase == 1:
+        amounts = [_js_round(lo + math.pow(10, (i / 6) * math.log10(rng + 1)) - 1) for i in range(ROWS)]
+        return sorted(amounts, reverse=True)
+
+    phase1_amounts = engine_sure_amounts(prospect, 1)
+    lowest_accepted = None
+    highest_rejected = None
+    for amt, choice in zip(phase1_amounts, phase1_choices or []):
+        if choice == "sure":
+            if lowest_accepted is None or amt < lowest_accepted:
+                lowest_accepted = amt
+        elif choice == "prospect":
+            if highest_rejected is None or amt > highest_rejected:
+                highest_rejected = amt
+
+    if lowest_accepted is not None and highest_rejected is not None:
+        lower = lowest_accepted - abs(lowest_accepted) * 0.25
+        upper = highest_rejected + abs(highest_rejected) * 0.25
+    elif lowest_accepted is not None:
+        lower = lowest_accepted - abs(lowest_accepted) * 0.5
+        upper = lowest_accepted + abs(lowest_accepted) * 0.25
+    elif highest_rejected is not None:
+        lower = highest_rejected - abs(highest_rejected) * 0.25
+        upper = highest_rejected + abs(highest_rejected) * 0.5
+    else:
+        lower, upper = lo, hi
+
+    max_bound, min_bound = max(lower, upper), min(lower, upper)
+    return [_js_round((max_bound - (i / 6) * (max_bound - min_bound)) * 100) / 100 for i in range(ROWS)]
+
+
+def engine_certainty_equivalent(choices: Sequence[str], amounts: Sequence[float]) -> float:
+    lowest_accepted = None
+    highest_rejected = None
+    for amt, ch in zip(amounts, choices):
+        if ch == "sure":
+            lowest_accepted = amt
+        elif ch == "prospect" and lowest_accepted is None:
+            highest_rejected = amt
+    if lowest_accepted is not None and highest_rejected is not None:
+        return (lowest_accepted + highest_rejected) / 2
+    if lowest_accepted is not None:
+        return lowest_accepted
+    if highest_rejected is not None:
+        return highest_rejected
+    return 0.0
+
+
+# ---------- Payload ----------
+def score_payload(payload: Dict, gains: Sequence[Dict], losses: Sequence[Dict],
+                  per_domain: int = PER_DOMAIN) -> List[Dict]:
+    """Validate the component payload and rebuild result rows in the v3 layout.
+
+    Raises ValueError for anything the frontend could not have produced.
+    """
+    catalog = list(gains) + list(losses)
+    answers = payload.get("answers")
+    if not isinstance(answers, list) or len(answers) != 2 * per_domain:
+        raise ValueError(f"Expected {2 * per_domain} answers, got {answers!r:.80}")
+    seen = set()
+    n_gains = 0
+    results = []
+    for answer in answers:
+        if (not isinstance(answer, list) or len(answer) != 3
+                or not all(isinstance(v, int) and not isinstance(v, bool) for v in answer)):
+            raise ValueError(f"Malformed answer {answer!r:.80}")
+        pid, k1, k2 = answer
+        if not 0 <= pid < len(catalog) or pid in seen or not (0 <= k1 <= ROWS and 0 <= k2 <= ROWS):
+            raise ValueError(f"Answer out of range: {answer}")
+        seen.add(pid)
+        n_gains += pid < len(gains)
+
+        prospect = catalog[pid]
+        amounts = engine_sure_amounts(prospect, 2, monotone_pattern(k1))
+        ce = engine_certainty_equivalent(monotone_pattern(k2), amounts)
+        ev = sum(o * p for o, p in zip(prospect["outcomes"], prospect["probabilities"]))
+        results.append({
+            "prospect": prospect["description"],
+            "expected_value": round(ev, 2),
+            "certainty_equivalent": round(ce, 2),
+            "domain": "Loss Domain" if any(o < 0 for o in prospect["outcomes"]) else "Gain Domain",
+            "risk_attitude": "Risk Averse" if ce < ev else "Risk Seeking" if ce > ev else "Risk Neutral",
+        })
+    if n_gains != per_domain:
+        raise ValueError(f"Expected {per_domain} gain and {per_domain} loss problems, got {n_gains} gains")
+    return results
+
+
+# ---------- Parity check ----------
+def _js_ladders(catalog: Sequence[Dict]) -> List:
+    """survey_engine.js under node, for each prospect: [phase-1 ladder, [[phase-2 ladder, CEs
+    for switch points 0..7] for phase-1 switch points 0..7]]."""
+    js = (
+        "const e = require(%s);"
+        "const cat = JSON.parse(require('fs').readFileSync(0, 'utf8'));"
+        "const pat = (k) => Array.from({length: 7}, (_, i) => i < k ? 'sure' : 'prospect');"
+        "const out = cat.map(p => [e.generateSureAmounts(p, 1),"
+        "  [0,1,2,3,4,5,6,7].map(k1 => { const a = e.generateSureAmounts(p, 2, pat(k1));"
+        "    return [a, [0,1,2,3,4,5,6,7].map(k2 => e.certaintyEquivalent(pat(k2), a))]; })]);"
+        "console.log(JSON.stringify(out));"
+    ) % json.dumps(os.path.join(FRONTEND_DIR, "survey_engine.js"))
+    slim = [{k: p[k] for k in ("outcomes", "probabilities")} for p in catalog]
+    proc = subprocess.run([shutil.which("node"), "-e", js], input=json.dumps(slim),
+                          capture_output=True, text=True, check=True)
+    return json.loads(proc.stdout)
+
+
+def _parity_check(script: str = "risky_survey_streamlit_v3.py") -> List[str]:
+    """Compare every ladder and CE of the Python port with survey_engine.js under node."""
+    from survey_variants import load_survey_functions
+
+    if shutil.which("node") is None:
+        return ["node not found; skipped"]
+    ns = load_survey_functions(script)
+    catalog = ns["GAINS"] + ns["LOSSES"]
+    for p, (phase1, phase2) in zip(catalog, _js_ladders(catalog)):
+        assert engine_sure_amounts(p, 1) == phase1, (p, phase1)
+        for k1, (amounts, ces) in enumerate(phase2):
+            assert engine_sure_amounts(p, 2, monotone_pattern(k1)) == amounts, (p, k1, amounts)
+            for k2, ce in enumerate(ces):
+                assert engine_certainty_equivalent(monotone_pattern(k2), amounts) == ce, (p, k1, k2, ce)
+    return [f"{script}: {len(catalog)} prospects x {ROWS + 1} phase-1 answers match survey_engine.js"]
+
+
+if __name__ == "__main__":
+    for line in _parity_check():
+        print(line)
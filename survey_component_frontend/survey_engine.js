@@ -0,0 +1,106 @@
+// Ladder generation, consistency checks and CE scoring from riskysurvey.html, as pure
+// functions so the component page and Node (survey_component.py's parity check) share them.
+(function (root) {
+    function generateSureAmounts(prospect, phase, phase1Choices) {
+        const [min, max] = [Math.min(...prospect.outcomes), Math.max(...prospect.outcomes)];
+        const range = max - min;
+
+        if (phase === 1) {
+            // Logarithmically spaced amounts
+            const amounts = [];
+            for (let i = 0; i < 7; i++) {
+                const ratio = Math.pow(10, (i / 6) * Math.log10(range + 1));
+                amounts.push(Math.round(min + ratio - 1));
+            }
+            return amounts.sort((a, b) => b - a); // Descending order
+        }
+
+        // Phase 2: Linear spacing between bounds set by the phase 1 answers
+        const phase1Amounts = generateSureAmounts(prospect, 1);
+        let lowestAccepted = null;
+        let highestRejected = null;
+        for (let i = 0; i < phase1Choices.length; i++) {
+            if (phase1Choices[i] === 'sure') {
+                if (lowestAccepted === null || phase1Amounts[i] < lowestAccepted) {
+                    lowestAccepted = phase1Amounts[i];
+                }
+            } else if (phase1Choices[i] === 'prospect') {
+                if (highestRejected === null || phase1Amounts[i] > highestRejected) {
+                    highestRejected = phase1Amounts[i];
+                }
+            }
+        }
+
+        // 25% below the lowest accepted value, 25% above the highest rejected value
+        let lowerBound, upperBound;
+        if (lowestAccepted !== null && highestRejected !== null) {
+            lowerBound = lowestAccepted - Math.abs(lowestAccepted) * 0.25;
+            upperBound = highestRejected + Math.abs(highestRejected) * 0.25;
+        } else if (lowestAccepted !== null) {
+            lowerBound = lowestAccepted - Math.abs(lowestAccepted) * 0.5;
+            upperBound = lowestAccepted + Math.abs(lowestAccepted) * 0.25;
+        } else if (highestRejected !== null) {
+            lowerBound = highestRejected - Math.abs(highestRejected) * 0.25;
+            upperBound = highestRejected + Math.abs(highestRejected) * 0.5;
+        } else {
+            lowerBound = min;
+            upperBound = max;
+        }
+
+        const maxBound = Math.max(lowerBound, upperBound);
+        const minBound = Math.min(lowerBound, upperBound);
+        const amounts = [];
+        for (let i = 0; i < 7; i++) {
+            amounts.push(Math.round((maxBound - (i / 6) * (maxBound - minBound)) * 100) / 100);
+        }
+        return amounts;
+    }
+
+    function checkConsistency(choices, amounts, index, choice) {
+        // Preferring a sure amount means preferring every higher one too, and vice versa
+        if (choice === 'sure') {
+            for (let i = 0; i < index; i++) {
+                if (choices[i] === 'prospect') {
+                    return `Inconsistency: You cannot prefer the sure amount ${amounts[index]} but reject the higher sure amount ${amounts[i]}`;
+                }
+            }
+        } else if (choice === 'prospect') {
+            for (let i = index + 1; i < choices.length; i++) {
+                if (choices[i] === 'sure') {
+                    return `Inconsistency: You cannot prefer the prospect over ${amounts[index]} but prefer the lower sure amount ${amounts[i]}`;
+                }
+            }
+        }
+        return null;
+    }
+
+    function certaintyEquivalent(choices, amounts) {
+        let lowestAccepted = null;
+        let highestRejected = null;
+        for (let i = 0; i < choices.length; i++) {
+            if (choices[i] === 'sure') {
+                lowestAccepted = amounts[i];
+            } else if (choices[i] === 'prospect' && lowestAccepted === null) {
+                highestRejected = amounts[i];
+            }
+        }
+        if (lowestAccepted !== null && highestRejected !== null) return (lowestAccepted + highestRejected) / 2;
+        if (lowestAccepted !== null) return lowestAccepted;
+        if (highestRejected !== null) return highestRejected;
+        return 0;
+    }
+
+    function switchPoint(choices) {
+        // Number of 'sure' rows on top; answers are kept monotone by checkConsistency
+        let k = 0;
+        while (k < choices.length && choices[k] === 'sure') k++;
+        return k;
+    }
+
+    const api = { generateSureAmounts, checkConsistency, certaintyEquivalent, switchPoint };
+    if (typeof module !== 'undefined' && module.exports) {
+        module.exports = api;
+    } else {
+        root.SurveyEngine = api;
+    }
+})(this);
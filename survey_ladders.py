@@ -0,0 +1,165 @@
+"""Build-once ladder index for the two-phase sure-amount ladders.
+
+Every survey script derives its ladders from `generate_sure_amounts(prospect, phase, phase1_choices)`.
+With monotonicity enforced, a complete phase-1 answer is always some number of "sure" rows
+followed by "prospect" rows, so it is fully described by its switch point k (0..rows).
+That leaves only rows + 1 possible phase-2 ladders per prospect, which we compute once per
+process and then look up in O(1) instead of regenerating on every rerun.
+
+It also holds the adaptive alternative to the two ladders: a bisection staircase that shows
+one sure amount at a time and halves the bracket around the CE after every answer.
+"""
+
+import math
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+
+ROWS = 7
+
+LadderKey = Tuple[int, int, Optional[int]]  # (prospect id, phase, switch point)
+
+# Bracket width to stop at, as a fraction of the prospect's outcome range. Phase-2 rows are
+# about range/19 apart for the v3 catalog, so 5% matches the two-phase precision; it takes
+# ceil(log2(1 / 0.05)) = 5 answers instead of 14.
+BISECTION_TOLERANCE = 0.05
+
+Bracket = Tuple[float, float, int]  # (highest rejected, lowest accepted, answers so far)
+
+
+# ---------- Keys & patterns ----------
+def prospect_key(prospect: Dict) -> Tuple[tuple, tuple]:
+    """Hashable identity of a prospect (its outcomes and probabilities)."""
+    return tuple(prospect["outcomes"]), tuple(prospect["probabilities"])
+
+
+def monotone_pattern(switch: int, rows: int = ROWS) -> List[str]:
+    """Choice vector with 'sure' on the first `switch` rows and 'prospect' below."""
+    return ["sure"] * switch + ["prospect"] * (rows - switch)
+
+
+def switch_point(choices: Sequence[Optional[str]]) -> Optional[int]:
+    """Return k if `choices` is a complete monotone pattern (k sure rows on top), else None."""
+    k = 0
+    for ch in choices:
+        if ch != "sure":
+            break
+        k += 1
+    for ch in choices[k:]:
+        if ch != "prospect":
+            return None
+    return k
+
+
+def pack_choices(choices: Sequence[str]) -> int:
+    """A complete choice vector as one byte-sized bitmask: bit i is set when row i is 'sure'."""
+    return sum(1 << i for i, ch in enumerate(choices) if ch == "sure")
+
+
+def unpack_choices(mask: int, rows: int = ROWS) -> List[str]:
+    return ["sure" if mask >> i & 1 else "prospect" for i in range(rows)]
+
+
+# ---------- Index ----------
+def build_ladder_index(
+    prospects: Sequence[Dict],
+    generate_sure_amounts: Callable,
+    rows: int = ROWS,
+) -> Dict:
+    """Precompute the phase-1 ladder and every phase-2 ladder for each prospect.
+
+    Prospect ids are positions in `prospects`. Ladders are stored as tuples so the
+    index can be shared safely between sessions.
+    """
+    ids: Dict[Tuple[tuple, tuple], int] = {}
+    ladders: Dict[LadderKey, Tuple[float, ...]] = {}
+
+    for pid, prospect in enumerate(prospects):
+        ids.setdefault(prospect_key(prospect), pid)
+        ladders[(pid, 1, None)] = tuple(generate_sure_amounts(prospect, phase=1))
+        # Phase 2 without phase-1 choices has its own fallback spread in every script
+        ladders[(pid, 2, None)] = tuple(generate_sure_amounts(prospect, phase=2))
+        for k in range(rows + 1):
+            ladders[(pid, 2, k)] = tuple(
+                generate_sure_amounts(prospect, phase=2, phase1_choices=monotone_pattern(k, rows))
+            )
+
+    return {"ids": ids, "ladders": ladders, "generate": generate_sure_amounts, "rows": rows,
+            "prospects": tuple(prospects)}
+
+
+def prospect_id(index: Dict, prospect: Dict) -> Optional[int]:
+    return index["ids"].get(prospect_key(prospect))
+
+
+def ladder_by_id(index: Dict, pid: int, phase: int, phase1_mask: Optional[int] = None) -> Tuple[float, ...]:
+    """The shared ladder tuple for prospect id `pid`, with phase-1 answers packed by pack_choices.
+
+    Sessions that keep ids and packed choices can hold this tuple (or recompute it) instead
+    of a per-session copy; non-monotone phase-1 answers fall back to the generator.
+    """
+    if phase == 1:
+        return index["ladders"][(pid, 1, None)]
+    if phase1_mask is None:
+        return index["ladders"][(pid, 2, None)]
+    choices = unpack_choices(phase1_mask, index["rows"])
+    ladder = index["ladders"].get((pid, 2, switch_point(choices)))
+    if ladder is None:
+        return tuple(index["generate"](index["prospects"][pid], phase=2, phase1_choices=choices))
+    return ladder
+
+
+def lookup_ladder(
+    index: Dict,
+    prospect: Dict,
+    phase: int,
+    phase1_choices: Optional[Sequence[Optional[str]]] = None,
+) -> List[float]:
+    """Return the ladder for `prospect`, falling back to the generator for anything not indexed
+    (unknown prospects or non-monotone phase-1 answers)."""
+    pid = prospect_id(index, prospect)
+    k = None
+    if phase != 1 and phase1_choices:
+        k = switch_point(phase1_choices) if len(phase1_choices) == index["rows"] else None
+        if k is None:
+            pid = None
+
+    ladder = index["ladders"].get((pid, 1 if phase == 1 else 2, k)) if pid is not None else None
+    if ladder is None:
+        return index["generate"](prospect, phase=phase, phase1_choices=phase1_choices)
+    return list(ladder)
+
+
+# ---------- Bisection staircase ----------
+def bisection_steps(tolerance: float = BISECTION_TOLERANCE) -> int:
+    """Answers needed to narrow the full outcome range to `tolerance` of it."""
+    return max(1, math.ceil(math.log2(1.0 / tolerance)))
+
+
+def bisection_start(low: float, high: float) -> Bracket:
+    """The CE lies between the worst and best outcome."""
+    return float(low), float(high), 0
+
+
+def bisection_amount(bracket: Bracket) -> float:
+    """Sure amount to offer next: the middle of the bracket."""
+    lo, hi, _ = bracket
+    return round((lo + hi) / 2, 2)
+
+
+def bisection_update(bracket: Bracket, choice: str) -> Bracket:
+    """Preferring the sure amount puts the CE below it; preferring the gamble puts it above."""
+    lo, hi, step = bracket
+    amount = bisection_amount(bracket)
+    if choice == "sure":
+        return lo, amount, step + 1
+    return amount, hi, step + 1
+
+
+def bisection_done(bracket: Bracket, tolerance: float = BISECTION_TOLERANCE) -> bool:
+    return bracket[2] >= bisection_steps(tolerance)
+
+
+def bisection_certainty_equivalent(bracket: Bracket) -> float:
+    """Midpoint of highest rejected and lowest accepted amount, as in compute_certainty_equivalent."""
+    lo, hi, _ = bracket
+    return round((lo + hi) / 2, 2)
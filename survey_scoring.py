@@ -0,0 +1,194 @@
+"""Vectorized batch scoring of ladder answers with NumPy.
+
+`score_batch` scores N ladders at once and reproduces the scalar helpers exactly:
+
+- convention "midpoint" matches `compute_certainty_equivalent` / `risk_attitude_from_ce` in the
+  risk_survey_consolidated*.py scripts (CE = midpoint of last 'sure' row and first 'prospect' row);
+- convention "lowest_accepted" matches `compute_certainty_equivalent` in the GAINS/LOSSES scripts
+  (risky_survey_streamlit*.py, risky_survey_44.py, risk_survey_clean.py).
+
+Choice matrices are int8 (N, rows): 1 = 'sure', 0 = 'prospect', -1 = unanswered.
+Run this module directly to check parity against the scalar functions.
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+SURE, PROSPECT, UNANSWERED = 1, 0, -1
+
+ATTITUDES = np.array(["Risk Averse", "Risk Seeking", "Risk Neutral"], dtype=object)
+
+CONVENTIONS = ("midpoint", "lowest_accepted")
+
+
+# ---------- Encoding ----------
+def encode_choice_matrix(choice_lists: Sequence[Sequence[Optional[str]]]) -> np.ndarray:
+    """Turn lists of 'sure'/'prospect'/None into an int8 choice matrix."""
+    codes = {"sure": SURE, "prospect": PROSPECT, None: UNANSWERED}
+    return np.array([[codes[ch] for ch in row] for row in choice_lists], dtype=np.int8)
+
+
+def _round2(x: np.ndarray) -> np.ndarray:
+    """Same result as Python's round(x, 2) element-wise.
+
+    round() rounds the exact binary value, whereas np.round rounds x * 100 after it has
+    already been rounded to a double, which tips values sitting on a half-cent the wrong way.
+    The product's rounding error is recovered exactly (Dekker's two-product; 100 splits
+    exactly) and decides those ties.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = x * 100.0
+    c = 134217729.0 * x  # 2**27 + 1
+    x_hi = c - (c - x)
+    x_lo = x - x_hi
+    err = (x_hi * 100.0 - y) + x_lo * 100.0
+    fl = np.floor(y)
+    half = (y - fl) == 0.5
+    n = np.where(half & (err > 0), fl + 1, np.where(half & (err < 0), fl, np.rint(y)))
+    return n / 100.0
+
+
+# ---------- Scoring ----------
+def expected_values(outcomes: np.ndarray, probabilities: np.ndarray) -> np.ndarray:
+    """Row-wise sum(o * p), accumulated left to right like the scalar helpers."""
+    outcomes = np.asarray(outcomes, dtype=np.float64)
+    probabilities = np.asarray(probabilities, dtype=np.float64)
+    ev = outcomes[:, 0] * probabilities[:, 0]
+    for k in range(1, outcomes.shape[1]):
+        ev = ev + outcomes[:, k] * probabilities[:, k]
+    return ev
+
+
+def switch_indices(choices: np.ndarray) -> np.ndarray:
+    """Number of 'sure' rows on top for complete monotone answers, -1 otherwise."""
+    choices = np.asarray(choices)
+    rows = choices.shape[1]
+    n_sure = (choices == SURE).sum(axis=1)
+    top = np.arange(rows)[None, :] < n_sure[:, None]
+    expected = np.where(top, SURE, PROSPECT)
+    monotone = (choices == expected).all(axis=1)
+    return np.where(monotone, n_sure, -1)
+
+
+def certainty_equivalents(choices: np.ndarray, amounts: np.ndarray, convention: str = "midpoint") -> np.ndarray:
+    if convention not in CONVENTIONS:
+        raise ValueError(f"Unknown CE convention {convention!r}; expected one of {CONVENTIONS}")
+    choices = np.asarray(choices)
+    amounts = np.asarray(amounts, dtype=np.float64)
+    n, rows = choices.shape
+    is_sure = choices == SURE
+    is_prospect = choices == PROSPECT
+    has_sure = is_sure.any(axis=1)
+    has_prospect = is_prospect.any(axis=1)
+    r = np.arange(n)
+
+    last_sure = rows - 1 - np.argmax(is_sure[:, ::-1], axis=1)
+    first_prospect = np.argmax(is_prospect, axis=1)
+
+    if convention == "midpoint":
+        mid = _round2((amounts[r, last_sure] + amounts[r, first_prospect]) / 2.0)
+        return np.where(
+            ~has_sure, amounts[:, -1],
+            np.where(~has_prospect, amounts[:, 0], mid),
+        )
+
+    # "lowest_accepted": last 'sure' amount, and the highest 'prospect' amount seen before any 'sure'
+    first_sure = np.where(has_sure, np.argmax(is_sure, axis=1), rows)
+    before_sure = is_prospect & (np.arange(rows)[None, :] < first_sure[:, None])
+    has_rejected = before_sure.any(axis=1)
+    highest_rejected = np.where(before_sure, amounts, -np.inf).max(axis=1)
+    lowest_accepted = amounts[r, last_sure]
+
+    both = _round2((lowest_accepted + np.where(has_rejected, highest_rejected, 0.0)) / 2)
+    return np.where(
+        has_sure & has_rejected, both,
+        np.where(
+            has_sure, _round2(lowest_accepted),
+            np.where(has_rejected, _round2(np.where(has_rejected, highest_rejected, 0.0)), 0.0),
+        ),
+    )
+
+
+def risk_attitude_codes(ce: np.ndarray, ev: np.ndarray) -> np.ndarray:
+    """Indices into ATTITUDES: 0 averse (CE < EV), 1 seeking (CE > EV), 2 neutral."""
+    return np.where(ce < ev, 0, np.where(ce > ev, 1, 2)).astype(np.int8)
+
+
+def risk_attitudes(ce: np.ndarray, ev: np.ndarray) -> np.ndarray:
+    """Labels as in `risk_attitude_from_ce` (CE below EV is averse, above is seeking)."""
+    return ATTITUDES[risk_attitude_codes(ce, ev)]
+
+
+def score_batch(
+    choices: np.ndarray,
+    amounts: np.ndarray,
+    outcomes: np.ndarray,
+    probabilities: np.ndarray,
+    convention: str = "midpoint",
+) -> Dict[str, np.ndarray]:
+    """Score N ladders at once.
+
+    choices: (N, rows) int8 choice codes; amounts: (N, rows) sure amounts (descending);
+    outcomes / probabilities: (N, k) prospect definitions. Returns CE, switch index, EV and
+    risk attitude arrays.
+    """
+    ce = certainty_equivalents(choices, amounts, convention)
+    ev = expected_values(outcomes, probabilities)
+    return {
+        "certainty_equivalent": ce,
+        "switch_index": switch_indices(choices),
+        "expected_value": ev,
+        "risk_attitude": risk_attitudes(ce, ev),
+    }
+
+
+# ---------- Parity check ----------
+def _parity_check(n: int = 20000, seed: int = 0) -> List[str]:
+    from survey_ladders import monotone_pattern
+    from survey_variants import load_survey_functions
+
+    rng = np.random.default_rng(seed)
+    checked = []
+    for script, convention in (
+        ("risk_survey_consolidated.py", "midpoint"),
+        ("risky_survey_streamlit_v3.py", "lowest_accepted"),
+    ):
+        ns = load_survey_functions(script)
+        catalog = ns.get("PROSPECTS") or ns["GAINS"] + ns["LOSSES"]
+        picks = rng.integers(0, len(catalog), n)
+        prospects = [catalog[i] for i in picks]
+
+        choice_lists = []
+        for i in range(n):
+            if i % 2:
+                choice_lists.append(monotone_pattern(int(rng.integers(0, 8))))
+            else:
+                choice_lists.append([[None, "sure", "prospect"][c] for c in rng.integers(0, 3, 7)])
+        amount_lists = [
+            ns["generate_sure_amounts"](p, phase=2, phase1_choices=monotone_pattern(int(rng.integers(0, 8))))
+            for p in prospects
+        ]
+
+        got = score_batch(
+            encode_choice_matrix(choice_lists),
+            np.array(amount_lists),
+            np.array([p["outcomes"] for p in prospects]),
+            np.array([p["probabilities"] for p in prospects]),
+            convention,
+        )
+        for i, (p, ch, am) in enumerate(zip(prospects, choice_lists, amount_lists)):
+            ce = ns["compute_certainty_equivalent"](ch, am)
+            ev = ns["expected_value"](p)
+            assert got["certainty_equivalent"][i] == ce, (script, ch, am, ce, got["certainty_equivalent"][i])
+            assert got["expected_value"][i] == ev, (script, p, ev)
+            if "risk_attitude_from_ce" in ns:
+                assert got["risk_attitude"][i] == ns["risk_attitude_from_ce"](ce, ev)
+        checked.append(f"{script}: {n} ladders match ({convention})")
+    return checked
+
+
+if __name__ == "__main__":
+    for line in _parity_check():
+        print(line)
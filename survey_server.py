@@ -0,0 +1,349 @@
+"""Stateless ASGI server for the HTML survey, as an alternative to running it under Streamlit.
+
+Streamlit holds a websocket, a script thread and a session-state object per participant.
+Here the survey runs entirely in the browser (riskysurvey.html), so the server only has
+two jobs, both stateless:
+
+  GET  /               the survey page, from html_asset's process-wide cache, pre-gzipped,
+                       with ETag revalidation (304s for returning browsers)
+  POST /api/responses  the finished survey (the page's JSON export), checked against the
+                       catalog the page presents (catalogs/v3.json) and appended
+                       to the same ResponseJournal that save_to_google_sheets writes to;
+                       a JournalSyncer drains it to the Survey_Responses sheet
+  GET  /api/aggregates cohort statistics per prospect and domain (cohort_aggregates), kept
+                       up to date on every submission, so reading them is O(prospects)
+  GET  /api/responses.csv
+                       PRIVILEGED: every journaled response (names and ages included) in
+                       the export_csv_blob layout, streamed from the journal (csv_export).
+                       Only served when RISK_SURVEY_ADMIN_TOKEN is set, and only to
+                       requests carrying "Authorization: Bearer <that token>"; otherwise
+                       use `python csv_export.py --journal ...` on the server itself
+  GET  /healthz        journal backlog
+
+Handlers are async and the only blocking call (the fsynced SQLite append) runs in a worker
+thread, so one process serves thousands of concurrent participants. Run a single process
+per journal file: the syncer assumes it is the only one draining it.
+
+    RISK_SURVEY_SPREADSHEET_ID=... RISK_SURVEY_SHEETS_CREDENTIALS=service_account.json \\
+        python survey_server.py --port 8000
+
+Without the two Sheets variables responses are only journaled; any syncer pointed at the
+same RISK_SURVEY_JOURNAL file (e.g. the Streamlit draft's) delivers them later.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import gzip
+import hashlib
+import hmac
+import json
+import logging
+import math
+import os
+import sys
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from cohort_aggregates import CohortAggregates
+from csv_export import journal_csv_chunks
+from html_asset import load_html_asset
+from prospect_catalog import load_prospects
+from response_journal import DEFAULT_JOURNAL_PATH, JournalSyncer, ResponseJournal
+from sheets_writer import rows_from_survey_data
+
+
+SURVEY_PAGE = "riskysurvey.html"
+SURVEY_CATALOG = "catalogs/v3.json"  # the gains and losses riskysurvey.html presents
+EV_TOLERANCE = 1e-6
+WORKSHEET_NAME = "Survey_Responses"
+MAX_BODY_BYTES = 64 * 1024
+MAX_RESULTS = 50
+
+DOMAINS = ("Gain Domain", "Loss Domain")
+ATTITUDES = ("Risk Averse", "Risk Seeking", "Risk Neutral")
+
+logger = logging.getLogger("survey_server")
+
+# Posts the page's own export payload once the results screen is shown; retried with backoff
+# so a brief outage doesn't lose a response (the export buttons remain as a fallback).
+COLLECTOR_SCRIPT = """
+<script>
+(function () {
+    const status = (text) => {
+        let el = document.getElementById('submitStatus');
+        if (!el) {
+            el = document.createElement('p');
+            el.id = 'submitStatus';
+            document.getElementById('results').prepend(el);
+        }
+        el.innerHTML = '<strong>' + text + '</strong>';
+    };
+    const submit = (payload, attempt) => {
+        fetch('api/responses', {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify(payload),
+            keepalive: true,
+        }).then((r) => {
+            if (r.status >= 500) throw new Error(r.status);
+            status(r.ok ? 'Your responses have been saved.' : 'Your responses could not be saved; please use Export.');
+        }).catch(() => {
+            if (attempt < 5) {
+                status('Saving your responses...');
+                setTimeout(() => submit(payload, attempt + 1), 1000 * 2 ** attempt);
+            } else {
+                status('Your responses could not be saved; please use Export.');
+            }
+        });
+    };
+    const showResults = survey.showResults.bind(survey);
+    survey.showResults = function () {
+        showResults();
+        submit({
+            participant: {name: survey.userName, age: survey.userAge, timestamp: new Date().toISOString()},
+            results: survey.results,
+        }, 0);
+    };
+})();
+</script>
+"""
+
+
+# ---------- Page ----------
+class Page(NamedTuple):
+    source_etag: str
+    body: bytes
+    gzipped: bytes
+    etag: str
+
+
+_page: Optional[Page] = None
+
+
+def survey_page() -> Page:
+    """The cached minified survey with the collector script, rebuilt when the source changes."""
+    global _page
+    asset = load_html_asset(SURVEY_PAGE)
+    if _page is None or _page.source_etag != asset.etag:
+        html = asset.html.replace("</body>", COLLECTOR_SCRIPT + "</body>", 1)
+        body = html.encode("utf-8")
+        _page = Page(
+            source_etag=asset.etag,
+            body=body,
+            gzipped=gzip.compress(body, compresslevel=9, mtime=0),
+            etag='"%s"' % hashlib.sha256(body).hexdigest()[:16],
+        )
+    return _page
+
+
+async def index(request: Request) -> Response:
+    page = survey_page()
+    headers = {"ETag": page.etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if page.etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers=headers)
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        return Response(page.gzipped, media_type="text/html", headers=headers)
+    return Response(page.body, media_type="text/html", headers=headers)
+
+
+# ---------- Collection ----------
+Catalog = Dict[str, Tuple[str, float]]
+
+
+def served_catalog() -> Catalog:
+    """Prospect description -> (domain, expected value), as the page computes them."""
+    catalog = {}
+    for section, domain in (("gains", "Gain Domain"), ("losses", "Loss Domain")):
+        for p in load_prospects(SURVEY_CATALOG, section):
+            catalog[p["description"]] = (domain, sum(o * q for o, q in zip(p["outcomes"], p["probabilities"])))
+    return catalog
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
+
+
+def validate_submission(data, catalog: Catalog) -> Optional[str]:
+    """None if `data` looks like the page's export payload, otherwise the reason it doesn't.
+
+    Every result must name a prospect in `catalog`, with that prospect's domain and expected
+    value, so submissions can only add to the aggregates of problems the page really asks.
+    """
+    if not isinstance(data, dict):
+        return "payload must be a JSON object"
+    participant = data.get("participant")
+    if not isinstance(participant, dict):
+        return "missing participant"
+    name = participant.get("name")
+    if not isinstance(name, str) or not 0 < len(name.strip()) <= 200:
+        return "participant.name must be a non-empty string"
+    age = participant.get("age")
+    if not (isinstance(age, int) and not isinstance(age, bool) and 18 <= age <= 120):
+        return "participant.age must be an integer between 18 and 120"
+
+    results = data.get("results")
+    if not isinstance(results, list) or not 0 < len(results) <= MAX_RESULTS:
+        return f"results must be a list of 1..{MAX_RESULTS} problems"
+    for i, r in enumerate(results, start=1):
+        if not isinstance(r, dict):
+            return f"result {i} must be an object"
+        known = catalog.get(r.get("prospect")) if isinstance(r.get("prospect"), str) else None
+        if known is None:
+            return f"result {i}: unknown prospect"
+        if r.get("domain") not in DOMAINS or r.get("riskAttitude") not in ATTITUDES:
+            return f"result {i}: bad domain or riskAttitude"
+        if not (_is_number(r.get("expectedValue")) and _is_number(r.get("certaintyEquivalent"))):
+            return f"result {i}: expectedValue and certaintyEquivalent must be numbers"
+        domain, ev = known
+        if r["domain"] != domain or abs(r["expectedValue"] - ev) > EV_TOLERANCE:
+            return f"result {i}: domain or expectedValue doesn't match the prospect"
+    return None
+
+
+async def collect(request: Request) -> Response:
+    body = await request.body()
+    if len(body) > MAX_BODY_BYTES:
+        return JSONResponse({"error": "payload too large"}, status_code=413)
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return JSONResponse({"error": "invalid JSON"}, status_code=400)
+    error = validate_submission(data, request.app.state.catalog)
+    if error:
+        return JSONResponse({"error": error}, status_code=422)
+
+    rows = rows_from_survey_data(data)
+    journal: ResponseJournal = request.app.state.journal
+    entry_id = await asyncio.to_thread(journal.append, rows)
+    request.app.state.aggregates.add_rows(rows)
+    syncer = request.app.state.syncer
+    if syncer is not None:
+        syncer.notify()
+    return JSONResponse({"status": "ok", "id": entry_id}, status_code=201)
+
+
+def _json_safe(rows: List[dict]) -> List[dict]:
+    """NaN (e.g. the std of a single response) isn't valid JSON; send null instead."""
+    return [{k: None if isinstance(v, float) and math.isnan(v) else v for k, v in row.items()} for row in rows]
+
+
+async def aggregates(request: Request) -> Response:
+    store: CohortAggregates = request.app.state.aggregates
+    return JSONResponse({
+        "summary": store.summary(),
+        "by_domain": _json_safe(store.by_domain()),
+        "by_prospect": _json_safe(store.by_prospect()),
+    })
+
+
+def _is_admin(request: Request) -> bool:
+    token = request.app.state.admin_token
+    scheme, _, supplied = request.headers.get("authorization", "").partition(" ")
+    return bool(token) and scheme.lower() == "bearer" and hmac.compare_digest(supplied.encode(), token.encode())
+
+
+async def export_csv(request: Request) -> Response:
+    if not _is_admin(request):
+        return JSONResponse({"error": "unauthorized"}, status_code=401,
+                            headers={"WWW-Authenticate": "Bearer"})
+    # A sync generator: Starlette pulls each chunk in a worker thread, so the event loop
+    # never waits on SQLite and memory stays at one journal page however large the cohort.
+    return StreamingResponse(
+        journal_csv_chunks(request.app.state.journal),
+        media_type="text/csv",
+        headers={"Content-Disposition": 'attachment; filename="risk_survey_responses.csv"'},
+    )
+
+
+async def healthz(request: Request) -> Response:
+    journal: ResponseJournal = request.app.state.journal
+    pending = await asyncio.to_thread(journal.pending_count)
+    syncer = request.app.state.syncer
+    return JSONResponse({
+        "pending": pending,
+        "syncing": syncer is not None,
+        "sync_stats": syncer.stats if syncer is not None else None,
+    })
+
+
+# ---------- Sheets ----------
+def sheets_connector_from_env() -> Optional[Callable[[], object]]:
+    """gspread connection factory from RISK_SURVEY_SHEETS_CREDENTIALS / RISK_SURVEY_SPREADSHEET_ID."""
+    credentials_path = os.environ.get("RISK_SURVEY_SHEETS_CREDENTIALS")
+    spreadsheet_id = os.environ.get("RISK_SURVEY_SPREADSHEET_ID")
+    if not credentials_path or not spreadsheet_id:
+        return None
+
+    def connect():
+        try:
+            import gspread
+            from google.oauth2.service_account import Credentials
+
+            scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
+            creds = Credentials.from_service_account_file(credentials_path, scopes=scope)
+            return gspread.authorize(creds).open_by_key(spreadsheet_id).worksheet(WORKSHEET_NAME)
+        except Exception:
+            logger.exception("Error connecting to Google Sheets")
+            return None
+
+    return connect
+
+
+# ---------- App ----------
+def create_app(journal_path: str = DEFAULT_JOURNAL_PATH,
+               connect: Optional[Callable[[], object]] = None,
+               admin_token: Optional[str] = None) -> Starlette:
+    """`admin_token` guards the response export; without one the route isn't served at all."""
+    routes = [
+        Route("/", index, methods=["GET"]),
+        Route("/api/responses", collect, methods=["POST"]),
+        Route("/api/aggregates", aggregates, methods=["GET"]),
+        Route("/healthz", healthz, methods=["GET"]),
+    ]
+    if admin_token:
+        routes.append(Route("/api/responses.csv", export_csv, methods=["GET"]))
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app: Starlette):
+        app.state.journal = ResponseJournal(journal_path)
+        app.state.catalog = served_catalog()
+        app.state.aggregates = CohortAggregates()
+        app.state.aggregates.add_rows(await asyncio.to_thread(app.state.journal.all_rows))
+        app.state.syncer = JournalSyncer(app.state.journal, connect).start() if connect else None
+        if connect is None:
+            logger.warning("Google Sheets not configured; responses are only journaled to %s", journal_path)
+        survey_page()  # warm the page cache before the first participant arrives
+        try:
+            yield
+        finally:
+            if app.state.syncer is not None:
+                app.state.syncer.stop(timeout=5)
+            app.state.journal.close()
+
+    app = Starlette(routes=routes, lifespan=lifespan)
+    app.state.admin_token = admin_token
+    return app
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve the HTML survey and collect responses.")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--journal", default=DEFAULT_JOURNAL_PATH, help="SQLite journal file")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    app = create_app(args.journal, sheets_connector_from_env(), os.environ.get("RISK_SURVEY_ADMIN_TOKEN"))
+    uvicorn.run(app, host=args.host, port=args.port, access_log=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
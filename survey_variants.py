@@ -0,0 +1,97 @@
+"""Load the pure helpers of a survey script without running its Streamlit UI.
+
+Every survey script is a standalone Streamlit app that builds its page at import time, so
+offline tools (batch scoring checks, simulators, benchmarks) can't simply import them.
+`load_survey_functions` parses a script and executes only its imports, undecorated
+top-level functions and literal constants (GAINS, LOSSES, PROSPECTS, ...), including
+constants loaded from a catalog file with prospect_catalog.load_prospects.
+"""
+
+import ast
+import os
+import sys
+from typing import Dict, List
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Scripts that define the shared helpers (generate_sure_amounts, compute_certainty_equivalent, ...)
+SURVEY_SCRIPTS = [
+    "risk_survey_clean.py",
+    "risk_survey_consolidated.py",
+    "risk_survey_consolidated_v1_1.py",
+    "risk_survey_consolidated_v1_2.py",
+    "risky_survey_44.py",
+    "risky_survey_streamlit.py",
+    "risky_survey_streamlit_v2.py",
+    "risky_survey_streamlit_v2_monotonic2.py",
+    "risky_survey_streamlit_v2_monotonic_live.py",
+    "risky_survey_streamlit_v2_monotonic_live2.py",
+    "risky_survey_streamlit_v2_monotonic_live_guard.py",
+    "risky_survey_streamlit_v2_monotonic_live_guard_cleanfinal.py",
+    "risky_survey_streamlit_v2_monotonic_live_guard_fixed.py",
+    "risky_survey_streamlit_v3.py",
+]
+
+
+def _is_streamlit_import(node: ast.stmt) -> bool:
+    if isinstance(node, ast.Import):
+        return any(a.name.split(".")[0] == "streamlit" for a in node.names)
+    if isinstance(node, ast.ImportFrom):
+        return (node.module or "").split(".")[0] == "streamlit"
+    return False
+
+
+def _is_literal_constant(node: ast.stmt) -> bool:
+    if not isinstance(node, ast.Assign) or len(node.targets) != 1:
+        return False
+    target = node.targets[0]
+    if not isinstance(target, ast.Name) or not target.id.isupper():
+        return False
+    try:
+        ast.literal_eval(node.value)
+    except ValueError:
+        return False
+    return True
+
+
+def _is_catalog_load(node: ast.stmt) -> bool:
+    """`NAME = load_prospects("catalogs/....json", "section")` with literal arguments."""
+    if not isinstance(node, ast.Assign) or len(node.targets) != 1:
+        return False
+    target, value = node.targets[0], node.value
+    if not isinstance(target, ast.Name) or not target.id.isupper() or not isinstance(value, ast.Call):
+        return False
+    if not isinstance(value.func, ast.Name) or value.func.id != "load_prospects":
+        return False
+    try:
+        for arg in value.args:
+            ast.literal_eval(arg)
+    except ValueError:
+        return False
+    return not value.keywords
+
+
+def load_survey_functions(path: str) -> Dict:
+    """Return the namespace of pure definitions from the survey script at `path`."""
+    if not os.path.isabs(path):
+        path = os.path.join(HERE, path)
+    with open(path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=path)
+
+    body: List[ast.stmt] = []
+    for node in tree.body:
+        if isinstance(node, (ast.Import, ast.ImportFrom)) and not _is_streamlit_import(node):
+            body.append(node)
+        elif isinstance(node, ast.FunctionDef) and not node.decorator_list:
+            body.append(node)
+        elif _is_literal_constant(node) or _is_catalog_load(node):
+            body.append(node)
+
+    script_dir = os.path.dirname(path)
+    if script_dir not in sys.path:
+        sys.path.insert(0, script_dir)
+
+    namespace: Dict = {"__name__": os.path.splitext(os.path.basename(path))[0], "__file__": path}
+    exec(compile(ast.Module(body=body, type_ignores=[]), path, "exec"), namespace)
+    return namespace
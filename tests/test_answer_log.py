@@ -0,0 +1,94 @@
+import os
+
+import pytest
+
+import answer_log
+import load_test
+from answer_log import AnswerLog, compacted, fold, replay
+
+
+def _record(monkeypatch, tmp_path, script, mode):
+    """One AppTest session of `script` with the answer log on; returns its (t_ms, event) pairs."""
+    path = str(tmp_path / "answers.db")
+    monkeypatch.setenv("RISK_SURVEY_ANSWER_LOG", path)
+    for _ in load_test.respondent(os.path.join(load_test.HERE, script), 11, load_test.Recorder(), 30, mode):
+        pass
+    log = AnswerLog(path)
+    (session, _, _, _), = log.sessions()
+    rows = log.events(session)
+    assert fold([e for _, _, e in rows]) == log.state(session)
+    log.close()
+    return [(t, e) for _, t, e in rows]
+
+
+@pytest.mark.parametrize("script, mode", [
+    ("risky_survey_streamlit_v3.py", None),
+    ("risky_survey_streamlit_v3.py", "switch"),
+    ("risky_survey_streamlit_v3.py", "bisection"),
+    ("risk_survey_consolidated.py", None),
+])
+def test_recorded_sessions_replay_to_the_same_results(monkeypatch, tmp_path, script, mode):
+    events = _record(monkeypatch, tmp_path, script, mode)
+    start = events[0][1]
+    assert start[0] == "start" and start[1]["script"] == script
+    assert len(fold([e for _, e in events])["ces"]) == 10
+
+    report = replay(events, script)
+    assert report["finished"] and not report["mismatches"]
+    assert os.environ["RISK_SURVEY_ANSWER_LOG"] == str(tmp_path / "answers.db")  # restored after the replay
+    log = AnswerLog(str(tmp_path / "answers.db"))
+    assert len(log.sessions()) == 1  # the replay itself was not logged
+    log.close()
+
+
+def test_compacted_session_still_replays(monkeypatch, tmp_path):
+    events = _record(monkeypatch, tmp_path, "risky_survey_streamlit_v3.py", None)
+    log = AnswerLog(str(tmp_path / "noisy.db"))
+    # The same session with an empty Continue first: a rejected attempt that compaction drops
+    for i, (_, e) in enumerate(events):
+        log.append("noisy", e)
+        if i == 0:
+            log.append("noisy", ("submit", 0, 1))
+            log.append("noisy", ("reject", 0, 1, "incomplete"))
+    state = log.state("noisy")
+    assert state["rejects"] == fold([e for _, e in events])["rejects"] + 1
+
+    before, after = log.compact("noisy")
+    assert (before, after) == (len(events) + 2, len(events))
+    assert log.state("noisy")["ces"] == state["ces"]
+    report = replay([(t, e) for _, t, e in log.events("noisy")], "risky_survey_streamlit_v3.py")
+    assert report["finished"] and not report["mismatches"]
+    log.close()
+
+
+def test_compaction_keeps_the_last_choice_per_row_and_the_accepted_submit():
+    events = list(enumerate([
+        ("choice", 0, 1, 0, 1), ("choice", 0, 1, 0, 0), ("submit", 0, 1), ("reject", 0, 1, "incomplete"),
+        ("choice", 0, 1, 1, 0), ("submit", 0, 1), ("phase", 0, 1, 0),
+        ("choice", 0, 2, 0, 1),
+    ]))
+    assert [e for _, e in compacted(events)] == [
+        ("choice", 0, 1, 0, 0), ("choice", 0, 1, 1, 0), ("submit", 0, 1), ("phase", 0, 1, 0),
+        ("choice", 0, 2, 0, 1),
+    ]
+
+
+def test_state_is_folded_from_the_latest_snapshot(tmp_path, monkeypatch):
+    monkeypatch.setattr(answer_log, "SNAPSHOT_EVERY", 4)
+    log = AnswerLog(str(tmp_path / "answers.db"))
+    events = [("start", {"script": "s", "seed": 0, "mode": None})]
+    for problem in range(5):
+        events += [("phase", problem, 1, 3), ("phase", problem, 2, 5), ("result", problem, float(problem))]
+    for e in events:
+        log.append("s1", e)
+    assert log._latest_snapshot("s1")[0] == 12
+    assert log.state("s1") == fold(events)
+    assert log.state("s1")["ces"] == [0.0, 1.0, 2.0, 3.0, 4.0]
+    log.close()
+
+
+def test_self_check_restores_the_environment(monkeypatch):
+    monkeypatch.setenv("RISK_SURVEY_ANSWER_LOG", "elsewhere.db")
+    monkeypatch.setattr(answer_log, "_record_and_replay", lambda path: [os.environ["RISK_SURVEY_ANSWER_LOG"]])
+    assert answer_log._self_check()[0].endswith("answers.db")
+    assert os.environ["RISK_SURVEY_ANSWER_LOG"] == "elsewhere.db"
@@ -0,0 +1,87 @@
+import math
+import random
+import statistics
+import threading
+
+import pytest
+
+from cohort_aggregates import Aggregate, CohortAggregates, RunningStats, from_results
+
+
+def _results(n, seed):
+    rng = random.Random(seed)
+    prospects = [(f"p{i}", "Gain Domain" if i % 2 else "Loss Domain", rng.uniform(-100, 100)) for i in range(20)]
+    results = []
+    for _ in range(n):
+        name, domain, ev = rng.choice(prospects)
+        ce = round(ev + rng.gauss(-5, 15), 2)
+        attitude = "Risk Averse" if ce < ev else "Risk Seeking" if ce > ev else "Risk Neutral"
+        results.append({"prospect": name, "domain": domain, "expected_value": ev,
+                        "certainty_equivalent": ce, "risk_attitude": attitude})
+    return results
+
+
+def _assert_matches_recomputation(store, results):
+    for row in store.by_prospect():
+        premiums = [r["certainty_equivalent"] - r["expected_value"] for r in results if r["prospect"] == row["prospect"]]
+        assert row["count"] == len(premiums)
+        assert row["mean_premium"] == pytest.approx(statistics.fmean(premiums), rel=1e-9, abs=1e-9)
+        assert row["std_premium"] == pytest.approx(statistics.stdev(premiums), rel=1e-9)
+    summary = store.summary()
+    assert summary["totalProblems"] == len(results)
+    assert summary["gainProblems"] == sum(r["domain"] == "Gain Domain" for r in results)
+    assert summary["riskAverseCount"] == sum(r["risk_attitude"] == "Risk Averse" for r in results)
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_incremental_aggregates_match_recomputation(seed):
+    results = _results(500, seed)
+    _assert_matches_recomputation(from_results(results), results)
+
+
+@pytest.mark.parametrize("seed", [0, 1])
+def test_merged_aggregates_match_recomputation(seed):
+    results = _results(500, seed)
+    left, right = from_results(results[:150]), from_results(results[150:])
+    left.merge(right)
+    _assert_matches_recomputation(left, results)
+
+
+def test_running_stats_below_two_observations():
+    stats = RunningStats()
+    stats.add(3.0)
+    assert stats.mean == 3.0 and math.isnan(stats.variance) and math.isnan(stats.std)
+
+
+def test_results_are_accepted_in_every_layout():
+    store = CohortAggregates()
+    store.add_result({"prospect": "p", "domain": "Gain Domain", "expected_value": 5.0,
+                      "certainty_equivalent": 4.0, "risk_attitude": "Risk Averse"})
+    store.add_result({"prospect": "p", "domain": "Gain Domain", "expectedValue": 5.0,
+                      "certaintyEquivalent": 6.0, "riskAttitude": "Risk Seeking"})
+    store.add_rows([["t", "Ann", 30, 1, "Gain Domain", "p", 5.0, 5.0, "Risk Neutral"]])
+    row, = store.by_prospect()
+    assert (row["count"], row["averse_count"], row["seeking_count"], row["neutral_count"]) == (3, 1, 1, 1)
+    assert row["mean_premium"] == 0.0
+
+
+def test_merge_reads_a_consistent_snapshot_while_the_source_is_written(monkeypatch):
+    source = CohortAggregates()
+    source.add("p1", "Gain Domain", 5.0, 4.0, "Risk Averse")
+    writers = []
+    merge = Aggregate.merge
+
+    def merge_with_a_concurrent_add(self, other):
+        # The first aggregate merge lets a new prospect be added to the source meanwhile
+        if not writers:
+            writers.append(threading.Thread(target=source.add, args=("p2", "Loss Domain", -5.0, -4.0, "Risk Seeking")))
+            writers[0].start()
+            writers[0].join(0.2)
+        merge(self, other)
+
+    monkeypatch.setattr(Aggregate, "merge", merge_with_a_concurrent_add)
+    merged = CohortAggregates()
+    merged.merge(source)
+    writers[0].join()
+    assert sum(row["count"] for row in merged.by_prospect()) == merged.summary()["totalProblems"]
+    assert sum(row["count"] for row in merged.by_domain()) == merged.summary()["totalProblems"]
@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from columnar_export import (
+    CENTS_COLUMNS,
+    SCHEMA,
+    frames_from_csv,
+    frames_from_records,
+    read_parquet_export,
+    write_parquet,
+)
+from cpt_simulator import simulate
+from csv_export import CSV_COLUMNS, records_from_rows
+
+
+@pytest.fixture(scope="module")
+def cohort_csv(tmp_path_factory):
+    path = tmp_path_factory.mktemp("cohort") / "cohort.csv"
+    for i, (rows, _) in enumerate(simulate(2000, seed=1, chunk_size=500)):
+        rows.to_csv(path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+    return str(path)
+
+
+def test_parquet_round_trips_the_csv_export(cohort_csv, tmp_path):
+    out = str(tmp_path / "cohort.parquet")
+    n = write_parquet(frames_from_csv(cohort_csv, batch_rows=5_000), out)
+    from_csv, from_parquet = pd.read_csv(cohort_csv), read_parquet_export(out)
+
+    assert n == len(from_csv) == len(from_parquet) == 20_000
+    assert list(from_parquet.columns) == list(CSV_COLUMNS)
+    for col in CSV_COLUMNS:
+        if col in CENTS_COLUMNS:
+            np.testing.assert_allclose(from_parquet[col].to_numpy(), from_csv[col].to_numpy(), atol=1e-9)
+        else:
+            assert (from_parquet[col].astype(str).to_numpy() == from_csv[col].astype(str).to_numpy()).all(), col
+    assert pq.ParquetFile(out).metadata.num_row_groups == 4
+
+
+def test_strings_are_dictionary_encoded_and_amounts_stored_in_cents(cohort_csv, tmp_path):
+    out = str(tmp_path / "cohort.parquet")
+    write_parquet(frames_from_csv(cohort_csv), out)
+    table = pq.read_table(out)
+    assert table.schema.equals(SCHEMA, check_metadata=False)
+    for name in ("Name", "Domain", "Prospect", "Risk_Attitude"):
+        assert pa.types.is_dictionary(table.schema.field(name).type)
+    assert read_parquet_export(out, columns=["Expected_Value"]).columns.tolist() == ["Expected_Value"]
+
+
+def test_journal_rows_are_exported(tmp_path):
+    rows = [["2024-01-01T00:00:00Z", "Ann", 30, 1, "Gain Domain", "p", 5.0, 4.25, "Risk Averse"],
+            ["2024-01-01T00:00:00Z", "Ann", 30, 2, "Loss Domain", "q", -5.0, -4.5, "Risk Seeking"]]
+    out = str(tmp_path / "journal.parquet")
+    assert write_parquet(frames_from_records(records_from_rows(rows), batch_rows=1), out) == 2
+    df = read_parquet_export(out)
+    assert df["Certainty_Equivalent"].tolist() == [4.25, -4.5]
+    assert df["Age"].tolist() == [30, 30]
@@ -0,0 +1,86 @@
+import logging
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from cpt_fitting import fit_cohort, fit_participants, parse_prospect, respondent_ids
+from cpt_simulator import cpt_certainty_equivalent, simulate
+
+GAIN_AND_LOSS_ITEMS = [(100, 0, 0.1), (200, 50, 0.25), (300, 0, 0.5), (400, 100, 0.75), (50, 0, 0.9),
+                       (-100, 0, 0.1), (-200, -50, 0.25), (-300, 0, 0.5), (-400, -100, 0.75), (-50, 0, 0.9)]
+MIXED_ITEMS = [(200, -100, 0.5), (-200, 150, 0.5), (300, -50, 0.3), (-300, 100, 0.6)]
+TRUTH = {"alpha": 0.8, "beta": 0.9, "lambda": 2.25, "gamma": 0.7}
+
+
+def _items(items):
+    x_e, x_o, p_e = (np.array([[it[i] for it in items]], dtype=float) for i in range(3))
+    obs = cpt_certainty_equivalent(x_e, x_o, p_e, TRUTH["alpha"], TRUTH["beta"], TRUTH["lambda"], TRUTH["gamma"])
+    return obs, x_e, x_o, p_e, np.ones_like(obs, dtype=bool)
+
+
+def test_noiseless_answers_recover_curvature_and_weighting():
+    fit = fit_participants(*_items(GAIN_AND_LOSS_ITEMS))
+    for key in ("alpha", "beta", "gamma"):
+        assert abs(fit[key][0] - TRUTH[key]) < 0.03, (key, fit[key][0])
+    # Pure-domain prospects can't identify loss aversion: lambda cancels out of their CEs
+    assert np.isnan(fit["lambda"][0])
+
+
+def test_lambda_is_recovered_from_mixed_prospects():
+    fit = fit_participants(*_items(GAIN_AND_LOSS_ITEMS + MIXED_ITEMS))
+    assert abs(fit["lambda"][0] - TRUTH["lambda"]) < 0.1, fit["lambda"][0]
+
+
+def _export_rows(name, age, ces):
+    return [{"Name": name, "Age": age, "Problem": i + 1,
+             "Prospect": f"{p:.0%} chance to win ${x:.0f}, {1 - p:.0%} chance to win nothing",
+             "Certainty_Equivalent": ce} for i, ((x, _, p), ce) in enumerate(ces)]
+
+
+def test_namesakes_and_repeat_attempts_are_fitted_separately():
+    gains = [(x, 0, p) for x, _, p in GAIN_AND_LOSS_ITEMS[:5]]
+    risk_averse = [(it, 0.6 * it[0] * it[2]) for it in gains]
+    risk_seeking = [(it, min(it[0], 1.4 * it[0] * it[2])) for it in gains]
+    df = pd.DataFrame(
+        _export_rows("Alex", 30, risk_averse)
+        + _export_rows("Alex", 45, risk_seeking)    # a different Alex
+        + _export_rows("Alex", 45, risk_averse)     # the same Alex again
+    )
+    assert respondent_ids(df).tolist() == [0] * 5 + [1] * 5 + [2] * 5
+    fits = fit_cohort(df, workers=1)
+    assert fits["Respondent"].tolist() == [1, 2, 3] and fits["Age"].tolist() == [30, 45, 45]
+    assert (fits["n_items"] == 5).all()
+    assert fits["alpha"][1] > fits["alpha"][0] and abs(fits["alpha"][2] - fits["alpha"][0]) < 1e-9
+
+
+def test_simulated_cohort_has_one_fit_per_respondent():
+    rows, agents = next(simulate(30, seed=2, chunk_size=30))
+    fits = fit_cohort(rows, workers=1)
+    assert len(fits) == 30 and (fits["n_items"] == 10).all()
+    assert fits["Name"].tolist() == agents["Name"].tolist()
+    assert fits["lambda"].isna().all()  # the v3 catalog has no mixed prospects
+
+
+@pytest.mark.parametrize("description, expected", [
+    ("10% chance to win $100, 90% chance to win $50", (100.0, 50.0, 0.1)),
+    ("5% chance to lose $1,200, 95% chance to lose nothing", (-1200.0, 0.0, 0.05)),
+    ("90% chance to win $100, 10% chance to nothing", (100.0, 0.0, 0.9)),
+    ("50% chance to win $100, 50% chance to lose $50", (100.0, -50.0, 0.5)),
+    ("10% to win $100, else 0", (100.0, 0.0, 0.1)),
+    ("25% to lose $40, else $0", (-40.0, 0.0, 0.25)),
+    ("10% to win $100, else $5", None),
+    ("a coin flip", None),
+])
+def test_parse_prospect(description, expected):
+    assert parse_prospect(description) == expected
+
+
+def test_unrecognized_prospects_are_counted_and_logged(caplog):
+    rows = _export_rows("Alex", 30, [((x, 0, p), 0.6 * x * p) for x, _, p in GAIN_AND_LOSS_ITEMS[:5]])
+    rows[1]["Prospect"] = rows[3]["Prospect"] = "a coin flip"
+    rows[2]["Prospect"] = "90% to win $200, else 0"
+    with caplog.at_level(logging.WARNING, logger="cpt_fitting"):
+        fits = fit_cohort(pd.DataFrame(rows), workers=1)
+    assert fits["n_items"].tolist() == [3] and fits.attrs["dropped_rows"] == 2
+    assert "Dropped 2 rows" in caplog.text and "'a coin flip' (2)" in caplog.text
@@ -0,0 +1,16 @@
+import csv_export
+from cpt_simulator import catalog_arrays, simulate
+
+
+def test_rows_use_the_csv_export_layout():
+    rows, agents = next(simulate(20, seed=0, chunk_size=20))
+    assert tuple(rows.columns) == csv_export.CSV_COLUMNS
+    assert len(rows) == 200 and len(agents) == 20
+
+
+def test_every_survey_draws_five_gains_and_five_losses():
+    catalog = catalog_arrays()
+    rows, _ = next(simulate(50, seed=1, chunk_size=50))
+    per_respondent = rows.groupby("Name", observed=True)["Domain"].value_counts().unstack()
+    assert (per_respondent["Gain Domain"] == 5).all() and (per_respondent["Loss Domain"] == 5).all()
+    assert catalog["phase2"].shape[1] == 8
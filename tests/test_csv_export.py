@@ -0,0 +1,68 @@
+import io
+
+import pytest
+
+from csv_export import (
+    DEFAULT_CHUNK_ROWS,
+    iter_csv_chunks,
+    journal_csv_chunks,
+    main,
+    records_from_results,
+    records_from_rows,
+    write_csv,
+)
+from response_journal import ResponseJournal
+from survey_variants import load_survey_functions
+
+
+@pytest.fixture(scope="module")
+def v3():
+    return load_survey_functions("risky_survey_streamlit_v3.py")
+
+
+@pytest.fixture(scope="module")
+def results(v3):
+    rows = [
+        {"domain": "Gain Domain", "prospect": p["description"], "expected_value": round(v3["expected_value"](p), 2),
+         "certainty_equivalent": v3["generate_sure_amounts"](p, 1)[k], "risk_attitude": "Risk Averse"}
+        for k, p in enumerate(v3["GAINS"][:7])
+    ]
+    rows.append({"domain": "Loss Domain", "prospect": 'quoted "prospect", with comma',
+                 "expected_value": -12.5, "certainty_equivalent": -10.25, "risk_attitude": "Risk Seeking"})
+    return rows
+
+
+def _journal_rows(results):
+    return [["2024-01-01T00:00:00", "Ada, L.", 34, i, r["domain"], r["prospect"], r["expected_value"],
+             r["certainty_equivalent"], r["risk_attitude"]] for i, r in enumerate(results, start=1)]
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 3, DEFAULT_CHUNK_ROWS])
+def test_streamed_csv_matches_export_csv_blob(v3, results, chunk_rows):
+    expected = v3["export_csv_blob"](results, "Ada, L.", 34)
+    chunks = list(iter_csv_chunks(records_from_results(results, "Ada, L.", 34), chunk_rows))
+    assert b"".join(chunks) == expected
+    assert len(chunks) == -(-len(results) // chunk_rows)
+
+
+def test_journal_export_streams_every_entry(tmp_path, v3, results):
+    expected = v3["export_csv_blob"](results, "Ada, L.", 34)
+    journal = ResponseJournal(str(tmp_path / "journal.db"))
+    for _ in range(250):
+        journal.append(_journal_rows(results))
+    out = io.BytesIO()
+    written = write_csv(records_from_rows(journal.iter_rows(batch_entries=7)), out, chunk_rows=64)
+    body = expected.split(b"\n", 1)[1]
+    assert out.getvalue() == expected + body * 249
+    assert written == len(out.getvalue())
+    assert b"".join(journal_csv_chunks(journal, chunk_rows=64)) == out.getvalue()
+    journal.close()
+
+
+def test_cli_writes_the_journal_to_a_file(tmp_path, v3, results):
+    journal = ResponseJournal(str(tmp_path / "journal.db"))
+    journal.append(_journal_rows(results))
+    journal.close()
+    out = tmp_path / "cohort.csv"
+    assert main(["--journal", str(tmp_path / "journal.db"), "--out", str(out)]) == 0
+    assert out.read_bytes() == v3["export_csv_blob"](results, "Ada, L.", 34)
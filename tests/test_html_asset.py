@@ -0,0 +1,29 @@
+import os
+import threading
+
+import html_asset
+
+
+def test_concurrent_publishers_leave_complete_files(tmp_path):
+    source = os.path.join(html_asset.HERE, "riskysurvey.html")
+    static = str(tmp_path / "static")
+    errors = []
+
+    def publish():
+        try:
+            html_asset._published.clear()
+            html_asset.publish_html_asset(source, static)
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    threads = [threading.Thread(target=publish) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    asset = html_asset.load_html_asset(source)
+    assert sorted(os.listdir(static)) == ["riskysurvey.min.html", "riskysurvey.min.html.etag",
+                                          "riskysurvey.min.html.gz"]
+    with open(os.path.join(static, "riskysurvey.min.html"), "rb") as f:
+        assert f.read() == asset.html.encode("utf-8")
@@ -0,0 +1,35 @@
+import os
+import warnings
+
+import pytest
+
+import load_test
+
+
+def _run(script, **kwargs):
+    return load_test.run_load_test(os.path.join(load_test.HERE, script), sessions=1, **kwargs)
+
+
+@pytest.mark.skipif(not load_test.hook_supported(), reason="Streamlit is not the version the hook was checked against")
+def test_hook_is_only_installed_during_a_rerun():
+    original = load_test.LocalScriptRunner.run
+    report = _run("risk_survey_consolidated.py")
+    assert load_test.LocalScriptRunner.run is original
+    assert report["completed"] == 1 and report["message_accounting"]
+    assert report["messages_by_trigger"]["click"]["fragment_reruns"] > 0  # rows rerun as fragments
+    with pytest.raises(ZeroDivisionError):
+        with load_test.runner_hook():
+            assert load_test.LocalScriptRunner.run is not original
+            1 / 0
+    assert load_test.LocalScriptRunner.run is original
+
+
+def test_other_streamlit_versions_fall_back_to_the_public_api(monkeypatch):
+    monkeypatch.setattr(load_test, "STREAMLIT_CHECKED_VERSION", "0.0.0")
+    monkeypatch.setattr(load_test, "_hook_warned", False)
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        report = _run("risky_survey_streamlit_v3.py", mode="switch")
+    assert any("public AppTest API" in str(w.message) for w in caught)
+    assert report["completed"] == 1 and report["reruns_per_session"] == 23
+    assert not report["message_accounting"] and report["bytes_per_rerun"] is None
@@ -0,0 +1,61 @@
+import collections
+import json
+import os
+import urllib.request
+
+import pytest
+
+import load_test
+import rerun_metrics
+
+
+@pytest.fixture
+def instrumented(monkeypatch):
+    monkeypatch.setenv("RISK_SURVEY_METRICS_PORT", "0")  # the AppTest runs must not bind the port
+    monkeypatch.setenv("RISK_SURVEY_METRICS_SCRIPT", rerun_metrics.DEFAULT_SCRIPT)
+    return os.path.abspath(rerun_metrics.__file__)
+
+
+@pytest.mark.parametrize("mode", ["ladder", "switch"])
+def test_every_rerun_is_recorded(instrumented, mode):
+    start = len(rerun_metrics.LOG.records())
+    for seed in range(2):
+        for _ in load_test.respondent(instrumented, seed, load_test.Recorder(), 30, mode):
+            pass
+    records = rerun_metrics.LOG.records()[start:]
+    triggers = collections.Counter(r["trigger"] for r in records)
+    assert triggers["load"] == 2
+    assert triggers["phase_change"] >= 2 * 20  # two phases for each of ten problems
+    assert all(r["state_bytes"] and r["script"] == rerun_metrics.DEFAULT_SCRIPT for r in records)
+    assert any(r["sections"].get("export") for r in records)
+
+
+def test_endpoint_serves_both_dumps(instrumented):
+    for _ in load_test.respondent(instrumented, 0, load_test.Recorder(), 30, "switch"):
+        pass
+    server = rerun_metrics.serve_metrics(port=0)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    prometheus = urllib.request.urlopen(base + "/metrics").read().decode()
+    jsonl = urllib.request.urlopen(base + "/metrics.jsonl").read().decode().splitlines()
+    assert len(jsonl) == len(rerun_metrics.LOG.records())
+    assert json.loads(jsonl[-1])["script"] == rerun_metrics.DEFAULT_SCRIPT
+    assert 'risk_survey_section_seconds_total{section="export"}' in prometheus
+    assert 'risk_survey_rerun_seconds_count{trigger="load"}' in prometheus
+
+
+def test_ring_buffer_keeps_the_last_records_and_all_totals():
+    log = rerun_metrics.RerunLog(size=2)
+    for i in range(3):
+        log.append({"trigger": "click", "seconds": 1.0, "sections": {"ladder": 0.5}, "widgets": i, "state_bytes": 10})
+    assert [r["widgets"] for r in log.records()] == [1, 2]
+    prometheus = log.to_prometheus()
+    assert 'risk_survey_rerun_seconds_count{trigger="click"} 3' in prometheus
+    assert 'risk_survey_section_seconds_total{section="ladder"} 1.500000' in prometheus
+
+
+def test_self_check_restores_the_environment(monkeypatch):
+    monkeypatch.delenv("RISK_SURVEY_METRICS_PORT", raising=False)
+    monkeypatch.setenv("RISK_SURVEY_METRICS_SCRIPT", "other.py")
+    rerun_metrics._self_check(sessions=1)
+    assert "RISK_SURVEY_METRICS_PORT" not in os.environ
+    assert os.environ["RISK_SURVEY_METRICS_SCRIPT"] == "other.py"
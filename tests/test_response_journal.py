@@ -0,0 +1,48 @@
+import logging
+import time
+
+from response_journal import JournalSyncer, ResponseJournal
+from sheets_writer import FakeWorksheet
+
+
+def _wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_syncer_recovers_from_a_transient_failure(tmp_path, caplog):
+    journal = ResponseJournal(str(tmp_path / "journal.db"))
+    sheet = FakeWorksheet(fail_first=1)  # a 429 on the first append
+    connects = []
+
+    def connect():
+        # Unreachable on the first attempt, like a sheet that is down at startup
+        connects.append(1)
+        return None if len(connects) == 1 else sheet
+
+    for i in range(3):
+        journal.append([["t", f"P{i}", 30, 1, "Gain Domain", "p", 1.0, 1.0, "Risk Neutral"]])
+    syncer = JournalSyncer(journal, connect, interval=0.05, max_retries=0, base_backoff=0.01, max_backoff=0.05)
+    with caplog.at_level(logging.WARNING, logger="response_journal"):
+        syncer.start()
+        _wait_for(lambda: journal.pending_count() == 0)
+        syncer.stop(timeout=5)
+
+    assert [row[1] for row in sheet.rows] == ["P0", "P1", "P2"]  # delivered once, in order
+    assert syncer.stats["failures"] == 2 and syncer.stats["entries"] == 3
+    assert len(connects) == 3  # reconnects after each failure
+    warnings = [r.getMessage() for r in caplog.records]
+    assert "worksheet unavailable" in warnings[0] and "429" in warnings[1]
+    journal.close()
+
+
+def test_entries_stay_queued_while_the_sheet_is_down(tmp_path):
+    journal = ResponseJournal(str(tmp_path / "journal.db"))
+    journal.append([["t", "A", 30, 1, "Gain Domain", "p", 1.0, 1.0, "Risk Neutral"]])
+    syncer = JournalSyncer(journal, lambda: None, interval=0.05, base_backoff=0.01, max_backoff=0.02).start()
+    _wait_for(lambda: syncer.stats["failures"] >= 3)
+    syncer.stop(timeout=5)
+    assert journal.pending_count() == 1
+    journal.close()
@@ -0,0 +1,62 @@
+import os
+import threading
+
+import pytest
+
+import load_test
+from session_memory import HERE, LADDER_WIDGET_KEYS, SessionMemoryProfiler, key_footprint, purge_widget_keys
+
+
+@pytest.fixture(scope="module")
+def finished_sessions():
+    """Two consolidated-survey sessions, profiled after every rerun."""
+    profiler = SessionMemoryProfiler(window=20, min_growth=8 * 1024)
+    finals = []
+    for seed in range(2):
+        gen = load_test.respondent(os.path.join(HERE, "risk_survey_consolidated.py"), seed, load_test.Recorder(), 30)
+        try:
+            while True:
+                profiler.observe(f"s{seed}", next(gen).session_state.to_dict())
+        except StopIteration as done:
+            finals.append(done.value.session_state.to_dict())
+    return profiler, finals
+
+
+def test_finished_sessions_keep_no_ladder_widget_keys(finished_sessions):
+    profiler, finals = finished_sessions
+    assert not [k for state in finals for k in state if LADDER_WIDGET_KEYS.match(k)]
+    assert [s["session"] for s in profiler.sessions()] and not profiler.growing()
+
+
+def test_a_session_that_keeps_its_widget_keys_is_flagged(finished_sessions):
+    _, finals = finished_sessions
+    profiler = SessionMemoryProfiler(window=20, min_growth=8 * 1024)
+    leaky = dict(finals[0])
+    for step in range(40):
+        for row in range(7):
+            leaky[f"choice_{step // 2}_{step % 2 + 1}_{row}"] = "Prefer Gamble" * 40
+        profiler.observe("leaky", leaky)
+    profiler.observe("steady", finals[1])
+
+    flagged = profiler.growing()
+    assert [f["session"] for f in flagged] == ["leaky"]
+    assert flagged[0]["growth"] >= 8 * 1024
+    assert all(LADDER_WIDGET_KEYS.match(k) for k in flagged[0]["keys"])
+
+    purged = purge_widget_keys(leaky)
+    assert len(purged) == 280 and "choice_mask" in leaky
+
+
+def test_key_footprint_sorts_largest_first_and_skips_unpicklable_values():
+    sizes = key_footprint({"small": 1, "large": "x" * 10_000, "lock": threading.Lock()})
+    assert list(sizes)[0] == "large" and sizes["lock"] is None
+
+
+def test_profiler_drops_the_least_recently_seen_session(monkeypatch):
+    monkeypatch.setattr("session_memory.MAX_SESSIONS", 2)
+    profiler = SessionMemoryProfiler()
+    for session in ("a", "b", "a", "c"):
+        profiler.observe(session, {"k": session})
+    assert sorted(s["session"] for s in profiler.sessions()) == ["a", "c"]
+    profiler.forget("a")
+    assert [s["session"] for s in profiler.sessions()] == ["c"]
@@ -0,0 +1,83 @@
+import os
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+import load_test
+import session_store
+from session_store import MemorySessionStore, RespStandIn, SqliteSessionStore, open_session_store
+
+PROGRESS = {"index": 3, "phase": 2, "prospect_ids": bytes([4, 17, 0, 9]), "phase1_choices": b"\x07\x1f\x00",
+            "ces": [12.5, -40.0, 0.0], "bracket": (10.0, 25.5, 2), "name": "Ada", "started": True}
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        yield MemorySessionStore()
+    elif request.param == "sqlite":
+        store = SqliteSessionStore(str(tmp_path / "sessions.db"))
+        yield store
+        store.close()
+    else:
+        server = RespStandIn(("127.0.0.1", 0)).start()
+        yield open_session_store(f"redis://127.0.0.1:{server.server_address[1]}/0")
+        server.shutdown()
+
+
+def test_backends_save_load_expire_and_delete(store):
+    store.save("abc", PROGRESS)
+    assert store.load("abc") == PROGRESS
+    assert store.load("missing") is None
+    store.set("short", b"x", ttl=-1)
+    assert store.get("short") is None
+    store.delete("abc")
+    assert store.load("abc") is None
+
+
+def test_codec_round_trips_dicts_that_look_like_tags():
+    progress = {
+        "summary_counts": {"b": 1, "t": [2]},
+        "bracket": (0.0, 5.5, 2),
+        "phase1_choices": b"\x00\x7f",
+        "lookalikes": [{"__b": "AAA="}, {"__t": [1]}, {"__d": {}}, {}],
+        "nested": {"inner": (b"x", {"__t": (1, 2)})},
+    }
+    decoded = session_store.decode_progress(session_store.encode_progress(progress))
+    assert decoded == progress
+    assert isinstance(decoded["bracket"], tuple) and isinstance(decoded["phase1_choices"], bytes)
+
+
+def test_unknown_store_scheme_is_rejected():
+    with pytest.raises(ValueError):
+        open_session_store("postgres://localhost/sessions")
+
+
+def test_participant_resumes_in_a_new_session(monkeypatch, tmp_path):
+    monkeypatch.setenv("RISK_SURVEY_SESSION_STORE", f"sqlite:///{tmp_path / 'resume.db'}")
+    script = os.path.join(load_test.HERE, "risky_survey_streamlit_v3.py")
+    first = load_test.respondent(script, 7, load_test.Recorder(), 30)
+    for _ in range(9):  # load, name, start, then three problems (two phases each)
+        at = next(first)
+    assert (at.session_state["index"], at.session_state["phase"]) == (3, 1)
+
+    second = AppTest.from_file(script, default_timeout=30)
+    second.query_params["sid"] = at.query_params["sid"]
+    second.run()
+    state = second.session_state
+    assert state["started"] and (state["index"], state["phase"]) == (3, 1)
+    for key in ("start_seed", "prospect_ids", "ces", "summary_counts"):
+        assert state[key] == at.session_state[key]
+
+    while not second.success:
+        for radio in second.radio:
+            if not radio.disabled:
+                radio.set_value(radio.options[0])
+        next(b for b in second.button if b.label == "Continue").click().run()
+    assert len(second.session_state["ces"]) == len(state["prospect_ids"])
+
+
+def test_resume_check_restores_the_environment(monkeypatch, tmp_path):
+    monkeypatch.delenv("RISK_SURVEY_SESSION_STORE", raising=False)
+    session_store._resume_check(f"sqlite:///{tmp_path / 'resume.db'}")
+    assert "RISK_SURVEY_SESSION_STORE" not in os.environ
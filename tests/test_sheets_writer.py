@@ -0,0 +1,72 @@
+import pytest
+
+from sheets_writer import FakeAPIError, FakeWorksheet, TokenBucket, append_rows_with_retry, rows_from_survey_data
+
+
+def _survey(name, problems=10):
+    return {"participant": {"name": name, "age": 30},
+            "results": [{"domain": "Gain Domain", "prospect": f"p{i}", "expectedValue": i,
+                         "certaintyEquivalent": i, "riskAttitude": "Risk Neutral"} for i in range(problems)]}
+
+
+def _bucket():
+    return TokenBucket(rate=1000, capacity=1000, sleep=lambda s: None)
+
+
+def test_rows_from_survey_data():
+    rows = rows_from_survey_data(_survey("P0", problems=2), timestamp="t")
+    assert rows == [["t", "P0", 30, 1, "Gain Domain", "p0", 0, 0, "Risk Neutral"],
+                    ["t", "P0", 30, 2, "Gain Domain", "p1", 1, 1, "Risk Neutral"]]
+
+
+@pytest.mark.parametrize("error", [
+    lambda: FakeAPIError(429, "Quota exceeded"),
+    lambda: FakeAPIError(503, "Service unavailable"),
+    lambda: ConnectionError("connection reset"),
+    lambda: TimeoutError("timed out"),
+])
+def test_quota_server_and_network_errors_are_retried_with_backoff(error):
+    sheet = FakeWorksheet(fail_first=2, error=error)
+    delays, stats = [], {}
+    rows = rows_from_survey_data(_survey("A"))
+    assert append_rows_with_retry(sheet, rows, _bucket(), base_backoff=1.0, sleep=delays.append, stats=stats) is None
+    assert len(sheet.rows) == 10 and sheet.calls == 3 and stats["retries"] == 2
+    # Jittered exponential backoff: 1s then 2s, each scaled by 0.5-1.0
+    assert 0.5 <= delays[0] <= 1.0 and 1.0 <= delays[1] <= 2.0
+
+
+def test_requests_network_errors_are_retried():
+    requests = pytest.importorskip("requests")
+    sheet = FakeWorksheet(fail_first=1, error=lambda: requests.exceptions.ReadTimeout("read timed out"))
+    assert append_rows_with_retry(sheet, [["t"]], _bucket(), sleep=lambda s: None) is None
+    assert sheet.calls == 2 and sheet.rows == [["t"]]
+
+
+def test_the_last_error_is_returned_once_retries_run_out():
+    sheet = FakeWorksheet(fail_first=10)
+    error = append_rows_with_retry(sheet, rows_from_survey_data(_survey("A")), _bucket(), max_retries=2,
+                                   sleep=lambda s: None)
+    assert isinstance(error, FakeAPIError) and "429" in str(error)
+    assert sheet.calls == 3 and sheet.rows == []
+
+
+@pytest.mark.parametrize("error", [
+    lambda: FakeAPIError(400, "Invalid values"),
+    lambda: FakeAPIError(403, "The caller does not have permission"),
+    lambda: ValueError("bad row"),
+])
+def test_other_errors_are_raised_without_retrying(error):
+    sheet = FakeWorksheet(fail_first=1, error=error)
+    delays = []
+    with pytest.raises(type(error())):
+        append_rows_with_retry(sheet, rows_from_survey_data(_survey("A")), _bucket(), sleep=delays.append)
+    assert sheet.calls == 1 and delays == []
+
+
+def test_token_bucket_waits_for_a_token():
+    now = [0.0]
+    bucket = TokenBucket(rate=2, capacity=1, clock=lambda: now[0])
+    assert bucket.try_acquire() == 0.0
+    assert bucket.try_acquire() == pytest.approx(0.5)
+    now[0] += 0.5
+    assert bucket.try_acquire() == 0.0
@@ -0,0 +1,53 @@
+import shutil
+
+import pytest
+
+from survey_component import (
+    _js_ladders,
+    engine_certainty_equivalent,
+    engine_sure_amounts,
+    score_payload,
+)
+from survey_ladders import ROWS, monotone_pattern
+from survey_variants import load_survey_functions
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    ns = load_survey_functions("risky_survey_streamlit_v3.py")
+    return ns["GAINS"], ns["LOSSES"]
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node is needed to run survey_engine.js")
+def test_python_port_matches_survey_engine_js(catalog):
+    prospects = catalog[0] + catalog[1]
+    for p, (phase1, phase2) in zip(prospects, _js_ladders(prospects)):
+        assert engine_sure_amounts(p, 1) == phase1
+        for k1, (amounts, ces) in enumerate(phase2):
+            assert engine_sure_amounts(p, 2, monotone_pattern(k1)) == amounts
+            assert [engine_certainty_equivalent(monotone_pattern(k2), amounts) for k2 in range(ROWS + 1)] == ces
+
+
+def _answers(gains, k1=3, k2=4):
+    return [[pid, k1, k2] for pid in list(range(5)) + list(range(len(gains), len(gains) + 5))]
+
+
+def test_payload_is_rescored_on_the_server(catalog):
+    gains, losses = catalog
+    results = score_payload({"answers": _answers(gains)}, gains, losses)
+    assert [r["prospect"] for r in results] == [p["description"] for p in gains[:5] + losses[:5]]
+    assert [r["domain"] for r in results] == ["Gain Domain"] * 5 + ["Loss Domain"] * 5
+    amounts = engine_sure_amounts(gains[0], 2, monotone_pattern(3))
+    assert results[0]["certainty_equivalent"] == round(engine_certainty_equivalent(monotone_pattern(4), amounts), 2)
+
+
+@pytest.mark.parametrize("answers", [
+    None,
+    [[0, 3, 4]] * 10,  # repeated prospect
+    [[0, 3, 8]] + [[i, 3, 4] for i in range(1, 10)],  # switch point out of range
+    [[0, 3, True]] + [[i, 3, 4] for i in range(1, 10)],
+    [[i, 3, 4] for i in range(10)],  # ten gains, no losses
+])
+def test_payloads_the_frontend_cannot_produce_are_rejected(catalog, answers):
+    with pytest.raises(ValueError):
+        score_payload({"answers": answers}, *catalog)
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+from survey_ladders import monotone_pattern
+from survey_scoring import (
+    _round2,
+    certainty_equivalents,
+    encode_choice_matrix,
+    risk_attitudes,
+    score_batch,
+    switch_indices,
+)
+from survey_variants import load_survey_functions
+
+
+def _answers(rng, n):
+    """Half monotone ladders, half arbitrary ones with unanswered rows."""
+    return [
+        monotone_pattern(int(rng.integers(0, 8))) if i % 2
+        else [[None, "sure", "prospect"][c] for c in rng.integers(0, 3, 7)]
+        for i in range(n)
+    ]
+
+
+@pytest.mark.parametrize("script, convention", [
+    ("risk_survey_consolidated.py", "midpoint"),
+    ("risky_survey_streamlit_v3.py", "lowest_accepted"),
+])
+def test_batch_scores_match_the_scalar_functions(script, convention):
+    ns = load_survey_functions(script)
+    catalog = ns.get("PROSPECTS") or ns["GAINS"] + ns["LOSSES"]
+    rng = np.random.default_rng(3)
+    prospects = [catalog[i] for i in rng.integers(0, len(catalog), 2000)]
+    choice_lists = _answers(rng, len(prospects))
+    amount_lists = [
+        ns["generate_sure_amounts"](p, phase=2, phase1_choices=monotone_pattern(int(rng.integers(0, 8))))
+        for p in prospects
+    ]
+
+    got = score_batch(
+        encode_choice_matrix(choice_lists),
+        np.array(amount_lists),
+        np.array([p["outcomes"] for p in prospects]),
+        np.array([p["probabilities"] for p in prospects]),
+        convention,
+    )
+
+    ce = [ns["compute_certainty_equivalent"](ch, am) for ch, am in zip(choice_lists, amount_lists)]
+    ev = [ns["expected_value"](p) for p in prospects]
+    assert got["certainty_equivalent"].tolist() == ce
+    assert got["expected_value"].tolist() == ev
+    if "risk_attitude_from_ce" in ns:
+        assert got["risk_attitude"].tolist() == [ns["risk_attitude_from_ce"](c, e) for c, e in zip(ce, ev)]
+
+
+def test_switch_index_is_minus_one_unless_complete_and_monotone():
+    choices = encode_choice_matrix([
+        monotone_pattern(0),
+        monotone_pattern(3),
+        monotone_pattern(7),
+        ["sure", "prospect", "sure", "prospect", "prospect", "prospect", "prospect"],
+        ["sure", "sure", None, "prospect", "prospect", "prospect", "prospect"],
+    ])
+    assert switch_indices(choices).tolist() == [0, 3, 7, -1, -1]
+
+
+def test_round2_matches_python_round_on_half_cents():
+    x = np.arange(0, 100_000) / 1000.0 + 0.005
+    assert _round2(x).tolist() == [round(v, 2) for v in x.tolist()]
+
+
+def test_risk_attitudes():
+    assert risk_attitudes(np.array([1.0, 3.0, 2.0]), np.array([2.0, 2.0, 2.0])).tolist() == [
+        "Risk Averse", "Risk Seeking", "Risk Neutral"]
+
+
+def test_unknown_convention_is_rejected():
+    with pytest.raises(ValueError, match="Unknown CE convention"):
+        certainty_equivalents(np.zeros((1, 7), dtype=np.int8), np.ones((1, 7)), "median")
@@ -0,0 +1,98 @@
+import asyncio
+import json
+import os
+import re
+
+import survey_server
+from cohort_aggregates import CohortAggregates
+from html_asset import HERE
+from response_journal import ResponseJournal
+
+
+def _request(app, method, path, headers=(), body=b""):
+    """Minimal ASGI request; returns (status, body)."""
+    scope = {"type": "http", "method": method, "path": path, "raw_path": path.encode(),
+             "query_string": b"", "headers": [(k.lower().encode(), v.encode()) for k, v in headers],
+             "scheme": "http", "server": ("test", 80), "client": ("test", 1), "root_path": ""}
+    sent = []
+    requested = []
+
+    async def receive():
+        if requested:  # the client stays connected until the response is complete
+            await asyncio.Event().wait()
+        requested.append(True)
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    status = next(m["status"] for m in sent if m["type"] == "http.response.start")
+    return status, b"".join(m.get("body", b"") for m in sent if m["type"] == "http.response.body")
+
+
+def _get(app, path, headers=()):
+    return _request(app, "GET", path, headers)
+
+
+def _app(tmp_path, admin_token):
+    app = survey_server.create_app(str(tmp_path / "journal.db"), admin_token=admin_token)
+    app.state.journal = ResponseJournal(str(tmp_path / "journal.db"))
+    app.state.journal.append([["2024-01-01T00:00:00Z", "Ann", 30, 1, "Gain Domain", "p", 5.0, 4.0, "Risk Averse"]])
+    return app
+
+
+def test_csv_export_is_not_served_without_an_admin_token(tmp_path):
+    status, _ = _get(_app(tmp_path, None), "/api/responses.csv")
+    assert status == 404
+
+
+def test_csv_export_requires_the_admin_token(tmp_path):
+    app = _app(tmp_path, "s3cret")
+    assert _get(app, "/api/responses.csv")[0] == 401
+    assert _get(app, "/api/responses.csv", [("Authorization", "Bearer wrong")])[0] == 401
+    status, body = _get(app, "/api/responses.csv", [("Authorization", "Bearer s3cret")])
+    assert status == 200 and b"Ann" in body
+
+
+def _payload(**participant):
+    catalog = survey_server.served_catalog()
+    prospect = next(iter(catalog))
+    domain, ev = catalog[prospect]
+    return {
+        "participant": {"name": "Ann", "age": 30, **participant},
+        "results": [{"prospect": prospect, "domain": domain, "expectedValue": ev,
+                     "certaintyEquivalent": 0.2, "riskAttitude": "Risk Averse"}],
+    }
+
+
+def test_served_catalog_is_the_one_the_page_presents():
+    with open(os.path.join(HERE, survey_server.SURVEY_PAGE), encoding="utf-8") as f:
+        page = re.findall(r"description: '([^']*)'", f.read())
+    assert page == list(survey_server.served_catalog())
+
+
+def test_submissions_are_checked_against_the_catalog():
+    catalog = survey_server.served_catalog()
+    assert survey_server.validate_submission(_payload(), catalog) is None
+    for age in (30.5, True, "30"):
+        assert "age" in survey_server.validate_submission(_payload(age=age), catalog)
+
+    for change in ({"prospect": "99% chance to win $1000000"}, {"domain": "Loss Domain"},
+                   {"expectedValue": 1000.0}):
+        data = _payload()
+        data["results"][0].update(change)
+        assert survey_server.validate_submission(data, catalog) is not None
+
+
+def test_rejected_submissions_are_not_journaled_or_aggregated(tmp_path):
+    app = _app(tmp_path, None)
+    app.state.catalog = survey_server.served_catalog()
+    app.state.aggregates = CohortAggregates()
+    app.state.syncer = None
+    before = app.state.journal.pending_count()
+    status, _ = _request(app, "POST", "/api/responses", body=json.dumps(_payload(age=30.5)).encode())
+    assert status == 422
+    assert app.state.journal.pending_count() == before and app.state.aggregates.summary()["totalProblems"] == 0
+    status, _ = _request(app, "POST", "/api/responses", body=json.dumps(_payload()).encode())
+    assert status == 201 and app.state.aggregates.summary()["totalProblems"] == 1
@@ -0,0 +1,40 @@
+import os
+
+import load_test
+
+
+def test_results_page_compares_with_the_cohort():
+    script = os.path.join(load_test.HERE, "risky_survey_streamlit_v3.py")
+    drive = load_test.respondent(script, 0, load_test.Recorder(), timeout=30, mode="switch")
+    try:
+        while True:
+            next(drive)
+    except StopIteration as done:
+        at = done.value
+    assert at.success
+    results, comparison = (df.value for df in at.dataframe)
+    assert list(comparison["domain"]) == ["Gain Domain", "Loss Domain"]
+    assert (comparison["cohort_results"] >= 5).all()
+    gains = results[results["domain"] == "Gain Domain"]
+    mine = (gains["certainty_equivalent"] - gains["expected_value"]).mean()
+    assert comparison["your_mean_premium"][0] == round(mine, 2)
+
+
+def _start(seed=None):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(load_test.HERE, "risky_survey_streamlit_v3.py"), default_timeout=30)
+    if seed is not None:
+        at.session_state["start_seed"] = seed
+    at.run()
+    at.text_input[0].input("Ann").run()
+    next(b for b in at.button if b.label == "Start Survey").click().run()
+    return at
+
+
+def test_start_seed_is_stored_and_zero_is_honoured():
+    fresh = _start()
+    assert isinstance(fresh.session_state["start_seed"], int)
+    replays = [_start(0), _start(0)]
+    assert all(at.session_state["start_seed"] == 0 for at in replays)
+    assert replays[0].session_state["prospect_ids"] == replays[1].session_state["prospect_ids"]